@@ -1,133 +1,379 @@
+import io
+import os
+
 import pandas as pd
 import streamlit as st
-import plotly.express as px
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.cluster.hierarchy import linkage, dendrogram
+
+from rfm_core.cache import cache_compartida, clave_cache
+from rfm_core.campanas import base_campana, bloques_campana
+from rfm_core.carga import leer_transacciones, presupuesto_memoria
+from rfm_core.catalogo import catalogo_compartido
+from rfm_core.consultas import crear_consultas
+from rfm_core.controles import (avisar_carga, en_segundo_plano, esperar_tarea, formulario_filtros, fragmento,
+                                tarea_en_sesion)
+from rfm_core.descargas import boton_descarga
+from rfm_core.filtros import filtrar_transacciones
+from rfm_core.graficos import dispersion, figura, histograma
+from rfm_core.huella import huella, huella_archivo
+from rfm_core.metricas import iniciar_servidor, medir, registrar_dataset
+from rfm_core.puntajes import columnas_agrupables, puntajes_lado_a_lado, puntuar_cuantiles
+
+# Segundos que se espera al cálculo exacto antes de mostrar la vista previa aproximada
+ESPERA_VISTA_PREVIA = 1.0
+
+PUNTAJES_GLOBALES = "(solo globales)"
 
 # Configuración de la página
 st.set_page_config(page_title="Dashboard RFM Dinámico", layout="wide")
 st.title("📊 Dashboard RFM Dinámico con Gráficos Interactivos")
 
-# Subir archivo Excel
-uploaded_file = st.file_uploader("Sube tu archivo Excel", type=["xlsx"])
+# Métricas Prometheus del proceso en RFM_METRICAS_PUERTO (una sola vez por proceso)
+iniciar_servidor()
+
+# Subir archivo Excel o elegir un dataset ya registrado en el catálogo
+catalogo = catalogo_compartido()
+registrados = catalogo.listar()
+origen = st.radio("Origen de datos", ["Subir Excel", "Catálogo"], horizontal=True) if registrados else "Subir Excel"
+uploaded_file = None
+dataset = None
+if origen == "Subir Excel":
+    uploaded_file = st.file_uploader("Sube tu archivo Excel", type=["xlsx"])
+else:
+    col1, col2 = st.columns([3, 1])
+    nombre_dataset = col1.selectbox("Dataset", list(dict.fromkeys(e.nombre for e in registrados)))
+    version_dataset = col2.selectbox("Versión", [e.version for e in registrados if e.nombre == nombre_dataset])
+    dataset = (nombre_dataset, version_dataset)
+
+if uploaded_file or dataset:
+    cache = cache_compartida()
+    if dataset:
+        # ✅ Dataset del catálogo: memory-map del archivo Arrow, sin leer el Excel ni copiar las transacciones.
+        # Conserva la huella del archivo original, así que reutiliza los resultados ya calculados
+        df, entrada = catalogo.abrir(*dataset)
+        huella_datos = entrada.huella
+    else:
+        # ✅ Cargar datos en el pool de trabajo (caché compartida entre sesiones: el mismo archivo se procesa una sola vez)
+        huella_datos = huella_archivo(uploaded_file)
+        clave_datos = clave_cache('transacciones', huella_datos, presupuesto_memoria())
+        contenido = uploaded_file.getvalue()
+
+        def cargar(tarea):
+            with medir('carga'):
+                return cache.obtener(clave_datos, lambda: leer_transacciones(io.BytesIO(contenido),
+                                                                             avance=tarea.avanzar))
 
-if uploaded_file:
-    # ✅ Cargar datos
-    df = pd.read_excel(uploaded_file, sheet_name='Transaction Data')
-    df['Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
-    df['Hr transacc'] = pd.to_datetime(df['Hr transacc'], format='%H:%M:%S', errors='coerce').dt.hour
+        df = en_segundo_plano('carga', clave_datos, cargar, texto="Leyendo Excel...")
 
-    # ✅ Filtros en la barra lateral
-    st.sidebar.header("Filtros")
-    establecimientos = st.sidebar.multiselect("Establecimientos", df['Establecimiento'].unique(),
-                                              default=list(df['Establecimiento'].unique()))
-    rango_hora = st.sidebar.slider("Rango Horario", 0, 23, (0, 23))
+        with st.expander("📚 Guardar en el catálogo"):
+            st.caption("Registra estas transacciones para abrirlas después sin volver a subir el Excel.")
+            nombre_nuevo = st.text_input("Nombre del dataset", value=os.path.splitext(uploaded_file.name)[0])
+            if st.button("Registrar", disabled=not nombre_nuevo.strip()):
+                with st.spinner("Guardando..."):
+                    entrada = catalogo.registrar(df, nombre_nuevo, huella_datos)
+                st.success(f"Disponible en el catálogo como {entrada.nombre} (versión {entrada.version}).")
+    registrar_dataset(df, huella_datos)
+    avisar_carga(df)
 
-    # Selectores para tipos de gráficos
-    chart_type_hora = st.sidebar.selectbox("Gráfico para Ventas por Hora", ["Línea", "Barras", "Burbujas"])
-    chart_type_est = st.sidebar.selectbox("Gráfico para Ventas por Establecimiento", ["Barras", "Pie", "Sunburst"])
-    chart_type_map = st.sidebar.selectbox("Gráfico para Mapa Competitivo", ["Burbujas", "Barras"])
+    # ✅ Filtros en la barra lateral (se aplican juntos con "Aplicar filtros")
+    establecimientos, rango_hora, frecuencia = formulario_filtros(df)
 
     # Filtrar dataset
-    df_filtered = df[(df['Establecimiento'].isin(establecimientos)) &
-                     (df['Hr transacc'].between(rango_hora[0], rango_hora[1]))]
+    # Filtros y agregaciones: pandas o DuckDB sobre Parquet según RFM_MOTOR
+    consultas = crear_consultas(df, huella_datos)
+    estado_filtros = (sorted(map(str, establecimientos)), rango_hora, frecuencia)
+
+    def en_cache(etapa, calcular):
+        with medir(etapa):
+            return cache.obtener(clave_cache(etapa, huella_datos, *estado_filtros), calcular)
 
-    # ✅ Cálculo de RFM
+    def figura_de(etapa, *tipo, construir):
+        # Figuras en memoria por resultado de la etapa y tipo de gráfico: alternar el tipo no las reconstruye
+        return figura((clave_cache(etapa, huella_datos, *estado_filtros),) + tipo, construir)
+
+    # ✅ Etapas del cálculo exacto, en el orden en que se muestran
     current_date = pd.to_datetime('2015-12-31')
-    rfm_df = df_filtered.groupby('Customer ID').agg({
-        'Order Date': lambda x: (current_date - x.max()).days,
-        'Customer ID': 'count',
-        'Sales': 'sum'
-    }).rename(columns={'Order Date': 'Recency', 'Customer ID': 'Frequency', 'Sales': 'Monetary'})
 
-    rfm_df['Recency'] = rfm_df['Recency'].astype(int)
+    def calcular_rfm_puntuado():
+        return puntuar_cuantiles(consultas.rfm(establecimientos, rango_hora, current_date, frecuencia))
+
+    def calcular_mapa():
+        df_mapa = consultas.mapa(en_cache('rfm', calcular_rfm_puntuado), establecimientos, rango_hora)
+        df_mapa['Margen Estimado'] = df_mapa['Monetary'] * 0.3
+        return df_mapa
+
+    etapas = [
+        ("RFM por cliente", 'rfm', calcular_rfm_puntuado),
+        ("Ventas por establecimiento", 'ventas_est',
+         lambda: consultas.ventas(['Establecimiento'], establecimientos, rango_hora)),
+        ("Mapa competitivo", 'mapa', calcular_mapa),
+        ("Ventas por hora", 'ventas_hora_est',
+         lambda: consultas.ventas(['Hr transacc', 'Establecimiento'], establecimientos, rango_hora)),
+        ("Horas pico", 'ventas_hora',
+         lambda: consultas.ventas(['Hr transacc'], establecimientos, rango_hora).set_index('Hr transacc')['Sales']),
+        ("Cubo hora x día", 'cubo', lambda: consultas.cubo(establecimientos, rango_hora)),
+    ]
+
+    # Modelo CLV opcional: se ajusta como una etapa más del cálculo exacto
+    modelo_clv = st.sidebar.checkbox("Valor de vida del cliente (CLV)",
+                                     help="Ajusta BG/NBD + Gamma-Gamma sobre los clientes filtrados.")
+    if modelo_clv:
+        def calcular_clv():
+            from rfm_core.clv import ajustar_clv
+            resumen = consultas.resumen_clv(establecimientos, rango_hora, current_date, frecuencia)
+            return resumen, ajustar_clv(resumen)
+
+        etapas.append(("Modelo CLV", 'clv', calcular_clv))
+    calculos = {etapa: calcular for _, etapa, calcular in etapas}
+
+    # Puntajes por grupo opcionales: quintiles dentro de cada establecimiento (u otra columna de texto)
+    grupo_puntajes = st.sidebar.selectbox("Puntajes RFM dentro de cada", [PUNTAJES_GLOBALES] + columnas_agrupables(df),
+                                          help="Cortes por quintil calculados dentro de cada grupo, para que los "
+                                               "clientes de un establecimiento pequeño no se comparen con los de uno "
+                                               "grande. Se muestran junto a los puntajes globales.")
+
+    # Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+    import plotly.express as px
+
+    # ✅ Cálculo exacto en el pool de trabajo; si cambian los filtros a mitad, el anterior se cancela.
+    # Mientras corre se muestra su progreso y, con la vista previa activada, una muestra de clientes
+    vista_rapida = st.sidebar.toggle("Vista previa rápida", value=True,
+                                     help="Muestra resultados aproximados sobre una muestra de clientes mientras "
+                                          "se calcula el resultado exacto.")
+    pendiente = not all(cache.contiene(clave_cache(etapa, huella_datos, *estado_filtros)) for _, etapa, _ in etapas)
+    if pendiente:
+        def calcular_exacto(tarea):
+            for i, (texto, etapa, calcular) in enumerate(etapas):
+                tarea.avanzar(i / len(etapas), f"Cálculo exacto: {texto}...")
+                en_cache(etapa, calcular)
+
+        tarea = tarea_en_sesion('calculo_exacto', huella(huella_datos, *estado_filtros), calcular_exacto)
+
+        # Si el cálculo exacto es rápido no vale la pena mostrar la aproximación
+        if not tarea.esperar(ESPERA_VISTA_PREVIA):
+            if not vista_rapida:
+                esperar_tarea(tarea, "Calculando...")
+                st.stop()
+
+            from rfm_core.vista_previa import NIVEL_BANDAS, vista_previa
+
+            vista = en_cache('vista_previa', lambda: vista_previa(
+                filtrar_transacciones(df, huella_datos, establecimientos, rango_hora), current_date, frecuencia))
+            st.info(f"⏱️ Vista previa con {vista.clientes_muestra:,} de {vista.clientes:,} clientes "
+                    f"({vista.fraccion:.0%} de cada establecimiento) y bandas del {NIVEL_BANDAS:.0%}. "
+                    f"Se reemplaza sola por el resultado exacto al terminar.")
+            esperar_tarea(tarea, "Cálculo exacto en segundo plano...")
+
+            def barras_con_bandas(tabla, x, y, titulo):
+                return px.bar(tabla, x=x, y=y, title=titulo, error_y=tabla['Superior'] - tabla['Estimado'],
+                              error_y_minus=tabla['Estimado'] - tabla['Inferior'])
+
+            st.subheader("📌 Segmentación RFM (aproximada)")
+            columnas = st.columns(4)
+            columnas[0].metric("Clientes", f"{vista.clientes:,}")
+            for columna, metrica in zip(columnas[1:], ['Recency', 'Frequency', 'Monetary']):
+                fila = vista.resumen.loc[metrica]
+                columna.metric(f"{metrica} promedio", f"{fila['Estimado']:,.1f}",
+                               help=f"Banda: {fila['Inferior']:,.1f} – {fila['Superior']:,.1f}")
 
-    # Calcular puntuaciones RFM
-    quantiles = rfm_df.quantile(q=[0.20, 0.40, 0.60, 0.80]).to_dict()
-    def r_score(x, p, d): return 5 if x <= d[p][0.20] else (4 if x <= d[p][0.40] else (3 if x <= d[p][0.60] else (2 if x <= d[p][0.80] else 1)))
-    def fm_score(x, p, d): return 1 if x <= d[p][0.20] else (2 if x <= d[p][0.40] else (3 if x <= d[p][0.60] else (4 if x <= d[p][0.80] else 5)))
+            st.subheader("📊 Distribuciones R, F, M (aproximadas)")
+            for columna, (metrica, tabla) in zip(st.columns(3), vista.distribuciones.items()):
+                with columna:
+                    st.plotly_chart(barras_con_bandas(tabla, metrica, 'Estimado', f"Distribución {metrica}")
+                                    .update_layout(yaxis_title="Clientes estimados"), use_container_width=True)
 
-    rfm_df['R'] = rfm_df['Recency'].apply(r_score, args=('Recency', quantiles,))
-    rfm_df['F'] = rfm_df['Frequency'].apply(fm_score, args=('Frequency', quantiles,))
-    rfm_df['M'] = rfm_df['Monetary'].apply(fm_score, args=('Monetary', quantiles,))
-    rfm_df['RFM Score'] = rfm_df['R'] + rfm_df['F'] + rfm_df['M']
+            st.subheader("🏪 Participación por Establecimiento (aproximada)")
+            st.plotly_chart(barras_con_bandas(vista.establecimientos, 'Establecimiento', 'Estimado',
+                                              "Participación en ventas (%)"), use_container_width=True)
+
+            st.subheader("🔥 Horas Pico (aproximadas)")
+            st.plotly_chart(barras_con_bandas(vista.horas, 'Hr transacc', 'Estimado', "Ventas estimadas por hora")
+                            .update_layout(xaxis_title="Hora", yaxis_title="Ventas"), use_container_width=True)
+            horas_pico = vista.horas.nlargest(3, 'Estimado')['Hr transacc']
+            st.write(f"Horas Pico: {', '.join(str(h)+':00' for h in horas_pico)}")
+            st.stop()
+
+    # ✅ Cálculo de RFM y puntuaciones
+    rfm_df = en_cache('rfm', calcular_rfm_puntuado)
 
     st.subheader("📌 Segmentación RFM")
     st.dataframe(rfm_df)
 
+    # ✅ Puntajes RFM dentro de cada grupo, junto a los globales
+    if grupo_puntajes != PUNTAJES_GLOBALES:
+        st.subheader(f"🏪 Puntajes RFM dentro de cada {grupo_puntajes}")
+        clave_grupo = clave_cache('rfm_grupo', huella_datos, *estado_filtros, grupo_puntajes)
+
+        def calcular_rfm_grupo(tarea):
+            with medir('rfm_grupo'):
+                return cache.obtener(clave_grupo, lambda: puntajes_lado_a_lado(puntuar_cuantiles(
+                    consultas.rfm_por_grupo(grupo_puntajes, establecimientos, rango_hora, current_date, frecuencia),
+                    grupo=grupo_puntajes), rfm_df))
+
+        rfm_grupo = en_segundo_plano('rfm_grupo', clave_grupo, calcular_rfm_grupo, texto="Puntuando por grupo...")
+        st.caption("Recency, Frequency y Monetary de cada cliente dentro del grupo; R, F, M y RFM Score con los "
+                   "cortes del grupo y, al lado, los puntajes globales del cliente.")
+        st.dataframe(rfm_grupo)
+        comparacion = (rfm_grupo.groupby(level=grupo_puntajes, observed=True)[['RFM Score global', 'RFM Score']].mean()
+                       .rename(columns={'RFM Score': f'RFM Score dentro de {grupo_puntajes}'}))
+        fig_comparacion = px.bar(comparacion.reset_index().melt(id_vars=grupo_puntajes, var_name='Puntaje',
+                                                                value_name='Promedio'),
+                                 x=grupo_puntajes, y='Promedio', color='Puntaje', barmode='group',
+                                 title=f"RFM Score promedio: global vs dentro de cada {grupo_puntajes}")
+        st.plotly_chart(fig_comparacion, use_container_width=True)
+        boton_descarga("Descargar Puntajes por Grupo", rfm_grupo, "rfm_por_grupo", clave_grupo, index=True)
+
     # ✅ Distribuciones R, F, M
     st.subheader("📊 Distribuciones R, F, M")
     col1, col2, col3 = st.columns(3)
-    with col1:
-        st.plotly_chart(px.histogram(rfm_df, x='Recency', nbins=20, title="Distribución Recency"), use_container_width=True)
-    with col2:
-        st.plotly_chart(px.histogram(rfm_df, x='Frequency', nbins=20, title="Distribución Frequency"), use_container_width=True)
-    with col3:
-        st.plotly_chart(px.histogram(rfm_df, x='Monetary', nbins=20, title="Distribución Monetary"), use_container_width=True)
+    for columna, metrica in zip((col1, col2, col3), ['Recency', 'Frequency', 'Monetary']):
+        with columna:
+            st.plotly_chart(figura_de('rfm', 'histograma', metrica, construir=lambda: histograma(
+                rfm_df, metrica, nbins=20, title=f"Distribución {metrica}")), use_container_width=True)
+
+    # ✅ Valor de vida del cliente (BG/NBD + Gamma-Gamma)
+    if modelo_clv:
+        st.subheader("💰 Valor de Vida del Cliente (CLV)")
+        resumen_clv, parametros_clv = en_cache('clv', calculos['clv'])
+
+        @fragmento
+        def seccion_clv(rfm_df, resumen_clv, parametros_clv):
+            from rfm_core.clv import predecir_clv
+
+            horizonte = st.select_slider("Horizonte", [30, 90, 180, 365], value=90, key="horizonte_clv",
+                                         format_func=lambda dias: f"{dias} días")
+            clv_df = rfm_df.join(predecir_clv(resumen_clv, parametros_clv, horizonte))
+            col1, col2, col3 = st.columns(3)
+            col1.metric("CLV total", f"{clv_df['CLV'].sum():,.0f}")
+            col2.metric("Compras esperadas", f"{clv_df['Compras esperadas'].sum():,.0f}")
+            col3.metric("Prob. activo promedio", f"{clv_df['Prob. activo'].mean():.0%}")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.plotly_chart(figura_de('clv', 'histograma', horizonte, construir=lambda: histograma(
+                    clv_df, 'CLV', nbins=30, log_y=True, title=f"Distribución CLV ({horizonte} días)")),
+                    use_container_width=True)
+            with col2:
+                # Un punto por cliente: WebGL y muestra si no cabe en el presupuesto de la figura
+                st.plotly_chart(figura_de('clv', 'dispersion', horizonte, construir=lambda: dispersion(
+                    clv_df, 'Recency', 'Frequency', color='Prob. activo', color_continuous_scale='RdYlGn',
+                    title="Probabilidad de seguir activo")), use_container_width=True)
+            st.dataframe(clv_df.sort_values('CLV', ascending=False))
+            # Sin compras repetidas (o con q <= 1) no hay Gamma-Gamma: el valor esperado es el gasto medio
+            gamma_gamma = ("Gamma-Gamma: p={:.3g}, q={:.3g}, γ={:.3g}".format(*parametros_clv[4:7])
+                           if parametros_clv.q > 1 else f"valor medio por compra: {parametros_clv.valor_medio:,.2f}")
+            st.caption("BG/NBD: r={:.3g}, α={:.3g}, a={:.3g}, b={:.3g} · {} "
+                       "(tiempos en semanas; CLV = compras esperadas × valor medio esperado, sin descuento)"
+                       .format(*parametros_clv[:4], gamma_gamma))
+
+        seccion_clv(rfm_df, resumen_clv, parametros_clv)
 
     # ✅ Ventas por Establecimiento (Dinámico)
     st.subheader("🏪 Ventas por Establecimiento")
-    ventas_est = df_filtered.groupby('Establecimiento')['Sales'].sum().reset_index()
-
-    if chart_type_est == "Barras":
-        fig_est = px.bar(ventas_est, x='Establecimiento', y='Sales', color='Establecimiento', text='Sales', title="Ventas por Establecimiento")
-    elif chart_type_est == "Pie":
-        fig_est = px.pie(ventas_est, names='Establecimiento', values='Sales', title="Participación por Establecimiento", hole=0.3)
-    elif chart_type_est == "Sunburst" and 'Categoria' in df_filtered.columns:
-        fig_est = px.sunburst(df_filtered, path=['Establecimiento', 'Categoria'], values='Sales', title="Ventas por Jerarquía")
-    else:
-        fig_est = px.bar(ventas_est, x='Establecimiento', y='Sales', color='Establecimiento', title="Ventas por Establecimiento")
+    ventas_est = en_cache('ventas_est', calculos['ventas_est'])
+
+    # Los tipos de gráfico viven en fragmentos: cambiarlos solo redibuja su gráfico con los agregados ya calculados
+    @fragmento
+    def grafico_establecimientos(ventas_est):
+        chart_type_est = st.selectbox("Gráfico para Ventas por Establecimiento", ["Barras", "Pie", "Sunburst"],
+                                      key="chart_type_est")
 
-    st.plotly_chart(fig_est, use_container_width=True)
+        def construir():
+            if chart_type_est == "Barras":
+                return px.bar(ventas_est, x='Establecimiento', y='Sales', color='Establecimiento', text='Sales', title="Ventas por Establecimiento")
+            elif chart_type_est == "Pie":
+                return px.pie(ventas_est, names='Establecimiento', values='Sales', title="Participación por Establecimiento", hole=0.3)
+            elif chart_type_est == "Sunburst" and 'Categoria' in consultas.columnas:
+                ventas_categoria = en_cache('ventas_categoria',
+                                            lambda: consultas.ventas(['Establecimiento', 'Categoria'], establecimientos, rango_hora))
+                return px.sunburst(ventas_categoria, path=['Establecimiento', 'Categoria'], values='Sales', title="Ventas por Jerarquía")
+            return px.bar(ventas_est, x='Establecimiento', y='Sales', color='Establecimiento', title="Ventas por Establecimiento")
+
+        st.plotly_chart(figura_de('ventas_est', chart_type_est, construir=construir), use_container_width=True)
+
+    grafico_establecimientos(ventas_est)
 
     # ✅ Mapa Competitivo (Dinámico)
     st.subheader("🔥 Mapa Competitivo")
-    df_merged = df_filtered.merge(rfm_df, on="Customer ID")
-    df_mapa = df_merged.groupby('Establecimiento').agg({'Monetary': 'sum', 'RFM Score': 'mean'}).reset_index()
-    df_mapa['Margen Estimado'] = df_mapa['Monetary'] * 0.3
+    df_mapa = en_cache('mapa', calcular_mapa)
+
+    @fragmento
+    def grafico_mapa(df_mapa):
+        chart_type_map = st.selectbox("Gráfico para Mapa Competitivo", ["Burbujas", "Barras"], key="chart_type_map")
 
-    if chart_type_map == "Burbujas":
-        fig_map = px.scatter(df_mapa, x='Monetary', y='Margen Estimado', size='RFM Score', color='Establecimiento',
-                             hover_name='Establecimiento', title="Mapa Competitivo (Burbujas)")
-    else:  # Barras
-        fig_map = px.bar(df_mapa, x='Establecimiento', y='Monetary', color='Establecimiento', text='Margen Estimado',
-                         title="Mapa Competitivo (Barras)")
+        def construir():
+            if chart_type_map == "Burbujas":
+                return dispersion(df_mapa, 'Monetary', 'Margen Estimado', size='RFM Score', color='Establecimiento',
+                                  hover_name='Establecimiento', title="Mapa Competitivo (Burbujas)")
+            # Barras
+            return px.bar(df_mapa, x='Establecimiento', y='Monetary', color='Establecimiento', text='Margen Estimado',
+                          title="Mapa Competitivo (Barras)")
 
-    st.plotly_chart(fig_map, use_container_width=True)
+        st.plotly_chart(figura_de('mapa', chart_type_map, construir=construir), use_container_width=True)
+
+    grafico_mapa(df_mapa)
 
     # ✅ Ventas por Hora (Dinámico)
     st.subheader("📊 Ventas por Hora por Establecimiento")
-    ventas_hora_det = df_filtered.groupby(['Hr transacc', 'Establecimiento'])['Sales'].sum().reset_index()
+    ventas_hora_det = en_cache('ventas_hora_est', calculos['ventas_hora_est'])
+
+    @fragmento
+    def grafico_horas(ventas_hora_det):
+        chart_type_hora = st.selectbox("Gráfico para Ventas por Hora", ["Línea", "Barras", "Burbujas"], key="chart_type_hora")
+
+        def construir():
+            if chart_type_hora == "Línea":
+                fig_hora = px.line(ventas_hora_det, x='Hr transacc', y='Sales', color='Establecimiento', title="Ventas por Hora (Línea)")
+            elif chart_type_hora == "Barras":
+                fig_hora = px.bar(ventas_hora_det, x='Hr transacc', y='Sales', color='Establecimiento', barmode='group', title="Ventas por Hora (Barras)")
+            else:  # Burbujas
+                fig_hora = dispersion(ventas_hora_det, 'Hr transacc', 'Sales', color='Establecimiento', size='Sales',
+                                      hover_name='Establecimiento', title="Ventas por Hora (Burbujas)")
+                fig_hora.update_traces(marker=dict(opacity=0.7, line=dict(width=1, color='DarkSlateGrey')))
 
-    if chart_type_hora == "Línea":
-        fig_hora = px.line(ventas_hora_det, x='Hr transacc', y='Sales', color='Establecimiento', title="Ventas por Hora (Línea)")
-    elif chart_type_hora == "Barras":
-        fig_hora = px.bar(ventas_hora_det, x='Hr transacc', y='Sales', color='Establecimiento', barmode='group', title="Ventas por Hora (Barras)")
-    else:  # Burbujas
-        fig_hora = px.scatter(ventas_hora_det, x='Hr transacc', y='Sales', color='Establecimiento', size='Sales',
-                              hover_name='Establecimiento', title="Ventas por Hora (Burbujas)")
-        fig_hora.update_traces(marker=dict(opacity=0.7, line=dict(width=1, color='DarkSlateGrey')))
+            fig_hora.update_layout(xaxis_title="Hora", yaxis_title="Ventas", legend_title="Establecimiento")
+            return fig_hora
 
-    fig_hora.update_layout(xaxis_title="Hora", yaxis_title="Ventas", legend_title="Establecimiento")
-    st.plotly_chart(fig_hora, use_container_width=True)
+        st.plotly_chart(figura_de('ventas_hora_est', chart_type_hora, construir=construir), use_container_width=True)
+
+    grafico_horas(ventas_hora_det)
 
     # ✅ Insight: Horas Pico vs Valle
     st.subheader("🔥 Insight: Horas Pico y Horas Valle")
-    ventas_hora = df_filtered.groupby('Hr transacc')['Sales'].sum()
+    ventas_hora = en_cache('ventas_hora', calculos['ventas_hora'])
     horas_pico = ventas_hora.sort_values(ascending=False).head(3)
     horas_valle = ventas_hora.sort_values(ascending=True).head(3)
     st.write(f"Horas Pico: {', '.join(str(h)+':00' for h in horas_pico.index)}")
     st.write(f"Horas Valle: {', '.join(str(h)+':00' for h in horas_valle.index)}")
     st.info("💡 Estrategia: Refuerza inventario en horas pico y lanza promociones en horas valle.")
 
-    # ✅ Estrategias dinámicas
+    # ✅ Ventas por hora y día de la semana: un mapa de calor por establecimiento y ventanas pico/valle por día
+    st.subheader("🗓️ Ventas por Hora y Día de la Semana")
+    cubo = en_cache('cubo', calculos['cubo'])
+
+    # El cubo ya está en caché por filtros: cambiar de establecimiento solo redibuja esta sección
+    @fragmento
+    def seccion_cubo(cubo):
+        from rfm_core.cubo import matriz_dia_hora, ventanas_pico_valle
+
+        col1, col2, col3 = st.columns(3)
+        establecimiento = col1.selectbox("Establecimiento", ["Todos"] + list(cubo.establecimientos),
+                                         key="cubo_establecimiento")
+        medida = col2.radio("Medida", ["Ventas", "Transacciones"], horizontal=True, key="cubo_medida")
+        ancho = col3.slider("Horas por ventana", 1, 6, 3, key="cubo_ancho")
+        matriz = matriz_dia_hora(cubo, None if establecimiento == "Todos" else establecimiento, medida.lower())
+        st.plotly_chart(figura_de('cubo', establecimiento, medida, construir=lambda: px.imshow(
+            matriz, aspect='auto', color_continuous_scale='YlOrRd', labels=dict(x="Hora", y="Día", color=medida),
+            title=f"{medida} por hora y día: {establecimiento}")), use_container_width=True)
+        st.write(f"Ventanas de {ancho} h con más y menos {medida.lower()} por día (para turnos y promociones):")
+        st.dataframe(ventanas_pico_valle(matriz, ancho, medida), hide_index=True)
+
+    seccion_cubo(cubo)
+
+    # ✅ Estrategias por cliente (segmento + establecimiento habitual + hora pico)
     st.subheader("📢 Estrategias sugeridas")
-    estrategias = []
-    for est in establecimientos:
-        for hora in range(rango_hora[0], rango_hora[1]+1):
-            estrategias.append({'Establecimiento': est, 'Hora': f"{hora}:00", 'Estrategia': f"Promoción en {est} durante {hora}:00"})
-    df_estrategias = pd.DataFrame(estrategias)
-    st.dataframe(df_estrategias)
-    st.download_button("⬇ Descargar Estrategias", data=df_estrategias.to_csv(index=False).encode('utf-8'),
-                       file_name="estrategias.csv", mime="text/csv")
+    base = en_cache('base_campana', lambda: base_campana(
+        filtrar_transacciones(df, huella_datos, establecimientos, rango_hora), rfm_df))
+    # Vista previa del primer bloque; la descarga arma la lista completa bloque a bloque
+    st.caption(f"Primeros {min(len(base), 100):,} de {len(base):,} clientes")
+    st.dataframe(next(bloques_campana(base, tamano_bloque=100), None))
+    boton_descarga("Descargar Estrategias", lambda: bloques_campana(base), "estrategias",
+                   clave_cache('base_campana', huella_datos, *estado_filtros))
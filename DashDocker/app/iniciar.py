@@ -0,0 +1,15 @@
+"""Punto de entrada del contenedor: publica las métricas y arranca Streamlit en el mismo proceso.
+
+Con `streamlit run` directo el servidor de métricas recién aparece con la primera sesión; así el
+endpoint responde desde que el pod arranca. Los argumentos se pasan tal cual a `streamlit run`.
+"""
+import sys
+
+from streamlit.web import cli
+
+from rfm_core.metricas import iniciar_servidor
+
+if __name__ == '__main__':
+    iniciar_servidor()
+    sys.argv = ['streamlit', 'run', 'dashboard_rfm_dinamico.py', *sys.argv[1:]]
+    sys.exit(cli.main())
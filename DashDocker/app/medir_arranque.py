@@ -0,0 +1,68 @@
+"""Presupuesto de tiempo de importación del punto de entrada del contenedor.
+
+Ejecuta `dashboard_rfm_dinamico.py` sin archivo subido en un intérprete nuevo con `-X importtime`
+(lo mismo que paga un pod recién creado antes de servir la primera página) y falla si:
+
+- el tiempo total de importación supera RFM_PRESUPUESTO_ARRANQUE_MS (por defecto 1500 ms), o
+- se cargó alguna librería pesada que solo deben importar las secciones que la usan.
+
+Uso:  python medir_arranque.py [script]     (código de salida 1 si se excede el presupuesto)
+"""
+import os
+import subprocess
+import sys
+
+PRESUPUESTO_MS = float(os.environ.get('RFM_PRESUPUESTO_ARRANQUE_MS', 1500))
+
+# Librerías que no deben cargarse antes de subir un archivo. Streamlit ya importa el núcleo de
+# plotly y de pyarrow, así que se vigilan los submódulos pesados que importa el propio código.
+DIFERIDAS = ('matplotlib', 'seaborn', 'scipy', 'plotly.express', 'pyarrow.parquet', 'openpyxl', 'duckdb')
+
+_CODIGO = """
+import runpy, sys
+runpy.run_path(sys.argv[1], run_name='__main__')
+print('CARGADAS', ' '.join(sorted(sys.modules)))
+"""
+
+
+def medir(script):
+    """(total_ms, [(ms acumulados, módulo) de nivel superior], módulos cargados) al ejecutar `script`."""
+    entorno = dict(os.environ, STREAMLIT_LOGGER_LEVEL='error')
+    # El script se ejecuta desde su carpeta: las rutas relativas de PYTHONPATH se resuelven antes
+    entorno['PYTHONPATH'] = os.pathsep.join(os.path.abspath(ruta) for ruta in
+                                            entorno.get('PYTHONPATH', '').split(os.pathsep) if ruta)
+    proceso = subprocess.run([sys.executable, '-X', 'importtime', '-c', _CODIGO, script],
+                             capture_output=True, text=True, env=entorno,
+                             cwd=os.path.dirname(os.path.abspath(script)) or None)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"El script falló al importarse:\n{proceso.stderr[-2000:]}")
+    importaciones = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, modulo = linea[len('import time:'):].split('|')
+        # Solo módulos de nivel superior (sin sangría): su tiempo acumulado ya incluye sus dependencias
+        if not modulo.startswith('  '):
+            importaciones.append((int(acumulado) / 1000, modulo.strip()))
+    cargadas = set()
+    for linea in proceso.stdout.splitlines():
+        if linea.startswith('CARGADAS'):
+            cargadas = set(linea.split()[1:])
+    return sum(ms for ms, _ in importaciones), sorted(importaciones, reverse=True), cargadas
+
+
+def main(script):
+    total, importaciones, cargadas = medir(script)
+    print(f"Importaciones de {os.path.basename(script)}: {total:.0f} ms (presupuesto {PRESUPUESTO_MS:.0f} ms)")
+    for ms, modulo in importaciones[:10]:
+        print(f"  {ms:8.1f} ms  {modulo}")
+    prohibidas = sorted(cargadas.intersection(DIFERIDAS))
+    if prohibidas:
+        print(f"Cargadas antes de subir un archivo: {', '.join(prohibidas)}")
+    return 1 if total > PRESUPUESTO_MS or prohibidas else 0
+
+
+if __name__ == '__main__':
+    destino = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                  'dashboard_rfm_dinamico.py')
+    sys.exit(main(destino))
@@ -0,0 +1,72 @@
+"""Scraper mínimo para probar el endpoint de métricas sin un Prometheus real.
+
+Descarga `/metrics`, valida el formato de texto (cada muestra con su # TYPE, valores numéricos,
+buckets de histograma acumulativos que terminan en le="+Inf" igual a _count) y muestra un resumen.
+
+Uso:  python raspar_metricas.py [url]     (por defecto http://127.0.0.1:9108/metrics)
+"""
+import re
+import sys
+import urllib.request
+from collections import defaultdict
+
+_MUESTRA = re.compile(r'^(?P<nombre>[a-zA-Z_:][a-zA-Z0-9_:]*)(?P<etiquetas>\{[^}]*\})? (?P<valor>\S+)$')
+_ETIQUETA = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def raspar(url):
+    with urllib.request.urlopen(url, timeout=5) as respuesta:
+        if not respuesta.headers.get('Content-Type', '').startswith('text/plain'):
+            raise ValueError(f"Content-Type inesperado: {respuesta.headers.get('Content-Type')}")
+        return respuesta.read().decode('utf-8')
+
+
+def validar(texto):
+    """Lista de (nombre, etiquetas, valor) del texto; lanza ValueError si el formato no es válido."""
+    tipos = {}
+    muestras = []
+    for numero, linea in enumerate(texto.splitlines(), 1):
+        if not linea or linea.startswith('# HELP'):
+            continue
+        if linea.startswith('# TYPE'):
+            _, _, nombre, tipo = linea.split(maxsplit=3)
+            tipos[nombre] = tipo
+            continue
+        coincidencia = _MUESTRA.match(linea)
+        if not coincidencia:
+            raise ValueError(f"Línea {numero} mal formada: {linea!r}")
+        nombre = coincidencia['nombre']
+        familia = re.sub(r'_(bucket|sum|count)$', '', nombre) if nombre not in tipos else nombre
+        if familia not in tipos:
+            raise ValueError(f"Línea {numero}: {nombre} sin # TYPE previo")
+        etiquetas = dict(_ETIQUETA.findall(coincidencia['etiquetas'] or ''))
+        muestras.append((nombre, etiquetas, float(coincidencia['valor'])))
+
+    # Histogramas: buckets acumulativos y +Inf igual a _count
+    buckets = defaultdict(list)
+    conteos = {}
+    for nombre, etiquetas, valor in muestras:
+        serie = tuple(sorted((k, v) for k, v in etiquetas.items() if k != 'le'))
+        if nombre.endswith('_bucket'):
+            buckets[(nombre[:-7], serie)].append((etiquetas['le'], valor))
+        elif nombre.endswith('_count'):
+            conteos[(nombre[:-6], serie)] = valor
+    for clave, serie in buckets.items():
+        valores = [valor for _, valor in serie]
+        if valores != sorted(valores) or serie[-1][0] != '+Inf' or valores[-1] != conteos.get(clave):
+            raise ValueError(f"Histograma inconsistente: {clave}")
+    return muestras
+
+
+def main(url):
+    muestras = validar(raspar(url))
+    for nombre, etiquetas, valor in muestras:
+        if not nombre.endswith('_bucket'):
+            texto = ','.join(f'{k}={v}' for k, v in etiquetas.items())
+            print(f"{nombre}{'{' + texto + '}' if texto else ''} = {valor:g}")
+    print(f"OK: {len(muestras)} muestras válidas")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1] if len(sys.argv) > 1 else 'http://127.0.0.1:9108/metrics'))
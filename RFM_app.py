@@ -0,0 +1,44 @@
+import streamlit as st
+
+from rfm_core.catalogo import catalogo_compartido
+from rfm_core.controles import avisar_carga
+from rfm_core.datos import abrir_catalogo, cargar_excel, dataset_activo
+from rfm_core.metricas import iniciar_servidor
+
+# Aplicación multipágina: las páginas de pages/ comparten el dataset elegido aquí, una sola copia de
+# las transacciones por proceso y la misma caché de RFM y agregados.
+#   PYTHONPATH=. streamlit run RFM_app.py
+st.set_page_config(page_title="Análisis RFM", layout="wide")
+st.title("📊 Análisis RFM")
+
+# Métricas Prometheus del proceso en RFM_METRICAS_PUERTO (una sola vez por proceso)
+iniciar_servidor()
+
+# ✅ Origen de datos: Excel subido o dataset registrado en el catálogo
+catalogo = catalogo_compartido()
+registrados = catalogo.listar()
+origen = st.radio("Origen de datos", ["Subir Excel", "Catálogo"], horizontal=True) if registrados else "Subir Excel"
+if origen == "Subir Excel":
+    uploaded_file = st.file_uploader("Sube tu archivo Excel", type=["xlsx"])
+    if uploaded_file:
+        cargar_excel(uploaded_file)
+else:
+    col1, col2 = st.columns([3, 1])
+    nombre_dataset = col1.selectbox("Dataset", list(dict.fromkeys(e.nombre for e in registrados)))
+    version_dataset = col2.selectbox("Versión", [e.version for e in registrados if e.nombre == nombre_dataset])
+    if st.button("Abrir", type="primary"):
+        abrir_catalogo(nombre_dataset, version_dataset)
+
+# ✅ Dataset activo: lo usan todas las páginas de la barra lateral
+if 'dataset' not in st.session_state:
+    st.info("Sube un Excel o abre un dataset del catálogo; después elige una página en la barra lateral.")
+    st.stop()
+
+df, huella_datos = dataset_activo()
+avisar_carga(df)
+col1, col2, col3 = st.columns(3)
+col1.metric("Transacciones", f"{len(df):,}")
+col2.metric("Clientes", f"{df['Customer ID'].nunique():,}")
+col3.metric("Establecimientos", f"{df['Establecimiento'].nunique():,}")
+st.success(f"Dataset activo: {st.session_state['dataset']['nombre']}. Elige una página en la barra lateral: "
+           "Dinámico, Gerencial, Reporte o Evolución.")
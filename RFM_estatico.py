@@ -1,9 +1,12 @@
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.cluster.hierarchy import linkage, dendrogram
-import numpy as np
+
+from rfm_core.campanas import base_campana, bloques_campana
+from rfm_core.controles import formulario_filtros
+from rfm_core.descargas import boton_descarga
+from rfm_core.filtros import filtrar_transacciones
+from rfm_core.huella import huella, huella_archivo
+from rfm_core.puntajes import calcular_rfm
 
 st.set_page_config(page_title="Dashboard RFM Avanzado", layout="wide")
 st.title("📊 Dashboard RFM Avanzado con Insights y Estrategias")
@@ -20,21 +23,13 @@ if uploaded_file:
     st.dataframe(df.head())
 
     # ✅ Filtros dinámicos
-    st.sidebar.header("🔍 Filtros")
-    establecimientos = st.sidebar.multiselect("Selecciona Establecimientos", options=df['Establecimiento'].unique(), default=list(df['Establecimiento'].unique()))
-    rango_hora = st.sidebar.slider("Selecciona Rango de Horas", 0, 23, (0, 23))
+    establecimientos, rango_hora, frecuencia = formulario_filtros(df, titulo="🔍 Filtros")
 
-    df_filtered = df[(df['Establecimiento'].isin(establecimientos)) & (df['Hr transacc'].between(rango_hora[0], rango_hora[1]))]
+    df_filtered = filtrar_transacciones(df, huella_archivo(uploaded_file), establecimientos, rango_hora)
 
     # ✅ Calcular RFM
     current_date = pd.to_datetime('2015-12-31')
-    rfm_df = df_filtered.groupby('Customer ID').agg({
-        'Order Date': lambda x: (current_date - x.max()).days,
-        'Customer ID': 'count',
-        'Sales': 'sum'
-    })
-    rfm_df.rename(columns={'Order Date': 'Recency', 'Customer ID': 'Frequency', 'Sales': 'Monetary'}, inplace=True)
-    rfm_df['Recency'] = rfm_df['Recency'].astype(int)
+    rfm_df = calcular_rfm(df_filtered, current_date, frecuencia=frecuencia)
 
     # ✅ Calcular cuantiles
     quantiles = rfm_df.quantile(q=[0.20, 0.40, 0.60, 0.80]).to_dict()
@@ -62,11 +57,15 @@ if uploaded_file:
     st.dataframe(rfm_df.head())
 
     # ✅ Botón de descarga
-    csv = rfm_df.to_csv().encode('utf-8')
-    st.download_button("⬇ Descargar Segmentación RFM", data=csv, file_name="rfm_segmentacion.csv", mime="text/csv")
+    clave_descarga = huella(huella_archivo(uploaded_file), establecimientos, rango_hora, frecuencia)
+    boton_descarga("Descargar Segmentación RFM", rfm_df, "rfm_segmentacion", clave_descarga, index=True)
 
     rfm_por_est = df_filtered.merge(rfm_df, on="Customer ID").groupby("Establecimiento")['RFM Score'].mean().sort_values()
 
+    # Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # ✅ 4 Gráficos: R, F, M y RFM Score por Establecimiento
     st.subheader("📈 Distribución de R, F, M y RFM Score por Establecimiento")
     fig, axes = plt.subplots(1, 4, figsize=(24, 5))
@@ -97,6 +96,8 @@ if uploaded_file:
         sns.heatmap(rfm_df[['Recency', 'Frequency', 'Monetary']].corr(), annot=True, cmap='coolwarm', ax=ax2)
         st.pyplot(fig2)
 
+    from scipy.cluster.hierarchy import linkage, dendrogram
+
     # ✅ Dendrograma Normal
     with col2:
         st.subheader("🔗 Dendrograma (Clusters RFM)")
@@ -135,18 +136,11 @@ if uploaded_file:
     plt.tight_layout()
     st.pyplot(fig_dist)
 
-    # ✅ Estrategias dinámicas
+    # ✅ Estrategias por cliente (segmento + establecimiento habitual + hora pico)
     st.subheader("📢 Estrategias Generadas")
-    estrategias = []
-    for est in establecimientos:
-        for hora in range(rango_hora[0], rango_hora[1]+1):
-            estrategias.append({
-                'Establecimiento': est,
-                'Hora': f"{hora}:00",
-                'Estrategia': f"Promoción especial en {est} durante {hora}:00 para clientes VIP"
-            })
-    df_estrategias = pd.DataFrame(estrategias)
-    st.dataframe(df_estrategias)
-
-    csv_estrategias = df_estrategias.to_csv(index=False).encode('utf-8')
-    st.download_button("⬇ Descargar Estrategias", data=csv_estrategias, file_name="estrategias_marketing.csv", mime="text/csv")
+    base = base_campana(df_filtered, rfm_df)
+    # Vista previa del primer bloque; la descarga arma la lista completa bloque a bloque
+    st.caption(f"Primeros {min(len(base), 100):,} de {len(base):,} clientes")
+    st.dataframe(next(bloques_campana(base, tamano_bloque=100), None))
+
+    boton_descarga("Descargar Estrategias", lambda: bloques_campana(base), "estrategias_marketing", clave_descarga)
@@ -1,8 +1,10 @@
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.cluster.hierarchy import linkage, dendrogram
+
+from rfm_core.controles import formulario_filtros
+from rfm_core.filtros import filtrar_transacciones
+from rfm_core.huella import huella_archivo
+from rfm_core.puntajes import calcular_rfm
 
 st.set_page_config(page_title="Dashboard RFM Estático", layout="wide")
 st.title("📊 Dashboard RFM Estático con Insights Estratégicos")
@@ -16,20 +18,13 @@ if uploaded_file:
     df['Hr transacc'] = pd.to_datetime(df['Hr transacc'], format='%H:%M:%S', errors='coerce').dt.hour
 
     # ✅ Filtros dinámicos
-    st.sidebar.header("Filtros")
-    establecimientos = st.sidebar.multiselect("Establecimientos", df['Establecimiento'].unique(), default=list(df['Establecimiento'].unique()))
-    rango_hora = st.sidebar.slider("Rango Horario", 0, 23, (0, 23))
+    establecimientos, rango_hora, frecuencia = formulario_filtros(df)
 
-    df_filtered = df[(df['Establecimiento'].isin(establecimientos)) & (df['Hr transacc'].between(rango_hora[0], rango_hora[1]))]
+    df_filtered = filtrar_transacciones(df, huella_archivo(uploaded_file), establecimientos, rango_hora)
 
     # ✅ Calcular RFM
     current_date = pd.to_datetime('2015-12-31')
-    rfm_df = df_filtered.groupby('Customer ID').agg({
-        'Order Date': lambda x: (current_date - x.max()).days,
-        'Customer ID': 'count',
-        'Sales': 'sum'
-    }).rename(columns={'Order Date': 'Recency', 'Customer ID': 'Frequency', 'Sales': 'Monetary'})
-    rfm_df['Recency'] = rfm_df['Recency'].astype(int)
+    rfm_df = calcular_rfm(df_filtered, current_date, frecuencia=frecuencia)
 
     # ✅ Generar puntajes RFM
     quantiles = rfm_df.quantile(q=[0.20, 0.40, 0.60, 0.80]).to_dict()
@@ -43,6 +38,10 @@ if uploaded_file:
     st.subheader("📌 Segmentación RFM")
     st.dataframe(rfm_df)
 
+    # Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # ✅ Distribuciones R, F, M
     st.subheader("Distribuciones R, F, M")
     fig, axes = plt.subplots(1, 3, figsize=(18, 5))
@@ -54,6 +53,8 @@ if uploaded_file:
     axes[2].set_title("Monetary")
     st.pyplot(fig)
 
+    from scipy.cluster.hierarchy import linkage, dendrogram
+
     # ✅ Panel 2x2: Correlación, Dendrograma, Ventas por Establecimiento y Ventas por Hora
     st.subheader("🔥 Panel Integrado: Correlación, Clusters y Ventas")
     fig_combined, axes2 = plt.subplots(2, 2, figsize=(14, 10))
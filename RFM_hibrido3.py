@@ -1,9 +1,12 @@
 import pandas as pd
 import streamlit as st
-import plotly.express as px
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.cluster.hierarchy import linkage, dendrogram
+
+from rfm_core.campanas import base_campana, bloques_campana
+from rfm_core.controles import formulario_filtros
+from rfm_core.descargas import boton_descarga
+from rfm_core.filtros import filtrar_transacciones
+from rfm_core.huella import huella, huella_archivo
+from rfm_core.puntajes import calcular_rfm
 
 st.set_page_config(page_title="Dashboard RFM Híbrido", layout="wide")
 st.title("📊 Dashboard RFM Híbrido (Interactivo + Estático)")
@@ -17,20 +20,13 @@ if uploaded_file:
     df['Hr transacc'] = pd.to_datetime(df['Hr transacc'], format='%H:%M:%S', errors='coerce').dt.hour
 
     # ✅ Filtros
-    st.sidebar.header("Filtros")
-    establecimientos = st.sidebar.multiselect("Establecimientos", df['Establecimiento'].unique(), default=list(df['Establecimiento'].unique()))
-    rango_hora = st.sidebar.slider("Rango Horario", 0, 23, (0, 23))
+    establecimientos, rango_hora, frecuencia = formulario_filtros(df)
 
-    df_filtered = df[(df['Establecimiento'].isin(establecimientos)) & (df['Hr transacc'].between(rango_hora[0], rango_hora[1]))]
+    df_filtered = filtrar_transacciones(df, huella_archivo(uploaded_file), establecimientos, rango_hora)
 
     # ✅ RFM
     current_date = pd.to_datetime('2015-12-31')
-    rfm_df = df_filtered.groupby('Customer ID').agg({
-        'Order Date': lambda x: (current_date - x.max()).days,
-        'Customer ID': 'count',
-        'Sales': 'sum'
-    }).rename(columns={'Order Date': 'Recency', 'Customer ID': 'Frequency', 'Sales': 'Monetary'})
-    rfm_df['Recency'] = rfm_df['Recency'].astype(int)
+    rfm_df = calcular_rfm(df_filtered, current_date, frecuencia=frecuencia)
 
     # ✅ Scores
     quantiles = rfm_df.quantile(q=[0.20, 0.40, 0.60, 0.80]).to_dict()
@@ -44,6 +40,9 @@ if uploaded_file:
     st.subheader("📌 Segmentación RFM")
     st.dataframe(rfm_df)
 
+    # Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+    import plotly.express as px
+
     # ✅ Distribuciones interactivas R, F, M
     st.subheader("📊 Distribuciones R, F, M (Interactivas)")
     col1, col2, col3 = st.columns(3)
@@ -72,6 +71,10 @@ if uploaded_file:
                          hover_data=['Establecimiento'])
     st.plotly_chart(fig_map, use_container_width=True)
 
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from scipy.cluster.hierarchy import linkage, dendrogram
+
     # ✅ Panel Estático 2x2
     st.subheader("🔥 Panel 2x2: Correlación, Clusters y Ventas")
     fig_combined, axes2 = plt.subplots(2, 2, figsize=(14, 10))
@@ -132,13 +135,10 @@ if uploaded_file:
 
 
 
-    # ✅ Estrategias dinámicas
+    # ✅ Estrategias por cliente (segmento + establecimiento habitual + hora pico)
     st.subheader("📢 Estrategias sugeridas")
-    estrategias = []
-    for est in establecimientos:
-        for hora in range(rango_hora[0], rango_hora[1]+1):
-            estrategias.append({'Establecimiento': est, 'Hora': f"{hora}:00", 'Estrategia': f"Promoción activa en {est} durante {hora}:00"})
-    df_estrategias = pd.DataFrame(estrategias)
-    st.dataframe(df_estrategias)
-    csv_estrategias = df_estrategias.to_csv(index=False).encode('utf-8')
-    st.download_button("⬇ Descargar Estrategias", data=csv_estrategias, file_name="estrategias.csv", mime="text/csv")
+    base = base_campana(df_filtered, rfm_df)
+    # Vista previa del primer bloque; la descarga arma la lista completa bloque a bloque
+    st.caption(f"Primeros {min(len(base), 100):,} de {len(base):,} clientes")
+    st.dataframe(next(bloques_campana(base, tamano_bloque=100), None))
+    boton_descarga("Descargar Estrategias", lambda: bloques_campana(base), "estrategias", huella(huella_archivo(uploaded_file), establecimientos, rango_hora, frecuencia))
@@ -1,6 +1,9 @@
 import pandas as pd
 import streamlit as st
-import plotly.express as px
+
+from rfm_core.controles import formulario_filtros
+from rfm_core.filtros import filtrar_transacciones
+from rfm_core.huella import huella_archivo
 
 st.set_page_config(page_title="Dashboard RFM Interactivo", layout="wide")
 st.title("📊 Dashboard RFM con Gráficos Interactivos")
@@ -15,11 +18,12 @@ if uploaded_file:
     st.subheader("Vista previa de datos")
     st.dataframe(df.head())
 
-    st.sidebar.header("Filtros")
-    establecimientos = st.sidebar.multiselect("Establecimientos", df['Establecimiento'].unique(), default=list(df['Establecimiento'].unique()))
-    rango_hora = st.sidebar.slider("Rango horario", 0, 23, (0, 23))
+    establecimientos, rango_hora, _ = formulario_filtros(df, frecuencia_predeterminada=None)
+
+    df_filtered = filtrar_transacciones(df, huella_archivo(uploaded_file), establecimientos, rango_hora)
 
-    df_filtered = df[(df['Establecimiento'].isin(establecimientos)) & (df['Hr transacc'].between(rango_hora[0], rango_hora[1]))]
+    # Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+    import plotly.express as px
 
     # Ventas por Establecimiento
     st.subheader("🏪 Ventas por Establecimiento (%)")
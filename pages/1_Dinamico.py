@@ -0,0 +1,126 @@
+import streamlit as st
+
+from rfm_core.campanas import bloques_campana
+from rfm_core.controles import formulario_filtros, fragmento
+from rfm_core.datos import DatosFiltrados, dataset_activo
+from rfm_core.descargas import boton_descarga
+from rfm_core.graficos import dispersion, histograma
+
+# Configuración de la página
+st.set_page_config(page_title="Dashboard RFM Dinámico", layout="wide")
+st.title("📊 Dashboard RFM Dinámico con Gráficos Interactivos")
+
+# ✅ Dataset elegido en la página de inicio (una sola copia para todas las páginas)
+df, huella_datos = dataset_activo()
+
+# ✅ Filtros en la barra lateral
+establecimientos, rango_hora, frecuencia = formulario_filtros(df)
+
+# RFM y agregados del dataset filtrado, compartidos con las demás páginas (caché y motor de consultas)
+datos = DatosFiltrados(df, huella_datos, establecimientos, rango_hora, frecuencia)
+
+# ✅ Cálculo de RFM y puntuaciones (mismos cortes que r_score/fm_score)
+rfm_df = datos.rfm()
+
+st.subheader("📌 Segmentación RFM")
+st.dataframe(rfm_df)
+
+# Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+import plotly.express as px
+
+# ✅ Distribuciones R, F, M
+st.subheader("📊 Distribuciones R, F, M")
+col1, col2, col3 = st.columns(3)
+for columna, metrica in zip((col1, col2, col3), ['Recency', 'Frequency', 'Monetary']):
+    with columna:
+        # Un valor por cliente: con muchos clientes se envían los conteos por intervalo
+        st.plotly_chart(datos.figura('rfm_segmentado', 'dinamico', 'histograma', metrica, construir=lambda: histograma(
+            rfm_df, metrica, nbins=20, title=f"Distribución {metrica}")), use_container_width=True)
+
+# ✅ Ventas por Establecimiento (Dinámico)
+st.subheader("🏪 Ventas por Establecimiento")
+ventas_est = datos.ventas('Establecimiento')
+
+# Los tipos de gráfico viven en fragmentos: cambiarlos solo redibuja su gráfico con los agregados ya calculados
+@fragmento
+def grafico_establecimientos(ventas_est, datos):
+    chart_type_est = st.selectbox("Gráfico para Ventas por Establecimiento", ["Barras", "Pie", "Sunburst"],
+                                  key="chart_type_est")
+
+    def construir():
+        if chart_type_est == "Barras":
+            return px.bar(ventas_est, x='Establecimiento', y='Sales', color='Establecimiento', text='Sales', title="Ventas por Establecimiento")
+        elif chart_type_est == "Pie":
+            return px.pie(ventas_est, names='Establecimiento', values='Sales', title="Participación por Establecimiento", hole=0.3)
+        elif chart_type_est == "Sunburst" and 'Categoria' in datos.consultas.columnas:
+            return px.sunburst(datos.ventas('Establecimiento', 'Categoria'), path=['Establecimiento', 'Categoria'],
+                               values='Sales', title="Ventas por Jerarquía")
+        return px.bar(ventas_est, x='Establecimiento', y='Sales', color='Establecimiento', title="Ventas por Establecimiento")
+
+    st.plotly_chart(datos.figura('ventas', 'dinamico', 'establecimiento', chart_type_est,
+                                 construir=construir), use_container_width=True)
+
+grafico_establecimientos(ventas_est, datos)
+
+# ✅ Mapa Competitivo (Dinámico)
+st.subheader("🔥 Mapa Competitivo")
+df_mapa = datos.mapa()
+
+@fragmento
+def grafico_mapa(df_mapa):
+    chart_type_map = st.selectbox("Gráfico para Mapa Competitivo", ["Burbujas", "Barras"], key="chart_type_map")
+
+    def construir():
+        if chart_type_map == "Burbujas":
+            return dispersion(df_mapa, 'Monetary', 'Margen Estimado', size='RFM Score', color='Establecimiento',
+                              hover_name='Establecimiento', title="Mapa Competitivo (Burbujas)")
+        # Barras
+        return px.bar(df_mapa, x='Establecimiento', y='Monetary', color='Establecimiento', text='Margen Estimado',
+                      title="Mapa Competitivo (Barras)")
+
+    st.plotly_chart(datos.figura('mapa', 'dinamico', chart_type_map, construir=construir), use_container_width=True)
+
+grafico_mapa(df_mapa)
+
+# ✅ Ventas por Hora (Dinámico)
+st.subheader("📊 Ventas por Hora por Establecimiento")
+ventas_hora_det = datos.ventas('Hr transacc', 'Establecimiento')
+
+@fragmento
+def grafico_horas(ventas_hora_det):
+    chart_type_hora = st.selectbox("Gráfico para Ventas por Hora", ["Línea", "Barras", "Burbujas"], key="chart_type_hora")
+
+    def construir():
+        if chart_type_hora == "Línea":
+            fig_hora = px.line(ventas_hora_det, x='Hr transacc', y='Sales', color='Establecimiento', title="Ventas por Hora (Línea)")
+        elif chart_type_hora == "Barras":
+            fig_hora = px.bar(ventas_hora_det, x='Hr transacc', y='Sales', color='Establecimiento', barmode='group', title="Ventas por Hora (Barras)")
+        else:  # Burbujas
+            fig_hora = dispersion(ventas_hora_det, 'Hr transacc', 'Sales', color='Establecimiento', size='Sales',
+                                  hover_name='Establecimiento', title="Ventas por Hora (Burbujas)")
+            fig_hora.update_traces(marker=dict(opacity=0.7, line=dict(width=1, color='DarkSlateGrey')))
+
+        fig_hora.update_layout(xaxis_title="Hora", yaxis_title="Ventas", legend_title="Establecimiento")
+        return fig_hora
+
+    st.plotly_chart(datos.figura('ventas', 'dinamico', 'hora', chart_type_hora, construir=construir),
+                    use_container_width=True)
+
+grafico_horas(ventas_hora_det)
+
+# ✅ Insight: Horas Pico vs Valle
+st.subheader("🔥 Insight: Horas Pico y Horas Valle")
+ventas_hora = datos.ventas_hora()
+horas_pico = ventas_hora.sort_values(ascending=False).head(3)
+horas_valle = ventas_hora.sort_values(ascending=True).head(3)
+st.write(f"Horas Pico: {', '.join(str(h)+':00' for h in horas_pico.index)}")
+st.write(f"Horas Valle: {', '.join(str(h)+':00' for h in horas_valle.index)}")
+st.info("💡 Estrategia: Refuerza inventario en horas pico y lanza promociones en horas valle.")
+
+# ✅ Estrategias por cliente (segmento + establecimiento habitual + hora pico)
+st.subheader("📢 Estrategias sugeridas")
+base = datos.base_campana()
+# Vista previa del primer bloque; la descarga arma la lista completa bloque a bloque
+st.caption(f"Primeros {min(len(base), 100):,} de {len(base):,} clientes")
+st.dataframe(next(bloques_campana(base, tamano_bloque=100), None))
+boton_descarga("Descargar Estrategias", lambda: bloques_campana(base), "estrategias", datos.clave('base_campana'))
@@ -0,0 +1,78 @@
+import streamlit as st
+
+from rfm_core.campanas import bloques_campana
+from rfm_core.controles import formulario_filtros
+from rfm_core.datos import DatosFiltrados, dataset_activo
+from rfm_core.descargas import boton_descarga
+from rfm_core.graficos import dispersion
+
+st.set_page_config(page_title="Dashboard RFM Gerencial", layout="wide")
+st.title("📊 Dashboard RFM Gerencial - Análisis Estratégico")
+
+# ✅ Dataset elegido en la página de inicio (una sola copia para todas las páginas)
+df, huella_datos = dataset_activo()
+
+# ✅ Filtros dinámicos
+establecimientos, rango_hora, frecuencia = formulario_filtros(df)
+
+# RFM y agregados del dataset filtrado, compartidos con las demás páginas (caché y motor de consultas)
+datos = DatosFiltrados(df, huella_datos, establecimientos, rango_hora, frecuencia)
+
+# Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+import plotly.express as px
+
+# ✅ Gráficos Interactivos
+st.subheader("📊 Visualizaciones Gerenciales")
+
+# 1. Barras agrupadas (Ventas por Hora y Establecimiento)
+st.markdown("### Ventas por Hora por Establecimiento")
+ventas_hora_det = datos.ventas('Hr transacc', 'Establecimiento')
+fig_bar = px.bar(ventas_hora_det, x='Hr transacc', y='Sales', color='Establecimiento', barmode='group',
+                 title="Ventas por Hora por Establecimiento")
+st.plotly_chart(fig_bar, use_container_width=True)
+
+# 2. Pie Chart (Participación por Establecimiento)
+st.markdown("### Participación de Ventas por Establecimiento")
+ventas_est = datos.ventas('Establecimiento')
+fig_pie = px.pie(ventas_est, names='Establecimiento', values='Sales', title="Participación por Establecimiento", hole=0.3)
+st.plotly_chart(fig_pie, use_container_width=True)
+
+# 3. Mapa Competitivo (Scatter Burbujas)
+st.markdown("### Mapa Competitivo: Ventas vs Margen vs RFM Score")
+# El mapa competitivo usa el RFM Score de cada cliente
+df_mapa = datos.mapa()
+fig_scatter = datos.figura('mapa', 'gerencial', construir=lambda: dispersion(
+    df_mapa, 'Monetary', 'Margen Estimado', size='RFM Score', color='Establecimiento',
+    hover_name='Establecimiento', size_max=60, title="Mapa Competitivo (Ventas vs Margen vs RFM Score)"))
+st.plotly_chart(fig_scatter, use_container_width=True)
+
+# 4. Sunburst (Jerarquía)
+st.markdown("### Ventas por Jerarquía: Establecimiento → Categoría")
+if 'Categoria' in datos.consultas.columnas:
+    fig_sunburst = px.sunburst(datos.ventas('Establecimiento', 'Categoria'), path=['Establecimiento','Categoria'], values='Sales',
+                               title="Ventas por Jerarquía")
+    st.plotly_chart(fig_sunburst, use_container_width=True)
+
+# 5. Heatmap (Horas vs Establecimiento)
+st.markdown("### Mapa de Calor: Ventas por Hora y Establecimiento")
+# Sobre las ventas ya sumadas por hora y establecimiento: cada celda suma las mismas ventas
+fig_heatmap = px.density_heatmap(ventas_hora_det, x='Hr transacc', y='Establecimiento', z='Sales', nbinsx=24,
+                                 title='Mapa de Calor: Horas vs Establecimiento', color_continuous_scale='Viridis')
+st.plotly_chart(fig_heatmap, use_container_width=True)
+
+# ✅ Insight: Horas Pico vs Valle
+st.subheader("🔥 Insight: Horas de Mayor y Menor Venta")
+ventas_hora = datos.ventas_hora()
+horas_pico = ventas_hora.sort_values(ascending=False).head(3)
+horas_valle = ventas_hora.sort_values(ascending=True).head(3)
+st.write(f"**Horas Pico (Mayor Venta):** {', '.join(str(h)+':00' for h in horas_pico.index)}")
+st.write(f"**Horas Valle (Menor Venta):** {', '.join(str(h)+':00' for h in horas_valle.index)}")
+st.info("💡 Estrategia: Refuerza inventario y personal en horas pico. Lanza promociones en horas valle.")
+
+# ✅ Estrategias por cliente (segmento + establecimiento habitual + hora pico)
+st.subheader("📢 Estrategias sugeridas")
+base = datos.base_campana()
+# Vista previa del primer bloque; la descarga arma la lista completa bloque a bloque
+st.caption(f"Primeros {min(len(base), 100):,} de {len(base):,} clientes")
+st.dataframe(next(bloques_campana(base, tamano_bloque=100), None))
+boton_descarga("Descargar Estrategias", lambda: bloques_campana(base), "estrategias", datos.clave('base_campana'))
@@ -0,0 +1,228 @@
+import pandas as pd
+import streamlit as st
+
+from rfm_core.cache import cache_compartida, clave_cache
+from rfm_core.campanas import bloques_campana, resumen_campana
+from rfm_core.clusters import MAX_CLIENTES_WARD, estandarizar, evaluar_k, perfil_clusters, segmentar_kmeans
+from rfm_core.controles import en_segundo_plano, formulario_filtros
+from rfm_core.datos import DatosFiltrados, dataset_activo
+from rfm_core.descargas import boton_descarga, boton_reporte
+from rfm_core.graficos import dispersion, figura, histograma
+from rfm_core.huella import huella
+from rfm_core.puntajes import resumen_segmentos
+from rfm_core.reporte_excel import reporte_excel_bytes
+from rfm_core.reporte_html import construir_reporte_html, figura_panel, guardar_reporte_html
+from rfm_core.tareas import por_etapas
+
+st.set_page_config(page_title="Dashboard RFM Híbrido", layout="wide")
+st.title("📊 Dashboard RFM Híbrido (Interactivo + Estático)")
+
+# ✅ Dataset elegido en la página de inicio (una sola copia para todas las páginas)
+# RFM, clusters y panel corren en el pool de trabajo con su progreso; al cambiar los filtros a mitad
+# de un cálculo, el anterior se cancela en su siguiente etapa
+cache = cache_compartida()
+df, huella_datos = dataset_activo()
+
+# ✅ Filtros
+establecimientos, rango_hora, frecuencia = formulario_filtros(df)
+
+# RFM y agregados del dataset filtrado, compartidos con las demás páginas (caché y motor de consultas)
+datos = DatosFiltrados(df, huella_datos, establecimientos, rango_hora, frecuencia)
+estado_filtros = datos.estado_filtros
+clave_filtros = huella(huella_datos, *estado_filtros)
+
+# ✅ RFM y Scores
+rfm_df = en_segundo_plano('rfm', clave_filtros, lambda tarea: datos.rfm(), texto="Calculando RFM...")
+
+# ✅ Clusters: Ward (dendrograma, memoria cuadrática) o K-means mini-batch (millones de clientes)
+st.sidebar.header("Clusters")
+if len(rfm_df) > MAX_CLIENTES_WARD:
+    # Ward necesita la matriz de distancias n x n: con tantos clientes solo se ofrece K-means
+    st.sidebar.info(f"{len(rfm_df):,} clientes (más de {MAX_CLIENTES_WARD:,}): se usa K-means, "
+                    "Ward no es práctico con memoria cuadrática.")
+    metodo_clusters = "K-means"
+else:
+    metodo_clusters = st.sidebar.radio("Método", ["Jerárquico (Ward)", "K-means"])
+kmeans = metodo_clusters == "K-means"
+estado_clusters = estado_filtros
+if kmeans:
+    k = st.sidebar.slider("Número de clusters (k)", 2, 10, 4)
+    logaritmo = st.sidebar.checkbox("Escala logarítmica en R, F, M", value=True)
+    estado_clusters = (*estado_filtros, k, logaritmo)
+    cluster, evaluacion = en_segundo_plano('kmeans', huella(clave_filtros, k, logaritmo), por_etapas([
+        ("K-means...", lambda: cache.obtener(clave_cache('kmeans', huella_datos, *estado_clusters),
+                                            lambda: segmentar_kmeans(rfm_df, k, logaritmo))),
+        ("Evaluando k (codo y silueta)...", lambda: cache.obtener(
+            clave_cache('evaluar_k', huella_datos, *estado_filtros, logaritmo),
+            lambda: evaluar_k(estandarizar(rfm_df, logaritmo)))),
+    ]), texto="Calculando clusters K-means...")
+    # Sin asignar sobre rfm_df: es el mismo DataFrame de la caché
+    rfm_df = rfm_df.assign(Cluster=cluster)
+    perfil = perfil_clusters(rfm_df)
+clave_clusters = huella(huella_datos, *estado_clusters)
+
+st.subheader("📌 Segmentación RFM")
+st.dataframe(rfm_df)
+
+# Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+import plotly.express as px
+
+# ✅ Distribuciones interactivas R, F, M
+st.subheader("📊 Distribuciones R, F, M (Interactivas)")
+col1, col2, col3 = st.columns(3)
+for columna, metrica in zip((col1, col2, col3), ['Recency', 'Frequency', 'Monetary']):
+    with columna:
+        # Un valor por cliente: con muchos clientes se envían los conteos por intervalo
+        st.plotly_chart(datos.figura('rfm_segmentado', 'reporte', 'histograma', metrica, construir=lambda: histograma(
+            rfm_df, metrica, nbins=20, title=metrica)), use_container_width=True)
+
+# ✅ Distribución de Establecimientos por RFM Score
+st.subheader("🏪 Distribución de Establecimientos por RFM Score")
+rfm_con_est = datos.clientes_por_establecimiento()
+if kmeans:
+    rfm_con_est = rfm_con_est.join(rfm_df['Cluster'], on='Customer ID')
+rfm_establecimiento = rfm_con_est.groupby('Establecimiento')['RFM Score'].mean().reset_index()
+fig_rfm_est = px.bar(
+    rfm_establecimiento,
+    x='Establecimiento',
+    y='RFM Score',
+    color='Establecimiento',
+    text=rfm_establecimiento['RFM Score'].round(2),
+    title="Promedio de RFM Score por Establecimiento"
+)
+fig_rfm_est.update_layout(xaxis_title="Establecimiento", yaxis_title="Promedio RFM Score", showlegend=False)
+st.plotly_chart(fig_rfm_est, use_container_width=True)
+
+# ✅ Ventas por Establecimiento interactivo (%)
+st.subheader("🏪 Ventas por Establecimiento (%)")
+ventas_est = datos.ventas('Establecimiento').set_index('Establecimiento')['Sales']
+ventas_pct = (ventas_est / ventas_est.sum()) * 100
+fig_est = px.bar(x=ventas_pct.index, y=ventas_pct.values, color=ventas_pct.index,
+                 text=ventas_pct.values.round(2),
+                 title="Ventas por Establecimiento", labels={'x': 'Establecimiento', 'y': '% Ventas'})
+st.plotly_chart(fig_est, use_container_width=True)
+
+# ✅ Insight: Mapa Competitivo
+st.subheader("🔥 Insight: Mapa Competitivo (Ventas vs Margen vs RFM Score)")
+df_mapa = datos.mapa()
+fig_map = datos.figura('mapa', 'reporte', construir=lambda: dispersion(
+    df_mapa, 'Monetary', 'Margen Estimado', size='RFM Score', color='Establecimiento', title="Mapa Competitivo",
+    labels={'Monetary': 'Ventas', 'Margen Estimado': 'Margen'}, hover_data=['Establecimiento']))
+st.plotly_chart(fig_map, use_container_width=True)
+
+# ✅ Panel Estático 2x2
+st.subheader("🔥 Panel 2x2: Correlación, Clusters y Ventas")
+ventas_hora = datos.ventas_hora()
+
+def calcular_linkage():
+    if kmeans:
+        return None
+    from scipy.cluster.hierarchy import linkage
+    return cache.obtener(clave_cache('linkage_ward', huella_datos, *estado_filtros),
+                         lambda: linkage(rfm_df[['Recency', 'Frequency', 'Monetary']], method='ward'))
+
+# Se renderiza una sola vez: la misma imagen se muestra y se incrusta en los reportes
+_, panel_png = en_segundo_plano('panel', clave_clusters, por_etapas([
+    ("Clusters jerárquicos (Ward)...", calcular_linkage),
+    ("Dibujando panel...", lambda: cache.obtener(
+        clave_cache('panel_2x2', huella_datos, *estado_clusters),
+        lambda: figura_panel(rfm_df, calcular_linkage(), ventas_pct, ventas_hora))),
+]), texto="Calculando clusters...")
+st.image(panel_png)
+
+# ✅ Segmentación K-means: elección de k, clusters y estrategia por cluster
+if kmeans:
+    st.subheader("🧩 Segmentación K-means")
+    col1, col2 = st.columns(2)
+    with col1:
+        fig_codo = px.line(evaluacion, x='k', y='Inercia', markers=True, title="Método del codo (muestra)")
+        fig_codo.add_vline(x=k, line_dash='dash')
+        st.plotly_chart(fig_codo, use_container_width=True)
+    with col2:
+        fig_silueta = px.line(evaluacion, x='k', y='Silueta', markers=True, title="Silueta media (muestra)")
+        fig_silueta.add_vline(x=k, line_dash='dash')
+        st.plotly_chart(fig_silueta, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        # WebGL y muestra por cluster según el presupuesto de la figura: el gráfico no crece con la base
+        st.plotly_chart(figura((clave_clusters, 'dispersion'), lambda: dispersion(
+            rfm_df, 'Frequency', 'Monetary', color='Cluster', log_x=True, log_y=True, opacity=0.6,
+            hover_data=['Recency', 'Segment'], category_orders={'Cluster': list(cluster.cat.categories)},
+            title="Clusters: Frequency vs Monetary")), use_container_width=True)
+    with col2:
+        clientes_cluster = rfm_con_est.groupby(['Establecimiento', 'Cluster'], observed=True).size()
+        st.plotly_chart(px.bar(clientes_cluster.reset_index(name='Clientes'), x='Establecimiento',
+                               y='Clientes', color='Cluster', title="Clientes por Cluster y Establecimiento",
+                               category_orders={'Cluster': list(cluster.cat.categories)}),
+                        use_container_width=True)
+
+    st.write("Estrategias por cluster (según su segmento RFM predominante):")
+    st.dataframe(perfil)
+    boton_descarga("Descargar Estrategias por Cluster", perfil, "estrategias_clusters", clave_clusters)
+
+# ✅ Insight: Horas Pico vs Valle
+st.subheader("🔥 Insight: Horas de Mayor y Menor Venta")
+horas_pico = ventas_hora.sort_values(ascending=False).head(3)
+horas_valle = ventas_hora.sort_values(ascending=True).head(3)
+st.write(f"Horas de Mayor Venta (Pico): {', '.join(str(h)+':00' for h in horas_pico.index)}")
+st.write(f"Horas de Menor Venta (Valle): {', '.join(str(h)+':00' for h in horas_valle.index)}")
+st.info("💡 Acción: Refuerza inventario en horas pico y lanza promociones en horas valle.")
+
+# ✅ Ventas por Establecimiento por Fecha (nuevo gráfico)
+st.subheader("📊 Ventas por Establecimiento por Fecha")
+ventas_fecha = datos.ventas('Fecha', 'Establecimiento')
+fig_fecha = px.line(
+    ventas_fecha,
+    x='Fecha',
+    y='Sales',
+    color='Establecimiento',
+    markers=True,
+    title="Evolución de Ventas por Establecimiento"
+)
+fig_fecha.update_layout(xaxis_title="Fecha", yaxis_title="Monto de Ventas", legend_title="Establecimiento")
+st.plotly_chart(fig_fecha, use_container_width=True)
+
+# ✅ Estrategias por cliente (segmento + establecimiento habitual + hora pico)
+st.subheader("📢 Estrategias sugeridas")
+base = datos.base_campana()
+# Vista previa del primer bloque; la descarga arma la lista completa bloque a bloque
+st.caption(f"Primeros {min(len(base), 100):,} de {len(base):,} clientes")
+st.dataframe(next(bloques_campana(base, tamano_bloque=100), None))
+boton_descarga("Descargar Estrategias", lambda: bloques_campana(base), "estrategias", datos.clave('base_campana'))
+# Los reportes llevan la campaña resumida: clientes por segmento y establecimiento, con oferta y canal
+df_estrategias = resumen_campana(base)
+
+# ✅ Reporte Excel (todas las tablas + panel estático)
+st.subheader("📑 Reporte Excel")
+def construir_reporte(tarea):
+    hojas = {
+        'RFM': rfm_df.reset_index(),
+        'Segmentos': resumen_segmentos(rfm_df),
+        'Ventas por establecimiento': pd.DataFrame({'Sales': ventas_est, '% Ventas': ventas_pct}).reset_index(),
+        'Ventas por hora': ventas_hora.reset_index(),
+        'Estrategias': df_estrategias,
+    }
+    if kmeans:
+        hojas['Clusters'] = perfil
+    return reporte_excel_bytes(hojas, {'Panel': panel_png}, tarea=tarea)
+
+boton_reporte("Reporte Excel", construir_reporte, "reporte_rfm.xlsx",
+              "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", clave_clusters)
+
+# ✅ Reporte HTML autocontenido (se guarda en disco en segundo plano)
+st.subheader("🗂 Reporte HTML")
+nombre_html = f"reporte_rfm_{clave_clusters[:12]}.html"
+
+def construir_reporte_html_archivo(tarea):
+    tablas = {'Resumen por Segmento': resumen_segmentos(rfm_df), 'Estrategias sugeridas': df_estrategias}
+    if kmeans:
+        tablas['Estrategias por cluster'] = perfil
+    contenido = construir_reporte_html("Reporte RFM", panel_png, rfm_df, horas_pico, horas_valle,
+                                       tablas, tarea=tarea)
+    tarea.avanzar(0.95, "Guardando archivo")
+    ruta = guardar_reporte_html(contenido, nombre_html)
+    tarea.avanzar(1.0, f"Guardado en {ruta}")
+    return contenido.encode('utf-8')
+
+boton_reporte("Reporte HTML", construir_reporte_html_archivo, nombre_html, "text/html", clave_clusters)
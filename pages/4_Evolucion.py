@@ -0,0 +1,113 @@
+import pandas as pd
+import streamlit as st
+
+from rfm_core.campanas import bloques_campana
+from rfm_core.controles import formulario_filtros, fragmento
+from rfm_core.datos import DatosFiltrados, dataset_activo
+from rfm_core.descargas import boton_descarga
+from rfm_core.graficos import dispersion, histograma
+from rfm_core.historia import fechas_fin_de_mes, historia_rfm
+from rfm_core.migracion import codigos_por_periodo, matriz_migracion
+
+st.set_page_config(page_title="Dashboard RFM Interactivo", layout="wide")
+st.title("📊 Dashboard RFM Interactivo con Insights Estratégicos")
+
+# ✅ Dataset elegido en la página de inicio (una sola copia para todas las páginas)
+df, huella_datos = dataset_activo()
+
+# ✅ Filtros
+establecimientos, rango_hora, frecuencia = formulario_filtros(df)
+
+# RFM y agregados del dataset filtrado, compartidos con las demás páginas (caché y motor de consultas)
+datos = DatosFiltrados(df, huella_datos, establecimientos, rango_hora, frecuencia)
+
+# ✅ RFM y Scores (mismos cortes que r_score/fm_score)
+rfm_df = datos.rfm()
+
+# Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+import plotly.express as px
+
+# ✅ Distribuciones R, F, M
+st.subheader("Distribuciones R, F, M")
+col1, col2, col3 = st.columns(3)
+for columna, metrica in zip((col1, col2, col3), ['Recency', 'Frequency', 'Monetary']):
+    with columna:
+        # Un valor por cliente: con muchos clientes se envían los conteos por intervalo
+        st.plotly_chart(datos.figura('rfm_segmentado', 'evolucion', 'histograma', metrica, construir=lambda: histograma(
+            rfm_df, metrica, nbins=20, title=metrica)), use_container_width=True)
+
+# ✅ Ventas por Establecimiento
+st.subheader("🏪 Ventas por Establecimiento (%)")
+ventas_est = datos.ventas('Establecimiento').set_index('Establecimiento')['Sales']
+ventas_pct = (ventas_est / ventas_est.sum()) * 100
+fig_est = px.bar(x=ventas_pct.index, y=ventas_pct.values, color=ventas_pct.index, text=ventas_pct.values.round(2),
+                 title="Ventas por Establecimiento", labels={'x': 'Establecimiento', 'y': '% Ventas'})
+st.plotly_chart(fig_est, use_container_width=True)
+
+# ✅ Insight: Mapa Competitivo
+st.subheader("🔥 Insight: Mapa Competitivo")
+df_mapa = datos.mapa()
+fig_map = datos.figura('mapa', 'evolucion', construir=lambda: dispersion(
+    df_mapa, 'Monetary', 'Margen Estimado', size='RFM Score', color='Establecimiento', title="Mapa Competitivo",
+    labels={'Monetary': 'Ventas', 'Margen Estimado': 'Margen'}, hover_data=['Establecimiento']))
+st.plotly_chart(fig_map, use_container_width=True)
+
+# ✅ Ventas por Hora Global (en barras)
+st.subheader("📊 Ventas por Hora (Global)")
+ventas_hora = datos.ventas('Hr transacc', 'Establecimiento')
+fig_hora = px.bar(ventas_hora, x='Hr transacc', y='Sales', color='Establecimiento', barmode='group',
+                title="Ventas por Hora por Establecimiento")
+fig_hora.update_xaxes(title_text="Hora")
+fig_hora.update_yaxes(title_text="Ventas")
+st.plotly_chart(fig_hora, use_container_width=True)
+
+# ✅ Evolución RFM (foto al cierre de cada mes)
+st.subheader("📈 Evolución RFM por Mes")
+def calcular_historia():
+    df_filtered = datos.transacciones()
+    return historia_rfm(df_filtered, fechas_fin_de_mes(df_filtered), frecuencia)
+
+historia = datos.en_cache('historia_rfm', calcular_historia)
+evolucion = historia.groupby('Periodo').agg(Clientes=('Customer ID', 'size'), Recency=('Recency', 'mean'),
+                                            Frequency=('Frequency', 'mean'), Monetary=('Monetary', 'mean')).reset_index()
+
+# La métrica y los periodos viven en fragmentos: cambiarlos no rehace el RFM ni la historia
+@fragmento
+def grafico_evolucion(evolucion):
+    metrica_evolucion = st.selectbox("Métrica", ['Recency', 'Frequency', 'Monetary', 'Clientes'], key="metrica_evolucion")
+    st.plotly_chart(px.line(evolucion, x='Periodo', y=metrica_evolucion, markers=True,
+                            title=f"{metrica_evolucion} promedio por cierre de mes"), use_container_width=True)
+
+grafico_evolucion(evolucion)
+
+# ✅ Migración de segmentos entre dos cierres de mes
+st.subheader("🔀 Migración de Segmentos")
+periodos = sorted(historia['Periodo'].unique())
+if len(periodos) >= 2:
+    codigos_historia = datos.en_cache('segmentos_historia', lambda: codigos_por_periodo(historia))
+
+    @fragmento
+    def grafico_migracion(historia, codigos_historia, periodos):
+        col_origen, col_destino = st.columns(2)
+        formato_periodo = lambda p: pd.Timestamp(p).strftime('%Y-%m')
+        periodo_origen = col_origen.selectbox("Desde", periodos[:-1], index=len(periodos) - 2,
+                                              format_func=formato_periodo)
+        # Solo cierres posteriores al de origen: la migración va hacia adelante en el tiempo
+        posteriores = [p for p in periodos if p > periodo_origen]
+        periodo_destino = col_destino.selectbox("Hacia", posteriores, index=len(posteriores) - 1,
+                                                format_func=formato_periodo)
+        migracion_clientes, migracion_ventas = matriz_migracion(historia, codigos_historia, periodo_origen, periodo_destino)
+        col_origen.plotly_chart(px.imshow(migracion_clientes, text_auto=True, color_continuous_scale='Blues',
+                                          title="Clientes"), use_container_width=True)
+        col_destino.plotly_chart(px.imshow(migracion_ventas.round(0), text_auto=True, color_continuous_scale='Greens',
+                                           title="Ventas entre ambos cortes"), use_container_width=True)
+
+    grafico_migracion(historia, codigos_historia, periodos)
+
+# ✅ Estrategias por cliente (segmento + establecimiento habitual + hora pico)
+st.subheader("📢 Estrategias sugeridas")
+base = datos.base_campana()
+# Vista previa del primer bloque; la descarga arma la lista completa bloque a bloque
+st.caption(f"Primeros {min(len(base), 100):,} de {len(base):,} clientes")
+st.dataframe(next(bloques_campana(base, tamano_bloque=100), None))
+boton_descarga("Descargar Estrategias", lambda: bloques_campana(base), "estrategias", datos.clave('base_campana'))
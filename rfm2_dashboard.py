@@ -1,6 +1,11 @@
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
+
+from rfm_core.campanas import CANALES, OFERTAS
+from rfm_core.controles import selector_frecuencia
+from rfm_core.descargas import boton_descarga
+from rfm_core.huella import huella, huella_archivo
+from rfm_core.puntajes import calcular_rfm
 
 st.set_page_config(page_title="Dashboard RFM + Estrategias", layout="wide")
 
@@ -13,14 +18,12 @@ if uploaded_file:
     df = pd.read_excel(uploaded_file, sheet_name='Transaction Data')
     df['Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
     df['Hr transacc'] = pd.to_datetime(df['Hr transacc'], format='%H:%M:%S', errors='coerce').dt.hour
+    frecuencia = selector_frecuencia(df.columns, predeterminada='pedidos')
 
     # ✅ Crear tabla RFM
-    rfm = df.groupby('Customer ID').agg({
-        'Order Date': lambda x: (pd.Timestamp.now() - x.max()).days,
-        'Order ID': 'nunique',
-        'Sales': 'sum'
-    }).reset_index()
-    rfm.columns = ['Customer ID', 'Recency', 'Frequency', 'Monetary']
+    # Recency contra el momento actual: la descarga en caché se renueva cada día
+    fecha_referencia = pd.Timestamp.now()
+    rfm = calcular_rfm(df, fecha_referencia, frecuencia=frecuencia).reset_index()
 
     # ✅ Calcular puntajes RFM
     rfm['R_score'] = pd.qcut(rfm['Recency'], 5, labels=[5,4,3,2,1])
@@ -52,8 +55,11 @@ if uploaded_file:
     st.subheader("📌 Segmentación RFM")
     st.dataframe(rfm.head(20))
 
-    csv_rfm = rfm.to_csv(index=False).encode('utf-8')
-    st.download_button("⬇ Descargar Segmentación RFM", data=csv_rfm, file_name="segmentacion_rfm.csv", mime="text/csv")
+    clave_descarga = huella(huella_archivo(uploaded_file), frecuencia, fecha_referencia.date())
+    boton_descarga("Descargar Segmentación RFM", rfm, "segmentacion_rfm", clave_descarga)
+
+    # Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+    import matplotlib.pyplot as plt
 
     # ✅ Gráficos
     st.subheader("📊 Distribución por Segmento")
@@ -82,23 +88,6 @@ if uploaded_file:
         'Potenciales':'17:00 – 20:00',
         'En riesgo':'17:00 – 20:00'
     }
-    ofertas = {
-        ('Champions','Grifos'):'Café + snack gratis por carga > S/50',
-        ('Champions','Supermercados'):'Acceso anticipado a promociones exclusivas',
-        ('Leales','Grifos'):'Cada 5 cargas, 1 gratis',
-        ('Leales','Supermercados'):'Cupones semanales en productos frecuentes',
-        ('Potenciales','Grifos'):'Descuento en snacks con carga mínima',
-        ('Potenciales','Supermercados'):'Promociones cruzadas en productos populares',
-        ('En riesgo','Grifos'):'Oferta flash: -30% en snacks',
-        ('En riesgo','Supermercados'):'Cupón de recuperación con vencimiento rápido'
-    }
-    canales = {
-        'Champions':'Push + Email + WhatsApp Business',
-        'Leales':'WhatsApp Business + SMS',
-        'Potenciales':'Publicidad en redes + SMS',
-        'En riesgo':'Email remarketing + SMS'
-    }
-
     estrategias = []
     for seg in segmentos:
         for est in establecimientos:
@@ -106,13 +95,12 @@ if uploaded_file:
                 'Segmento': seg,
                 'Establecimiento': est,
                 'Hora óptima': horarios[seg],
-                'Oferta': ofertas[(seg, est)],
-                'Canal recomendado': canales[seg],
-                'Mensaje sugerido': f"¡Hola {seg}! {ofertas[(seg, est)]}. Disponible en {est}. ¡Aprovecha hoy!"
+                'Oferta': OFERTAS[(seg, est)],
+                'Canal recomendado': CANALES[seg],
+                'Mensaje sugerido': f"¡Hola {seg}! {OFERTAS[(seg, est)]}. Disponible en {est}. ¡Aprovecha hoy!"
             })
 
     df_estrategias = pd.DataFrame(estrategias)
     st.dataframe(df_estrategias)
 
-    csv_estrategias = df_estrategias.to_csv(index=False).encode('utf-8')
-    st.download_button("⬇ Descargar Estrategias en CSV", data=csv_estrategias, file_name="estrategias_marketing.csv", mime="text/csv")
+    boton_descarga("Descargar Estrategias", df_estrategias, "estrategias_marketing", clave_descarga)
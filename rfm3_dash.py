@@ -1,7 +1,11 @@
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from rfm_core.controles import formulario_filtros
+from rfm_core.descargas import boton_descarga
+from rfm_core.filtros import filtrar_transacciones
+from rfm_core.huella import huella, huella_archivo
+from rfm_core.puntajes import calcular_rfm
 
 st.set_page_config(page_title="Dashboard RFM Interactivo", layout="wide")
 
@@ -20,22 +24,14 @@ if uploaded_file:
     st.dataframe(df.head())
 
     # ✅ Filtros dinámicos
-    st.sidebar.header("🔍 Filtros")
-    establecimientos = st.sidebar.multiselect("Selecciona Establecimientos", options=df['Establecimiento'].unique(), default=list(df['Establecimiento'].unique()))
-    rango_hora = st.sidebar.slider("Selecciona Rango de Horas", 0, 23, (0, 23))
+    establecimientos, rango_hora, frecuencia = formulario_filtros(df, titulo="🔍 Filtros")
 
     # Aplicar filtros
-    df_filtered = df[(df['Establecimiento'].isin(establecimientos)) & (df['Hr transacc'].between(rango_hora[0], rango_hora[1]))]
+    df_filtered = filtrar_transacciones(df, huella_archivo(uploaded_file), establecimientos, rango_hora)
 
     # ✅ Calcular RFM
     current_date = pd.to_datetime('2015-12-31')
-    rfm_df = df_filtered.groupby('Customer ID').agg({
-        'Order Date': lambda x: (current_date - x.max()).days,
-        'Customer ID': 'count',
-        'Sales': 'sum'
-    })
-    rfm_df.rename(columns={'Order Date': 'Recency','Customer ID': 'Frequency','Sales': 'Monetary'}, inplace=True)
-    rfm_df['Recency'] = rfm_df['Recency'].astype(int)
+    rfm_df = calcular_rfm(df_filtered, current_date, frecuencia=frecuencia)
 
     # Cuantiles
     quantiles = rfm_df.quantile(q=[0.20, 0.40, 0.60, 0.80]).to_dict()
@@ -63,8 +59,12 @@ if uploaded_file:
     st.dataframe(rfm_df.head())
 
     # ✅ Botón de descarga
-    csv = rfm_df.to_csv().encode('utf-8')
-    st.download_button("⬇ Descargar Segmentación RFM", data=csv, file_name="rfm_segmentacion.csv", mime="text/csv")
+    clave_descarga = huella(huella_archivo(uploaded_file), establecimientos, rango_hora, frecuencia)
+    boton_descarga("Descargar Segmentación RFM", rfm_df, "rfm_segmentacion", clave_descarga, index=True)
+
+    # Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
     # ✅ Gráficos interactivos
     st.subheader("📈 Distribución de R, F y M")
@@ -0,0 +1 @@
+"""Lógica compartida de los dashboards RFM (cálculo, puntajes y estrategias)."""
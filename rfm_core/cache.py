@@ -0,0 +1,181 @@
+"""Caché de resultados compartida entre sesiones y procesos, en disco y con presupuesto de bytes.
+
+Cada resultado se guarda como pickle en un archivo; un índice SQLite lleva el tamaño y el último
+uso para expulsar por LRU cuando se supera el presupuesto. Delante hay una capa en memoria, también
+acotada en bytes, para no deserializar en cada rerun.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from rfm_core.consultas import MOTOR
+from rfm_core.huella import huella
+from rfm_core.tipos import TIPOS
+
+# Cambiar al modificar cualquier cálculo cuyo resultado se guarde en la caché
+VERSION_PIPELINE = '3'
+
+DIRECTORIO_CACHE = os.environ.get('RFM_CACHE_DIR', os.path.join('.cache', 'rfm'))
+PRESUPUESTO_DISCO = int(os.environ.get('RFM_CACHE_BYTES', str(2 * 1024 ** 3)))
+PRESUPUESTO_MEMORIA = int(os.environ.get('RFM_CACHE_MEMORIA_BYTES', str(512 * 1024 ** 2)))
+
+
+def clave_cache(etapa, huella_datos, *estado):
+    """Clave de un resultado: etapa del pipeline, huella del dataset, estado de filtros y versión.
+
+    Incluye el motor de consultas (RFM_MOTOR) y los tipos (RFM_TIPOS): pandas y DuckDB, o NumPy y
+    Arrow, devuelven tipos distintos y procesos con distinta configuración no comparten resultados.
+    """
+    return huella(VERSION_PIPELINE, MOTOR, TIPOS, etapa, huella_datos, estado)
+
+
+class CacheResultados:
+    def __init__(self, directorio=DIRECTORIO_CACHE, presupuesto_disco=PRESUPUESTO_DISCO,
+                 presupuesto_memoria=PRESUPUESTO_MEMORIA):
+        self.directorio = directorio
+        self.presupuesto_disco = presupuesto_disco
+        self.presupuesto_memoria = presupuesto_memoria
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self._memoria = OrderedDict()  # clave -> (valor, bytes)
+        self._bytes_memoria = 0
+        self._lock = threading.Lock()
+        self._calculando = {}  # clave -> Lock del cálculo en curso
+        os.makedirs(directorio, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directorio, 'indice.sqlite'), timeout=30,
+                                   check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS entradas ('
+                         'clave TEXT PRIMARY KEY, bytes INTEGER NOT NULL, ultimo_uso REAL NOT NULL)')
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + '.pkl')
+
+    def _a_memoria(self, clave, valor, tamano):
+        if tamano > self.presupuesto_memoria:
+            return
+        if clave in self._memoria:
+            self._bytes_memoria -= self._memoria.pop(clave)[1]
+        self._memoria[clave] = (valor, tamano)
+        self._bytes_memoria += tamano
+        while self._bytes_memoria > self.presupuesto_memoria:
+            _, (_, liberado) = self._memoria.popitem(last=False)
+            self._bytes_memoria -= liberado
+
+    def _leer_disco(self, clave):
+        try:
+            with open(self._ruta(clave), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _escribir_disco(self, clave, datos):
+        if len(datos) > self.presupuesto_disco:
+            return
+        # La escritura va fuera del lock; os.replace la publica entera para los demás lectores
+        temporal = f"{self._ruta(clave)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, 'wb') as f:
+            f.write(datos)
+        os.replace(temporal, self._ruta(clave))
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO entradas (clave, bytes, ultimo_uso) VALUES (?, ?, ?)',
+                             (clave, len(datos), time.time()))
+            self._expulsar()
+
+    def _expulsar(self):
+        total = self._db.execute('SELECT COALESCE(SUM(bytes), 0) FROM entradas').fetchone()[0]
+        if total <= self.presupuesto_disco:
+            return
+        for clave, tamano in self._db.execute('SELECT clave, bytes FROM entradas ORDER BY ultimo_uso').fetchall():
+            self._db.execute('DELETE FROM entradas WHERE clave = ?', (clave,))
+            try:
+                os.remove(self._ruta(clave))
+            except FileNotFoundError:
+                pass
+            total -= tamano
+            if total <= self.presupuesto_disco:
+                break
+
+    def leer(self, clave):
+        """(encontrado, valor) guardado bajo `clave`, sin calcular nada si no está.
+
+        El lock solo cubre la capa en memoria y el índice: la lectura del archivo y el unpickle de un
+        resultado grande no bloquean las consultas de las demás sesiones.
+        """
+        with self._lock:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                self.aciertos_memoria += 1
+                return True, self._memoria[clave][0]
+        datos = self._leer_disco(clave)
+        if datos is None:
+            return False, None
+        valor = pickle.loads(datos)
+        with self._lock:
+            self._db.execute('UPDATE entradas SET ultimo_uso = ? WHERE clave = ?', (time.time(), clave))
+            self.aciertos_disco += 1
+            self._a_memoria(clave, valor, len(datos))
+        return True, valor
+
+    def contiene(self, clave):
+        """Si hay un resultado guardado bajo `clave`, sin leerlo ni contarlo como consulta."""
+        with self._lock:
+            return clave in self._memoria or os.path.exists(self._ruta(clave))
+
+    def obtener(self, clave, calcular):
+        """Devuelve el resultado guardado bajo `clave` o lo calcula con `calcular()` y lo guarda.
+
+        Si otra sesión ya está calculando la misma clave, espera su resultado en lugar de repetirlo.
+        """
+        encontrado, valor = self.leer(clave)
+        if encontrado:
+            return valor
+        with self._lock:
+            en_curso = self._calculando.setdefault(clave, threading.Lock())
+        try:
+            with en_curso:
+                encontrado, valor = self.leer(clave)
+                if encontrado:
+                    return valor
+                with self._lock:
+                    self.fallos += 1
+                valor = calcular()
+                datos = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+                self._escribir_disco(clave, datos)
+                with self._lock:
+                    self._a_memoria(clave, valor, len(datos))
+                return valor
+        finally:
+            with self._lock:
+                self._calculando.pop(clave, None)
+
+    def estadisticas(self):
+        with self._lock:
+            entradas, total = self._db.execute('SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entradas').fetchone()
+            consultas = self.aciertos_memoria + self.aciertos_disco + self.fallos
+            return {
+                'aciertos_memoria': self.aciertos_memoria,
+                'aciertos_disco': self.aciertos_disco,
+                'fallos': self.fallos,
+                'tasa_aciertos': (self.aciertos_memoria + self.aciertos_disco) / consultas if consultas else 0.0,
+                'entradas_disco': entradas,
+                'bytes_disco': total,
+                'bytes_memoria': self._bytes_memoria,
+            }
+
+
+_compartida = None
+_lock_compartida = threading.Lock()
+
+
+def cache_compartida():
+    """Instancia única por proceso; todas las sesiones de Streamlit del proceso la comparten."""
+    global _compartida
+    with _lock_compartida:
+        if _compartida is None:
+            _compartida = CacheResultados()
+        return _compartida
@@ -0,0 +1,103 @@
+"""Lista de campaña por cliente: segmento, establecimiento habitual y hora pico personal."""
+import numpy as np
+import pandas as pd
+
+from rfm_core.puntajes import RECOMENDACIONES, asignar_segmento
+
+# Tablas de oferta y canal de rfm2_dashboard.py
+OFERTAS = {
+    ('Champions', 'Grifos'): 'Café + snack gratis por carga > S/50',
+    ('Champions', 'Supermercados'): 'Acceso anticipado a promociones exclusivas',
+    ('Leales', 'Grifos'): 'Cada 5 cargas, 1 gratis',
+    ('Leales', 'Supermercados'): 'Cupones semanales en productos frecuentes',
+    ('Potenciales', 'Grifos'): 'Descuento en snacks con carga mínima',
+    ('Potenciales', 'Supermercados'): 'Promociones cruzadas en productos populares',
+    ('En riesgo', 'Grifos'): 'Oferta flash: -30% en snacks',
+    ('En riesgo', 'Supermercados'): 'Cupón de recuperación con vencimiento rápido'
+}
+
+CANALES = {
+    'Champions': 'Push + Email + WhatsApp Business',
+    'Leales': 'WhatsApp Business + SMS',
+    'Potenciales': 'Publicidad en redes + SMS',
+    'En riesgo': 'Email remarketing + SMS'
+}
+
+COLUMNAS_CAMPANA = ['Customer ID', 'Segmento', 'Establecimiento', 'Hora pico', 'Oferta',
+                    'Canal recomendado', 'Mensaje sugerido']
+
+TAMANO_BLOQUE = 100_000
+
+
+def moda_por_cliente(df, columna):
+    """Valor más frecuente de `columna` por cliente (en empate, el primero en orden)."""
+    conteo = df.groupby(['Customer ID', columna], sort=True).size().rename('n').reset_index()
+    conteo = conteo.sort_values(['Customer ID', 'n'], ascending=[True, False], kind='stable')
+    return conteo.drop_duplicates('Customer ID').set_index('Customer ID')[columna]
+
+
+def base_campana(df, rfm_df):
+    """Una fila por cliente con segmento, establecimiento habitual y hora pico."""
+    if 'Segment' in rfm_df.columns:
+        segmento = rfm_df['Segment']
+    else:
+        segmento = asignar_segmento(rfm_df['R'], rfm_df['F'], rfm_df['M'], index=rfm_df.index)
+    base = pd.DataFrame({
+        'Segmento': segmento,
+        'Establecimiento': moda_por_cliente(df, 'Establecimiento'),
+        'Hora pico': moda_por_cliente(df.dropna(subset=['Hr transacc']), 'Hr transacc'),
+    })
+    base = base[base['Segmento'].notna()]
+    base.index.name = 'Customer ID'
+    return base.reset_index()
+
+
+def _ofertas_bloque(bloque):
+    segmento = bloque['Segmento'].astype(str)
+    claves = pd.MultiIndex.from_arrays([segmento, bloque['Establecimiento']])
+    oferta = pd.Series(OFERTAS).reindex(claves).to_numpy()
+    # Establecimientos sin oferta específica reciben la recomendación genérica del segmento
+    return np.where(pd.isna(oferta), segmento.map(RECOMENDACIONES).to_numpy(), oferta)
+
+
+def bloques_campana(base, tamano_bloque=TAMANO_BLOQUE):
+    """Lista de campaña a partir de `base` (de base_campana) en bloques de `tamano_bloque` clientes.
+
+    Solo la oferta, el canal y el mensaje se arman por bloque: la base, una fila por cliente, ya está
+    calculada y se puede guardar en caché. Para una vista previa basta el primer bloque.
+    """
+    for inicio in range(0, len(base), tamano_bloque):
+        bloque = base.iloc[inicio:inicio + tamano_bloque].copy()
+        segmento = bloque['Segmento'].astype(str)
+        hora = bloque['Hora pico'].astype('Int64').astype(str).str.zfill(2) + ':00'
+        bloque['Hora pico'] = hora.where(bloque['Hora pico'].notna(), '')
+        bloque['Oferta'] = _ofertas_bloque(bloque)
+        bloque['Canal recomendado'] = segmento.map(CANALES).to_numpy()
+        bloque['Mensaje sugerido'] = ("¡Hola " + segmento + "! " + bloque['Oferta'].str.rstrip('.') + ". Disponible en "
+                                      + bloque['Establecimiento'].astype(str) + " a las "
+                                      + bloque['Hora pico'] + ". ¡Aprovecha hoy!")
+        yield bloque[COLUMNAS_CAMPANA]
+
+
+def generar_campana(df, rfm_df, tamano_bloque=TAMANO_BLOQUE):
+    """Genera la lista de campaña en bloques de `tamano_bloque` clientes (la base se calcula entera antes)."""
+    return bloques_campana(base_campana(df, rfm_df), tamano_bloque)
+
+
+def resumen_campana(base):
+    """Clientes por segmento y establecimiento habitual, con su oferta y canal (para reportes)."""
+    resumen = base.groupby(['Segmento', 'Establecimiento'], observed=True).size().reset_index(name='Clientes')
+    resumen['Oferta'] = _ofertas_bloque(resumen)
+    resumen['Canal recomendado'] = resumen['Segmento'].astype(str).map(CANALES).to_numpy()
+    return resumen
+
+
+def exportar_campana_csv(bloques, destino):
+    """Escribe los bloques de generar_campana en `destino` (ruta o archivo) sin juntarlos en memoria."""
+    filas = 0
+    for bloque in bloques:
+        bloque.to_csv(destino, index=False, header=(filas == 0), mode='w' if filas == 0 else 'a')
+        filas += len(bloque)
+    if filas == 0:
+        pd.DataFrame(columns=COLUMNAS_CAMPANA).to_csv(destino, index=False)
+    return filas
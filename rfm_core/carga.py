@@ -0,0 +1,183 @@
+"""Lectura y preparación de la hoja 'Transaction Data'.
+
+Antes de leer se estima la memoria que ocuparía el archivo a partir de las dimensiones de la hoja y
+se elige el modo de carga que cabe en el presupuesto (RFM_MEMORIA_BYTES o, si no está definido, la
+mitad del límite de memoria del contenedor):
+
+- 'completo': `pd.read_excel` de siempre.
+- 'streaming': lectura fila a fila por bloques (sin el pico de memoria de read_excel).
+- 'compacto': streaming + texto en cadenas de Arrow (string[pyarrow]) y horas en int8.
+- 'muestra': compacto conservando solo una fracción de clientes (todas sus transacciones), elegida
+  por hash del Customer ID para que sea estable entre recargas.
+
+El modo y el aviso para el usuario quedan en `df.attrs['carga']` (ver `aviso_carga`). Con
+RFM_TIPOS=arrow todas las columnas salen como pd.ArrowDtype (ver rfm_core.tipos).
+"""
+import os
+import zipfile
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from rfm_core.tipos import TIPOS, a_arrow
+
+HOJA = 'Transaction Data'
+
+# Bytes por celda estimados (no medidos) para el pico de cada modo, pensando en hojas de transacciones
+# típicas (texto corto, fechas, montos): el plan se decide antes de leer, así que son cotas prudentes y
+# no una medición del archivo. Los modos por bloques incluyen la copia al concatenar los bloques.
+BYTES_CELDA_LECTURA = 150  # pd.read_excel: celdas de openpyxl + DataFrame final
+BYTES_CELDA_TABLA = 120    # bloques con texto como object
+BYTES_CELDA_COMPACTA = 32  # bloques con texto en Arrow y números
+BYTES_XML_CELDA = 40       # XML sin comprimir por celda, si la hoja no declara sus dimensiones
+FILAS_BLOQUE = 50_000
+
+FRACCION_LIMITE = 0.5
+PRESUPUESTO_PREDETERMINADO = 2 * 1024 ** 3
+
+PlanCarga = namedtuple('PlanCarga', 'modo filas columnas estimado presupuesto fraccion')
+
+
+def _limite_contenedor():
+    """Límite de memoria del cgroup (v2 o v1) o None si no hay límite."""
+    for ruta in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(ruta) as archivo:
+                valor = archivo.read().strip()
+        except OSError:
+            continue
+        if valor.isdigit() and int(valor) < 2 ** 60:
+            return int(valor)
+    return None
+
+
+def presupuesto_memoria():
+    """Bytes que puede ocupar una carga: RFM_MEMORIA_BYTES o una fracción del límite del contenedor."""
+    if os.environ.get('RFM_MEMORIA_BYTES'):
+        return int(os.environ['RFM_MEMORIA_BYTES'])
+    limite = _limite_contenedor()
+    return int(limite * FRACCION_LIMITE) if limite else PRESUPUESTO_PREDETERMINADO
+
+
+def dimensiones_hoja(archivo, hoja=HOJA):
+    """(filas de datos, columnas) leídas de la cabecera de la hoja, sin recorrer sus celdas."""
+    from openpyxl import load_workbook
+
+    archivo.seek(0)
+    libro = load_workbook(archivo, read_only=True)
+    try:
+        ws = libro[hoja]
+        filas, columnas = ws.max_row, ws.max_column
+    finally:
+        libro.close()
+    if filas is None or columnas is None:
+        # Hoja sin <dimension>: se estima por el tamaño del XML de las hojas
+        archivo.seek(0)
+        with zipfile.ZipFile(archivo) as xlsx:
+            tamano = sum(i.file_size for i in xlsx.infolist() if i.filename.startswith('xl/worksheets/'))
+        columnas = columnas or 10
+        filas = tamano // (BYTES_XML_CELDA * columnas) + 1
+    archivo.seek(0)
+    return max(filas - 1, 0), columnas
+
+
+def planificar_carga(archivo, presupuesto=None):
+    """Modo de carga según las dimensiones de la hoja y el presupuesto de memoria."""
+    presupuesto = presupuesto_memoria() if presupuesto is None else presupuesto
+    filas, columnas = dimensiones_hoja(archivo)
+    celdas = filas * columnas
+    if celdas * BYTES_CELDA_LECTURA <= presupuesto:
+        return PlanCarga('completo', filas, columnas, celdas * BYTES_CELDA_LECTURA, presupuesto, 1.0)
+    if celdas * BYTES_CELDA_TABLA <= presupuesto:
+        return PlanCarga('streaming', filas, columnas, celdas * BYTES_CELDA_TABLA, presupuesto, 1.0)
+    compacto = celdas * BYTES_CELDA_COMPACTA
+    if compacto <= presupuesto:
+        return PlanCarga('compacto', filas, columnas, compacto, presupuesto, 1.0)
+    return PlanCarga('muestra', filas, columnas, compacto, presupuesto, presupuesto / compacto)
+
+
+def _normalizar(df):
+    df['Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
+    df['Hr transacc'] = pd.to_datetime(df['Hr transacc'], format='%H:%M:%S', errors='coerce').dt.hour
+    return df
+
+
+def _compactar(df):
+    # Cadenas de Arrow y no categorías: los groupby siguen viendo solo los valores presentes
+    for columna in df.columns:
+        if df[columna].dtype == object:
+            df[columna] = df[columna].astype('string[pyarrow]')
+    if 'Hr transacc' in df.columns and not df['Hr transacc'].isna().any():
+        df['Hr transacc'] = df['Hr transacc'].astype(np.int8)
+    return df
+
+
+def _en_muestra(clientes, fraccion):
+    # Hash estable del cliente: la misma fracción de clientes en cada recarga
+    return pd.util.hash_array(clientes.astype(str).to_numpy()) % 10_000 < fraccion * 10_000
+
+
+def _leer_por_bloques(archivo, compacto, fraccion, total, avance):
+    from openpyxl import load_workbook
+
+    archivo.seek(0)
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro[HOJA].iter_rows(values_only=True)
+        encabezado = [str(c) for c in next(filas)]
+        bloques = []
+        leidas = 0
+        while True:
+            avance(min(leidas / max(total, 1), 1.0), f"Leyendo filas: {leidas:,} de ~{total:,}")
+            lote = [fila for _, fila in zip(range(FILAS_BLOQUE), filas)]
+            if not lote:
+                break
+            leidas += len(lote)
+            bloque = _normalizar(pd.DataFrame(lote, columns=encabezado))
+            if fraccion < 1.0:
+                bloque = bloque[_en_muestra(bloque['Customer ID'], fraccion)]
+            bloques.append(_compactar(bloque) if compacto else bloque)
+    finally:
+        libro.close()
+    if not bloques:
+        return pd.DataFrame(columns=encabezado)
+    return pd.concat(bloques, ignore_index=True)
+
+
+def aviso_carga(plan):
+    """Mensaje para el usuario si la carga no fue completa; None en el modo normal."""
+    mb = lambda b: f"{b / 1024 ** 2:,.{0 if b >= 10 * 1024 ** 2 else 1}f} MB"
+    tamano = f"{plan.filas:,} filas x {plan.columnas} columnas (~{mb(plan.estimado)} estimados)"
+    if plan.modo == 'streaming':
+        return f"Archivo grande: {tamano}. Se leyó por bloques para no superar {mb(plan.presupuesto)} de memoria."
+    if plan.modo == 'compacto':
+        return (f"Archivo grande: {tamano}. Se leyó por bloques con tipos compactos para no superar "
+                f"{mb(plan.presupuesto)} de memoria.")
+    if plan.modo == 'muestra':
+        return (f"Archivo demasiado grande para {mb(plan.presupuesto)} de memoria: {tamano}. Se analiza una "
+                f"muestra del {plan.fraccion:.0%} de los clientes con todas sus transacciones; los totales "
+                f"de ventas y clientes son parciales.")
+    return None
+
+
+def leer_transacciones(archivo, presupuesto=None, avance=None, tipos=TIPOS):
+    """Lee la hoja de transacciones y normaliza fecha y hora como en todos los dashboards.
+
+    El modo de lectura se elige con `planificar_carga`; el plan y el aviso quedan en `df.attrs['carga']`.
+    `avance(progreso, mensaje)` (p. ej. `Tarea.avanzar`) se llama antes de cada bloque leído. Con
+    `tipos='arrow'` las columnas se devuelven como pd.ArrowDtype.
+    """
+    avance = avance or (lambda progreso, mensaje: None)
+    plan = planificar_carga(archivo, presupuesto)
+    if plan.modo == 'completo':
+        avance(0.0, f"Leyendo {plan.filas:,} filas del Excel...")
+        df = _normalizar(pd.read_excel(archivo, sheet_name=HOJA))
+    else:
+        # En modo Arrow cada bloque se compacta al leerlo: el texto nunca se acumula como objetos Python
+        df = _leer_por_bloques(archivo, compacto=plan.modo != 'streaming' or tipos == 'arrow',
+                               fraccion=plan.fraccion, total=plan.filas, avance=avance)
+    if tipos == 'arrow':
+        df = a_arrow(df)
+    df.attrs['carga'] = {**plan._asdict(), 'aviso': aviso_carga(plan)}
+    return df
@@ -0,0 +1,183 @@
+"""Catálogo local de datasets con nombre y versión, guardados como Arrow IPC (Feather sin compresión).
+
+Cada proceso abre los archivos con memory-map: las columnas numéricas y de texto se leen sin copiar,
+directamente de la caché de páginas del sistema, que comparten todos los procesos de Streamlit de la
+máquina (o del volumen montado en RFM_CATALOGO_DIR). Así varias réplicas detrás de un balanceador no
+guardan cada una su propia copia de las transacciones, y los usuarios eligen un dataset registrado
+en lugar de volver a subir el Excel.
+
+Un índice SQLite, como el de la caché de resultados, lleva nombre, versión, huella y tamaño.
+Registrar un contenido que ya está en el catálogo con el mismo nombre devuelve esa versión.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from rfm_core.tipos import TIPOS
+
+DIRECTORIO_CATALOGO = os.environ.get('RFM_CATALOGO_DIR', os.path.join('.cache', 'catalogo'))
+
+EntradaCatalogo = namedtuple('EntradaCatalogo', 'nombre version huella filas columnas bytes creado')
+
+
+def _tabla_arrow(df):
+    """Tabla Arrow de `df` con tipos que pandas puede volver a leer sin copiar.
+
+    - Texto como large_string, el tipo interno de string[pyarrow] (con string habría que convertir).
+    - Decimales con NaN como valor y no como nulo (con nulos, pandas copia para rellenarlos).
+    - Columnas object con tipos mezclados (números y texto) se guardan como texto.
+    """
+    import pyarrow as pa
+
+    columnas = {}
+    for columna in df.columns:
+        serie = df[columna]
+        if pd.api.types.is_float_dtype(serie.dtype):
+            columnas[columna] = pa.array(serie.to_numpy(), from_pandas=False)
+            continue
+        if serie.dtype == object:
+            try:
+                pa.array(serie, from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                serie = serie.where(serie.isna(), serie.astype(str))
+        arreglo = pa.array(serie, from_pandas=True)
+        columnas[columna] = arreglo.cast(pa.large_string()) if pa.types.is_string(arreglo.type) else arreglo
+    return pa.table(columnas)
+
+
+def _tipo_pandas(tipo):
+    # Texto como string[pyarrow]: envuelve los buffers del archivo en lugar de crear objetos Python.
+    # En modo Arrow (RFM_TIPOS) todas las columnas quedan como pd.ArrowDtype
+    import pyarrow as pa
+
+    if TIPOS == 'arrow':
+        return pd.ArrowDtype(tipo)
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+        return pd.StringDtype('pyarrow')
+    return None
+
+
+def _nan_a_nulo(tabla):
+    # Con pd.ArrowDtype los faltantes son nulos; los decimales se guardan con NaN (ver _tabla_arrow).
+    # Solo se copian las columnas que de verdad tienen NaN
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    for i, campo in enumerate(tabla.schema):
+        if pa.types.is_floating(campo.type):
+            nan = pc.is_nan(tabla.column(i))
+            if pc.any(nan).as_py():
+                tabla = tabla.set_column(i, campo, pc.if_else(nan, pa.scalar(None, campo.type), tabla.column(i)))
+    return tabla
+
+
+class Catalogo:
+    def __init__(self, directorio=DIRECTORIO_CATALOGO):
+        self.directorio = directorio
+        self._lock = threading.Lock()
+        self._abiertos = {}  # (nombre, version) -> DataFrame sobre el archivo mapeado
+        os.makedirs(directorio, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directorio, 'catalogo.sqlite'), timeout=30,
+                                   check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS datasets ('
+                         'nombre TEXT NOT NULL, version INTEGER NOT NULL, huella TEXT NOT NULL, '
+                         'filas INTEGER NOT NULL, columnas INTEGER NOT NULL, bytes INTEGER NOT NULL, '
+                         'creado REAL NOT NULL, attrs TEXT NOT NULL, PRIMARY KEY (nombre, version))')
+
+    def _ruta(self, nombre, version):
+        return os.path.join(self.directorio, f"{nombre}.v{version}.arrow")
+
+    @staticmethod
+    def _entrada(fila):
+        return EntradaCatalogo(*fila[:7])
+
+    def listar(self):
+        """Entradas del catálogo, por nombre y de la versión más nueva a la más vieja."""
+        with self._lock:
+            filas = self._db.execute('SELECT nombre, version, huella, filas, columnas, bytes, creado FROM datasets '
+                                     'ORDER BY nombre, version DESC').fetchall()
+        return [self._entrada(fila) for fila in filas]
+
+    def buscar(self, nombre, version=None):
+        """Entrada de `nombre` en `version` (la más nueva con None) o None si no existe."""
+        with self._lock:
+            fila = self._db.execute(
+                'SELECT nombre, version, huella, filas, columnas, bytes, creado, attrs FROM datasets '
+                'WHERE nombre = ? AND (? IS NULL OR version = ?) ORDER BY version DESC LIMIT 1',
+                (nombre, version, version)).fetchone()
+        return fila
+
+    def registrar(self, df, nombre, huella_datos):
+        """Guarda `df` como nueva versión de `nombre` y devuelve su entrada.
+
+        `huella_datos` (la del archivo de origen) se conserva: las claves de la caché de resultados
+        son las mismas tanto si el dataset se sube como si se abre desde el catálogo.
+        """
+        from pyarrow import feather
+
+        nombre = nombre.strip().replace(os.sep, '_')
+        with self._lock:
+            existente = self._db.execute('SELECT nombre, version, huella, filas, columnas, bytes, creado FROM datasets '
+                                         'WHERE nombre = ? AND huella = ?', (nombre, huella_datos)).fetchone()
+        if existente:
+            return self._entrada(existente)
+
+        temporal = os.path.join(self.directorio, f"{nombre}.{os.getpid()}.{threading.get_ident()}.tmp")
+        # Un solo lote: cada columna queda contigua en el archivo y se puede leer sin concatenar (copiar)
+        feather.write_feather(_tabla_arrow(df), temporal, compression='uncompressed', chunksize=max(len(df), 1))
+        with self._lock:
+            # La versión se reserva en una transacción: otro proceso puede estar registrando el mismo nombre
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                version = self._db.execute('SELECT COALESCE(MAX(version), 0) + 1 FROM datasets WHERE nombre = ?',
+                                           (nombre,)).fetchone()[0]
+                os.replace(temporal, self._ruta(nombre, version))
+                entrada = EntradaCatalogo(nombre, version, huella_datos, len(df), len(df.columns),
+                                          os.path.getsize(self._ruta(nombre, version)), time.time())
+                self._db.execute('INSERT INTO datasets VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                 (*entrada, json.dumps(df.attrs, default=str)))
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return entrada
+
+    def abrir(self, nombre, version=None):
+        """(DataFrame, entrada) del dataset, leído con memory-map y compartido por las sesiones del proceso."""
+        import pyarrow as pa
+
+        fila = self.buscar(nombre, version)
+        if fila is None:
+            raise KeyError(f"'{nombre}' no está en el catálogo" + (f" (versión {version})" if version else ''))
+        entrada = self._entrada(fila)
+        clave = (entrada.nombre, entrada.version)
+        with self._lock:
+            if clave not in self._abiertos:
+                with pa.memory_map(self._ruta(*clave), 'r') as fuente:
+                    tabla = pa.ipc.open_file(fuente).read_all()
+                if TIPOS == 'arrow':
+                    tabla = _nan_a_nulo(tabla)
+                # split_blocks: una columna por bloque, sin consolidar (copiar) columnas del mismo tipo
+                df = tabla.to_pandas(split_blocks=True, types_mapper=_tipo_pandas)
+                df.attrs = json.loads(fila[7])
+                self._abiertos[clave] = df
+            return self._abiertos[clave], entrada
+
+
+_compartido = None
+_lock_compartido = threading.Lock()
+
+
+def catalogo_compartido():
+    """Instancia única por proceso, como la caché de resultados."""
+    global _compartido
+    with _lock_compartido:
+        if _compartido is None:
+            _compartido = Catalogo()
+        return _compartido
@@ -0,0 +1,155 @@
+"""Segmentación K-means de clientes sobre R, F, M estandarizados (alternativa escalable al dendrograma Ward).
+
+Mini-batch K-means (Sculley, 2010) con inicio k-means++: cada iteración asigna un lote aleatorio de
+clientes a su centro más cercano y mueve los centros con tasa 1 / (clientes vistos por el centro).
+La asignación final recorre los clientes por bloques, así que la memoria no depende de su número
+más allá de la propia matriz R/F/M.
+"""
+import numpy as np
+import pandas as pd
+
+from rfm_core.puntajes import RECOMENDACIONES
+
+COLUMNAS_RFM = ['Recency', 'Frequency', 'Monetary']
+
+# Por encima de estos clientes, Ward (matriz de distancias n x n) deja de ser práctico
+MAX_CLIENTES_WARD = 20_000
+
+TAMANO_LOTE = 2_048
+MAX_ITERACIONES = 300
+TAMANO_BLOQUE = 100_000
+MUESTRA_INICIO = 10_000
+MUESTRA_EVALUACION = 20_000
+MUESTRA_SILUETA = 2_000
+
+
+def estandarizar(rfm_df, logaritmo=True):
+    """Matriz R/F/M con media 0 y desviación 1; con `logaritmo` se aplica log1p antes (colas largas de F y M)."""
+    X = rfm_df[COLUMNAS_RFM].to_numpy(dtype=float)
+    if logaritmo:
+        X = np.log1p(np.clip(X, 0, None))
+    desviacion = X.std(axis=0)
+    return (X - X.mean(axis=0)) / np.where(desviacion > 0, desviacion, 1.0)
+
+
+def _distancias(X, centros):
+    # Distancias al cuadrado |x|² - 2 x·c + |c|² para un bloque completo a la vez
+    return (X ** 2).sum(axis=1)[:, None] - 2 * X @ centros.T + (centros ** 2).sum(axis=1)
+
+
+def asignar(X, centros, tamano_bloque=TAMANO_BLOQUE):
+    """(etiqueta del centro más cercano, inercia total) recorriendo X por bloques."""
+    etiquetas = np.empty(len(X), dtype=np.int32)
+    inercia = 0.0
+    for inicio in range(0, len(X), tamano_bloque):
+        distancias = _distancias(X[inicio:inicio + tamano_bloque], centros)
+        etiquetas[inicio:inicio + tamano_bloque] = distancias.argmin(axis=1)
+        inercia += np.maximum(distancias.min(axis=1), 0).sum()
+    return etiquetas, inercia
+
+
+def kmeans_pp(X, k, rng, muestra=MUESTRA_INICIO):
+    """Centros iniciales k-means++ elegidos sobre una muestra de hasta `muestra` clientes."""
+    if len(X) > muestra:
+        X = X[rng.choice(len(X), muestra, replace=False)]
+    centros = [X[rng.integers(len(X))]]
+    distancia = ((X - centros[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = distancia.sum()
+        # Con todos los puntos ya cubiertos (datos repetidos) se elige al azar
+        indice = rng.choice(len(X), p=distancia / total) if total > 0 else rng.integers(len(X))
+        centros.append(X[indice])
+        distancia = np.minimum(distancia, ((X - X[indice]) ** 2).sum(axis=1))
+    return np.array(centros)
+
+
+def kmeans_minibatch(X, k, tamano_lote=TAMANO_LOTE, max_iteraciones=MAX_ITERACIONES, tolerancia=1e-6, semilla=0):
+    """(centros, etiquetas, inercia) de mini-batch K-means con inicio k-means++.
+
+    Se detiene antes de `max_iteraciones` si los centros se mueven menos que `tolerancia` (suma de
+    desplazamientos al cuadrado) durante 10 lotes seguidos.
+    """
+    rng = np.random.default_rng(semilla)
+    k = min(k, len(X))
+    centros = kmeans_pp(X, k, rng)
+    vistos = np.zeros(k)
+    quietos = 0
+    for _ in range(max_iteraciones):
+        lote = X[rng.integers(len(X), size=min(tamano_lote, len(X)))]
+        etiquetas = _distancias(lote, centros).argmin(axis=1)
+        conteo = np.bincount(etiquetas, minlength=k)
+        sumas = np.stack([np.bincount(etiquetas, weights=lote[:, j], minlength=k) for j in range(X.shape[1])], axis=1)
+        vistos += conteo
+        movidos = conteo > 0
+        nuevos = centros.copy()
+        nuevos[movidos] += (sumas[movidos] - conteo[movidos, None] * centros[movidos]) / vistos[movidos, None]
+        quietos = quietos + 1 if ((nuevos - centros) ** 2).sum() < tolerancia else 0
+        centros = nuevos
+        if quietos >= 10:
+            break
+    etiquetas, inercia = asignar(X, centros)
+    return centros, etiquetas, inercia
+
+
+def silueta(X, etiquetas, muestra=MUESTRA_SILUETA, semilla=0):
+    """Coeficiente de silueta medio sobre una muestra (la matriz de distancias es muestra x muestra)."""
+    rng = np.random.default_rng(semilla)
+    if len(X) > muestra:
+        indices = rng.choice(len(X), muestra, replace=False)
+        X, etiquetas = X[indices], etiquetas[indices]
+    grupos, etiquetas = np.unique(etiquetas, return_inverse=True)
+    if len(grupos) < 2:
+        return np.nan
+    distancias = np.sqrt(np.maximum(_distancias(X, X), 0))
+    pertenencia = np.eye(len(grupos))[etiquetas]
+    tamanos = pertenencia.sum(axis=0)
+    sumas = distancias @ pertenencia
+    propio = np.arange(len(X)), etiquetas
+    # a: distancia media al propio cluster (sin contarse a sí mismo); b: al cluster ajeno más cercano
+    a = sumas[propio] / np.maximum(tamanos[etiquetas] - 1, 1)
+    medias = sumas / tamanos
+    medias[propio] = np.inf
+    b = medias.min(axis=1)
+    s = np.where(tamanos[etiquetas] > 1, (b - a) / np.maximum(a, b), 0.0)
+    return float(s.mean())
+
+
+def evaluar_k(X, valores_k=range(2, 11), muestra=MUESTRA_EVALUACION, semilla=0):
+    """Inercia media (codo) y silueta para cada k, ajustando sobre una muestra de clientes."""
+    rng = np.random.default_rng(semilla)
+    if len(X) > muestra:
+        X = X[rng.choice(len(X), muestra, replace=False)]
+    filas = []
+    for k in valores_k:
+        _, etiquetas, inercia = kmeans_minibatch(X, k, semilla=semilla)
+        filas.append({'k': k, 'Inercia': inercia / len(X), 'Silueta': silueta(X, etiquetas, semilla=semilla)})
+    return pd.DataFrame(filas)
+
+
+def segmentar_kmeans(rfm_df, k, logaritmo=True, semilla=0):
+    """Columna 'Cluster' (Categorical C1..Ck); C1 es el cluster de mayor Monetary promedio."""
+    _, etiquetas, _ = kmeans_minibatch(estandarizar(rfm_df, logaritmo), k, semilla=semilla)
+    monetary = np.bincount(etiquetas, weights=rfm_df['Monetary'].to_numpy(dtype=float), minlength=k)
+    promedio = monetary / np.maximum(np.bincount(etiquetas, minlength=k), 1)
+    rango = np.empty(k, dtype=np.int32)
+    rango[np.argsort(-promedio, kind='stable')] = np.arange(k)
+    categorias = [f"C{i + 1}" for i in range(k)]
+    return pd.Series(pd.Categorical.from_codes(rango[etiquetas], categories=categorias), index=rfm_df.index,
+                     name='Cluster')
+
+
+def perfil_clusters(rfm_df):
+    """Clientes, promedios R/F/M, ventas, segmento predominante y estrategia sugerida por cluster."""
+    perfil = rfm_df.groupby('Cluster', observed=True).agg(
+        Clientes=('Monetary', 'size'),
+        Recency=('Recency', 'mean'),
+        Frequency=('Frequency', 'mean'),
+        Monetary=('Monetary', 'mean'),
+        Ventas=('Monetary', 'sum'),
+    )
+    if 'Segment' in rfm_df.columns:
+        conteo = rfm_df.groupby(['Cluster', 'Segment'], observed=True).size()
+        predominante = conteo.sort_values(ascending=False, kind='stable').reset_index().drop_duplicates('Cluster')
+        perfil['Segmento predominante'] = predominante.set_index('Cluster')['Segment'].astype(str)
+        perfil['Estrategia'] = perfil['Segmento predominante'].map(RECOMENDACIONES)
+    return perfil.reset_index()
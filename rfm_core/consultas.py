@@ -0,0 +1,234 @@
+"""Filtros y agregaciones de transacciones sobre pandas o, opcionalmente, sobre DuckDB + Parquet.
+
+Ambos motores exponen los mismos métodos y devuelven DataFrames pequeños ya agregados. El motor se
+elige con la variable de entorno RFM_MOTOR ('pandas' por defecto, 'duckdb').
+"""
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+from rfm_core.clv import DIAS_POR_PERIODO, resumen_clv
+from rfm_core.cubo import cubo_desde_agregado, cubo_ventas
+from rfm_core.filtros import indice_filtros
+from rfm_core.puntajes import calcular_rfm, calcular_rfm_por_grupo
+from rfm_core.tipos import TIPOS
+
+MOTOR = os.environ.get('RFM_MOTOR', 'pandas')
+DIRECTORIO_PARQUET = os.environ.get('RFM_PARQUET_DIR', os.path.join('.cache', 'parquet'))
+
+
+class _Consultas:
+    def pivote(self, filas, columnas, establecimientos, rango_hora):
+        """Ventas en forma de matriz `filas` x `columnas` (para mapas de calor)."""
+        ventas = self.ventas([filas, columnas], establecimientos, rango_hora)
+        return ventas.pivot(index=filas, columns=columnas, values='Sales').fillna(0)
+
+
+class ConsultasPandas(_Consultas):
+    def __init__(self, df, huella_datos):
+        self.df = df
+        self.columnas = list(df.columns)
+        self._indice = indice_filtros(df, huella_datos)
+        self._ultimo_filtro = (None, None)
+
+    def filtrar(self, establecimientos, rango_hora):
+        clave = (tuple(establecimientos), tuple(rango_hora))
+        if self._ultimo_filtro[0] != clave:
+            self._ultimo_filtro = (clave, self._indice.filtrar(self.df, establecimientos, rango_hora))
+        return self._ultimo_filtro[1]
+
+    def rfm(self, establecimientos, rango_hora, current_date, frecuencia='filas'):
+        return calcular_rfm(self.filtrar(establecimientos, rango_hora), current_date, frecuencia=frecuencia)
+
+    def rfm_por_grupo(self, grupo, establecimientos, rango_hora, current_date, frecuencia='filas'):
+        return calcular_rfm_por_grupo(self.filtrar(establecimientos, rango_hora), current_date, grupo,
+                                      frecuencia=frecuencia)
+
+    def resumen_clv(self, establecimientos, rango_hora, current_date, frecuencia='filas'):
+        return resumen_clv(self.filtrar(establecimientos, rango_hora), current_date, frecuencia=frecuencia)
+
+    def ventas(self, por, establecimientos, rango_hora):
+        df = self.filtrar(establecimientos, rango_hora)
+        if 'Fecha' in por and 'Fecha' not in df.columns:
+            df = df.assign(Fecha=df['Order Date'].dt.date)
+        return df.groupby(por)['Sales'].sum().reset_index()
+
+    def cubo(self, establecimientos, rango_hora):
+        return cubo_ventas(self.filtrar(establecimientos, rango_hora))
+
+    def mapa(self, rfm_df, establecimientos, rango_hora):
+        df_merged = self.filtrar(establecimientos, rango_hora).merge(rfm_df, on="Customer ID")
+        return df_merged.groupby('Establecimiento').agg({'Monetary': 'sum', 'RFM Score': 'mean'}).reset_index()
+
+
+class MotorSQL(_Consultas):
+    """Consultas sobre un Parquet local con DuckDB: lee por columnas, en paralelo y sin cargarlo entero."""
+
+    def __init__(self, origen):
+        try:
+            import duckdb  # dependencia opcional; solo se carga si se usa el motor SQL
+        except ImportError:
+            raise ImportError("El motor SQL requiere el paquete 'duckdb' (pip install duckdb)") from None
+        self.origen = origen
+        self._con = duckdb.connect()
+        # La conexión se cierra cuando nadie más usa el motor (o con cerrar())
+        self._cerrar = weakref.finalize(self, self._con.close)
+        ruta = str(origen).replace("'", "''")
+        self._con.execute(f"CREATE VIEW transacciones AS SELECT * FROM read_parquet('{ruta}')")
+        descripcion = self._con.execute('DESCRIBE transacciones').fetchall()
+        self.columnas = [fila[0] for fila in descripcion]
+        self._tipos = {fila[0]: fila[1] for fila in descripcion}
+
+    def cerrar(self):
+        self._cerrar()
+
+    def _consulta(self, sql, parametros, **tablas):
+        # Un cursor por consulta: las sesiones de Streamlit llaman desde hilos distintos
+        cursor = self._con.cursor()
+        try:
+            for nombre, tabla in tablas.items():
+                cursor.register(nombre, tabla)
+            resultado = cursor.execute(sql, parametros)
+            # En modo Arrow el resultado pasa de DuckDB a pandas sin convertir a NumPy
+            return resultado.arrow().to_pandas(types_mapper=pd.ArrowDtype) if TIPOS == 'arrow' else resultado.df()
+        finally:
+            cursor.close()
+
+    def _filtro(self, establecimientos, rango_hora, alias='transacciones'):
+        # La lista se enlaza con el tipo de la columna: establecimientos numéricos o categóricos no se
+        # comparan como texto. tolist() pasa los escalares de NumPy a tipos de Python
+        tipo = self._tipos['Establecimiento']
+        sql = (f'list_contains(CAST(? AS {tipo}[]), {alias}."Establecimiento") '
+               f'AND {alias}."Hr transacc" BETWEEN ? AND ?')
+        return sql, [pd.Series(list(establecimientos)).tolist(), rango_hora[0], rango_hora[1]]
+
+    def rfm(self, establecimientos, rango_hora, current_date, frecuencia='filas'):
+        filtro, parametros = self._filtro(establecimientos, rango_hora)
+        conteo = 'count(DISTINCT "Order ID")' if frecuencia == 'pedidos' else 'count(*)'
+        rfm_df = self._consulta(f'''
+            SELECT "Customer ID",
+                   CAST(floor((epoch(CAST(? AS TIMESTAMP)) - epoch(max("Order Date"))) / 86400) AS BIGINT) AS "Recency",
+                   {conteo} AS "Frequency",
+                   sum("Sales") AS "Monetary"
+            FROM transacciones
+            WHERE "Customer ID" IS NOT NULL AND {filtro}
+            GROUP BY "Customer ID"
+            ORDER BY "Customer ID"''', [pd.Timestamp(current_date).to_pydatetime()] + parametros)
+        return rfm_df.set_index('Customer ID')
+
+    def rfm_por_grupo(self, grupo, establecimientos, rango_hora, current_date, frecuencia='filas'):
+        filtro, parametros = self._filtro(establecimientos, rango_hora)
+        conteo = 'count(DISTINCT "Order ID")' if frecuencia == 'pedidos' else 'count(*)'
+        rfm_df = self._consulta(f'''
+            SELECT "{grupo}", "Customer ID",
+                   CAST(floor((epoch(CAST(? AS TIMESTAMP)) - epoch(max("Order Date"))) / 86400) AS BIGINT) AS "Recency",
+                   {conteo} AS "Frequency",
+                   sum("Sales") AS "Monetary"
+            FROM transacciones
+            WHERE "Customer ID" IS NOT NULL AND "{grupo}" IS NOT NULL AND {filtro}
+            GROUP BY 1, 2
+            ORDER BY 1, 2''', [pd.Timestamp(current_date).to_pydatetime()] + parametros)
+        return rfm_df.set_index([grupo, 'Customer ID'])
+
+    def resumen_clv(self, establecimientos, rango_hora, current_date, frecuencia='filas'):
+        filtro, parametros = self._filtro(establecimientos, rango_hora)
+        periodo = [DIAS_POR_PERIODO, pd.Timestamp(current_date).to_pydatetime(), DIAS_POR_PERIODO]
+        # Valor de la primera compra (para el valor medio de las repetidas), con los mismos desempates
+        # que rfm_core.clv: por monto entre filas, por Order ID entre pedidos
+        if frecuencia == 'pedidos':
+            conteo, primera = 'count(DISTINCT "Order ID")', ''
+            primeras = f''',
+            primeras AS (
+                SELECT "Customer ID", first("valor" ORDER BY "fecha", "Order ID") AS "primera"
+                FROM (SELECT "Customer ID", "Order ID", min("Order Date") AS "fecha", sum("Sales") AS "valor"
+                      FROM transacciones
+                      WHERE "Customer ID" IS NOT NULL AND "Order ID" IS NOT NULL AND {filtro}
+                      GROUP BY 1, 2)
+                GROUP BY 1)'''
+            union, parametros = ' LEFT JOIN primeras USING ("Customer ID")', parametros + parametros
+        else:
+            conteo, primeras, union = 'count(*)', '', ''
+            primera = ', first("Sales" ORDER BY "Order Date", "Sales") AS "primera"'
+        resumen = self._consulta(f'''
+            WITH clientes AS (
+                SELECT "Customer ID",
+                       {conteo} - 1 AS "x",
+                       floor((epoch(max("Order Date")) - epoch(min("Order Date"))) / 86400) / ? AS "t_x",
+                       floor((epoch(CAST(? AS TIMESTAMP)) - epoch(min("Order Date"))) / 86400) / ? AS "T",
+                       sum("Sales") AS "total"{primera}
+                FROM transacciones
+                WHERE "Customer ID" IS NOT NULL AND {filtro}
+                GROUP BY "Customer ID"){primeras}
+            SELECT "Customer ID", "x", "t_x", "T",
+                   CASE WHEN "x" > 0 THEN ("total" - "primera") / "x" ELSE "primera" END AS "Valor medio"
+            FROM clientes{union}
+            ORDER BY "Customer ID"''', periodo + parametros)
+        return resumen.set_index('Customer ID')
+
+    def ventas(self, por, establecimientos, rango_hora):
+        filtro, parametros = self._filtro(establecimientos, rango_hora)
+        columnas = ', '.join('CAST("Order Date" AS DATE) AS "Fecha"' if c == 'Fecha' else f'"{c}"' for c in por)
+        grupos = ', '.join(str(i + 1) for i in range(len(por)))
+        return self._consulta(f'''
+            SELECT {columnas}, sum("Sales") AS "Sales"
+            FROM transacciones
+            WHERE {filtro}
+            GROUP BY {grupos}
+            ORDER BY {grupos}''', parametros)
+
+    def cubo(self, establecimientos, rango_hora):
+        filtro, parametros = self._filtro(establecimientos, rango_hora)
+        # A lo sumo establecimientos x 7 x 24 filas; el cubo denso se arma con cubo_desde_agregado
+        agregado = self._consulta(f'''
+            SELECT "Establecimiento", isodow("Order Date") - 1 AS "Dia", "Hr transacc",
+                   sum("Sales") AS "Sales", count(*) AS "Transacciones"
+            FROM transacciones
+            WHERE {filtro} AND "Order Date" IS NOT NULL AND "Sales" IS NOT NULL
+            GROUP BY 1, 2, 3''', parametros)
+        return cubo_desde_agregado(agregado)
+
+    def mapa(self, rfm_df, establecimientos, rango_hora):
+        filtro, parametros = self._filtro(establecimientos, rango_hora, alias='t')
+        return self._consulta(f'''
+            SELECT t."Establecimiento", sum(r."Monetary") AS "Monetary", avg(r."RFM Score") AS "RFM Score"
+            FROM transacciones t JOIN rfm r ON t."Customer ID" = r."Customer ID"
+            WHERE {filtro}
+            GROUP BY 1
+            ORDER BY 1''', parametros, rfm=rfm_df[['Monetary', 'RFM Score']].reset_index())
+
+
+def parquet_de(df, huella_datos, directorio=DIRECTORIO_PARQUET):
+    """Ruta del Parquet del dataset; se escribe una sola vez por huella."""
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, f'{huella_datos}.parquet')
+    if not os.path.exists(ruta):
+        temporal = f'{ruta}.{os.getpid()}.tmp'
+        df.to_parquet(temporal, index=False)
+        os.replace(temporal, ruta)
+    return ruta
+
+
+_motores = OrderedDict()
+_lock_motores = threading.Lock()
+MAX_MOTORES = 4
+
+
+def crear_consultas(df, huella_datos, motor=MOTOR):
+    """Consultas para el dataset según `motor`; el motor SQL se reutiliza entre sesiones.
+
+    Se guardan los motores de los MAX_MOTORES datasets usados más recientemente. Expulsar uno solo suelta
+    la referencia del registro: su conexión se cierra cuando la última sesión que lo usa lo suelta.
+    """
+    if motor != 'duckdb':
+        return ConsultasPandas(df, huella_datos)
+    with _lock_motores:
+        if huella_datos in _motores:
+            _motores.move_to_end(huella_datos)
+            return _motores[huella_datos]
+        _motores[huella_datos] = consultas = MotorSQL(parquet_de(df, huella_datos))
+        while len(_motores) > MAX_MOTORES:
+            _motores.popitem(last=False)
+        return consultas
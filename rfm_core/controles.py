@@ -0,0 +1,98 @@
+"""Controles de barra lateral compartidos por los dashboards."""
+import streamlit as st
+
+from rfm_core.puntajes import FRECUENCIAS
+from rfm_core.tareas import Tarea
+
+# st.fragment en versiones recientes; st.experimental_fragment en la 1.33 de DashDocker.
+# Un fragmento se vuelve a ejecutar solo cuando cambia uno de sus widgets, sin rehacer el script.
+fragmento = getattr(st, 'fragment', None) or st.experimental_fragment
+
+
+@fragmento(run_every=1)
+def esperar_tarea(tarea, texto="Generando..."):
+    """Barra de progreso de una Tarea; al terminar relanza el script para mostrar el resultado."""
+    st.progress(tarea.progreso, text=tarea.mensaje or texto)
+    if tarea.terminada:
+        st.rerun()
+
+
+def tarea_en_sesion(nombre, clave, funcion):
+    """Tarea `nombre` de la sesión para `clave`; si la clave cambió se cancela la anterior.
+
+    `clave` identifica los datos y filtros: al cambiar un filtro a mitad de un cálculo, el trabajo
+    viejo deja de ocupar CPU en su siguiente etapa y se lanza uno nuevo.
+    """
+    guardado = st.session_state.get(f"tarea_{nombre}")
+    if guardado is not None and guardado[0] == clave and not guardado[1].cancelada:
+        return guardado[1]
+    if guardado is not None and not guardado[1].terminada:
+        guardado[1].cancelar()
+    tarea = Tarea(funcion)
+    st.session_state[f"tarea_{nombre}"] = (clave, tarea)
+    return tarea
+
+
+def en_segundo_plano(nombre, clave, funcion, texto="Calculando...", espera=1.0):
+    """Resultado de `funcion(tarea=...)` ejecutada en el pool.
+
+    Si no termina en `espera` segundos, muestra su progreso y detiene el script aquí; el
+    fragmento de progreso vuelve a ejecutar el script cuando la tarea termina.
+    """
+    tarea = tarea_en_sesion(nombre, clave, funcion)
+    if not tarea.esperar(espera):
+        esperar_tarea(tarea, texto)
+        st.stop()
+    return tarea.resultado()
+
+
+def selector_frecuencia(columnas, predeterminada='filas', contenedor=st.sidebar):
+    """Definición de Frequency elegida en `contenedor` ('filas' o 'pedidos').
+
+    'Pedidos distintos' solo se ofrece si el archivo trae la columna Order ID.
+    """
+    opciones = [etiqueta for etiqueta, valor in FRECUENCIAS.items() if valor == 'filas' or 'Order ID' in columnas]
+    valores = [FRECUENCIAS[etiqueta] for etiqueta in opciones]
+    indice = valores.index(predeterminada) if predeterminada in valores else 0
+    etiqueta = contenedor.selectbox("Frecuencia", opciones, index=indice, key="frecuencia",
+                                    help="Transacciones: filas por cliente. Pedidos distintos: Order ID únicos por cliente.")
+    return FRECUENCIAS[etiqueta]
+
+
+def formulario_filtros(df, frecuencia_predeterminada='filas', titulo="Filtros"):
+    """Establecimientos, rango horario y Frequency en un formulario de la barra lateral.
+
+    Los cambios se acumulan y se aplican juntos con "Aplicar filtros": mover el slider o marcar
+    establecimientos no relanza el cálculo en cada clic. Con `frecuencia_predeterminada=None` no
+    se muestra el selector de Frequency y se devuelve None.
+
+    Los filtros aplicados quedan en la sesión y son los valores iniciales del formulario: en la
+    aplicación multipágina cada página abre con los filtros de la anterior.
+    """
+    st.sidebar.header(titulo)
+    opciones = df['Establecimiento'].unique()
+    aplicados = st.session_state.get('filtros_aplicados', {})
+    previos = [e for e in aplicados.get('establecimientos', []) if e in set(opciones)]
+    if 'establecimientos' in aplicados and (previos or not aplicados['establecimientos']):
+        predeterminados = previos
+    else:
+        predeterminados = list(opciones)
+    with st.sidebar.form("filtros"):
+        establecimientos = st.multiselect("Establecimientos", opciones, default=predeterminados)
+        rango_hora = st.slider("Rango Horario", 0, 23, aplicados.get('rango_hora', (0, 23)))
+        frecuencia = None
+        if frecuencia_predeterminada is not None:
+            frecuencia = selector_frecuencia(df.columns, aplicados.get('frecuencia') or frecuencia_predeterminada,
+                                             contenedor=st)
+        st.form_submit_button("Aplicar filtros", type="primary")
+    st.session_state['filtros_aplicados'] = {
+        'establecimientos': list(establecimientos), 'rango_hora': tuple(rango_hora),
+        'frecuencia': frecuencia or aplicados.get('frecuencia')}
+    return establecimientos, rango_hora, frecuencia
+
+
+def avisar_carga(df):
+    """Aviso visible si el archivo se leyó por bloques, compacto o muestreado (ver rfm_core.carga)."""
+    aviso = df.attrs.get('carga', {}).get('aviso')
+    if aviso:
+        st.warning(aviso, icon="⚠️")
@@ -0,0 +1,80 @@
+"""Cubo denso de ventas establecimiento x día de la semana x hora, calculado en una sola pasada.
+
+Cada transacción se ubica en la celda (establecimiento * 7 + día) * 24 + hora y un `np.bincount`
+suma ventas y transacciones de todas las celdas a la vez. El cubo pesa unos pocos KB por
+establecimiento, así que cambiar de establecimiento en los mapas de calor no recalcula nada.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+DIAS = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+HORAS = 24
+
+CuboVentas = namedtuple('CuboVentas', 'establecimientos ventas transacciones')
+
+
+def _acumular(codigo_est, dia, hora, ventas, establecimientos, transacciones=None):
+    # Celdas fuera de rango (hora o fecha faltante, establecimiento nulo) no entran al cubo
+    validas = (codigo_est >= 0) & (dia >= 0) & (dia < len(DIAS)) & (hora >= 0) & (hora < HORAS) & ~np.isnan(ventas)
+    celda = (codigo_est[validas].astype(np.int64) * len(DIAS) + dia[validas]) * HORAS + hora[validas]
+    forma = (len(establecimientos), len(DIAS), HORAS)
+    total = len(establecimientos) * len(DIAS) * HORAS
+    conteo = None if transacciones is None else transacciones[validas]
+    return CuboVentas(
+        pd.Index(establecimientos, name='Establecimiento'),
+        np.bincount(celda, weights=ventas[validas], minlength=total).reshape(forma),
+        np.bincount(celda, weights=conteo, minlength=total).reshape(forma),
+    )
+
+
+def cubo_ventas(df):
+    """Cubo de ventas y transacciones a partir de las transacciones (ya filtradas)."""
+    codigo_est, establecimientos = pd.factorize(df['Establecimiento'], sort=True)
+    fecha = df['Order Date']
+    dia = fecha.dt.dayofweek.to_numpy(dtype=float, na_value=np.nan)
+    hora = pd.to_numeric(df['Hr transacc'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    # NaN -> -1 para que el filtro de rango los descarte
+    dia = np.where(np.isnan(dia), -1, dia).astype(np.int64)
+    hora = np.where(np.isnan(hora), -1, hora).astype(np.int64)
+    return _acumular(codigo_est, dia, hora, df['Sales'].to_numpy(dtype=float, na_value=np.nan), establecimientos)
+
+
+def cubo_desde_agregado(agregado):
+    """Cubo a partir de ventas ya agrupadas (Establecimiento, Dia, Hr transacc, Sales, Transacciones)."""
+    codigo_est, establecimientos = pd.factorize(agregado['Establecimiento'], sort=True)
+    return _acumular(codigo_est, agregado['Dia'].to_numpy(dtype=np.int64),
+                     agregado['Hr transacc'].to_numpy(dtype=np.int64), agregado['Sales'].to_numpy(dtype=float),
+                     establecimientos, transacciones=agregado['Transacciones'].to_numpy(dtype=float))
+
+
+def matriz_dia_hora(cubo, establecimiento=None, medida='ventas'):
+    """Tabla día x hora de un establecimiento (o de todos con None) para el mapa de calor."""
+    valores = getattr(cubo, medida)
+    valores = valores.sum(axis=0) if establecimiento is None else valores[cubo.establecimientos.get_loc(establecimiento)]
+    return pd.DataFrame(valores, index=pd.Index(DIAS, name='Día'), columns=pd.RangeIndex(HORAS, name='Hora'))
+
+
+def ventanas_pico_valle(matriz, ancho=3, medida='Ventas'):
+    """Por día: la ventana de `ancho` horas seguidas con más `medida` (pico) y con menos (valle).
+
+    El valle solo considera ventanas con actividad en todas sus horas, para no proponer horas sin
+    atención. Las ventanas no cruzan la medianoche.
+    """
+    valores = matriz.to_numpy(dtype=float)
+    acumulado = np.concatenate([np.zeros((len(valores), 1)), valores.cumsum(axis=1)], axis=1)
+    sumas = acumulado[:, ancho:] - acumulado[:, :-ancho]
+    activas = np.lib.stride_tricks.sliding_window_view(valores > 0, ancho, axis=1).all(axis=2)
+    pico = sumas.argmax(axis=1)
+    valle = np.where(activas, sumas, np.inf).argmin(axis=1)
+    hay_valle = activas.any(axis=1)
+    filas = np.arange(len(valores))
+    ventana = lambda inicio: f"{inicio}:00–{inicio + ancho}:00"
+    return pd.DataFrame({
+        'Día': matriz.index,
+        'Ventana pico': [ventana(i) if s > 0 else None for i, s in zip(pico, sumas[filas, pico])],
+        f'{medida} pico': sumas[filas, pico],
+        'Ventana valle': [ventana(i) if v else None for i, v in zip(valle, hay_valle)],
+        f'{medida} valle': np.where(hay_valle, sumas[filas, valle], np.nan),
+    })
@@ -0,0 +1,189 @@
+"""Capa de datos compartida por las páginas de la aplicación multipágina (RFM_app.py).
+
+La página de inicio elige el dataset (Excel subido o catálogo) y la sesión guarda solo su referencia.
+Las transacciones viven una vez por proceso (fijas en memoria o en el archivo mapeado del catálogo) y
+el RFM y los agregados de cada dataset y filtros se calculan una sola vez, con el motor de consultas
+(RFM_MOTOR) y en la caché compartida, para todas las páginas y sesiones.
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+import pandas as pd
+import streamlit as st
+
+from rfm_core.cache import cache_compartida, clave_cache
+from rfm_core.campanas import base_campana
+from rfm_core.carga import leer_transacciones, presupuesto_memoria
+from rfm_core.catalogo import catalogo_compartido
+from rfm_core.consultas import crear_consultas
+from rfm_core.controles import en_segundo_plano
+from rfm_core.filtros import filtrar_transacciones
+from rfm_core.graficos import figura
+from rfm_core.huella import huella_archivo
+from rfm_core.metricas import medir, registrar_dataset
+from rfm_core.puntajes import asignar_segmento, puntuar_cuantiles
+
+# Fecha de corte del RFM en todos los dashboards
+FECHA_CORTE = pd.to_datetime('2015-12-31')
+
+# Excel subidos que quedan fijos en memoria (los más recientes), aunque superen el presupuesto de la
+# capa en memoria de la caché: cada rerun de cada página usa esa copia en lugar de leer el pickle
+MAX_DATASETS_ACTIVOS = int(os.environ.get('RFM_DATASETS_ACTIVOS', '2'))
+
+_activos = OrderedDict()  # clave de la caché -> transacciones
+_lock_activos = threading.Lock()
+
+
+def _fijar(clave, df):
+    with _lock_activos:
+        _activos[clave] = df
+        _activos.move_to_end(clave)
+        while len(_activos) > MAX_DATASETS_ACTIVOS:
+            _activos.popitem(last=False)
+
+
+def _fijado(clave):
+    with _lock_activos:
+        if clave in _activos:
+            _activos.move_to_end(clave)
+            return _activos[clave]
+    return None
+
+
+def cargar_excel(archivo):
+    """Lee el Excel subido en el pool (una vez por archivo) y lo deja como dataset de la sesión."""
+    cache = cache_compartida()
+    huella_datos = huella_archivo(archivo)
+    clave_datos = clave_cache('transacciones', huella_datos, presupuesto_memoria())
+    contenido = archivo.getvalue()
+
+    def cargar(tarea):
+        with medir('carga'):
+            return cache.obtener(clave_datos, lambda: leer_transacciones(io.BytesIO(contenido), avance=tarea.avanzar))
+
+    df = en_segundo_plano('carga', clave_datos, cargar, texto="Leyendo Excel...")
+    _fijar(clave_datos, df)
+    st.session_state['dataset'] = {'origen': 'excel', 'nombre': archivo.name, 'huella': huella_datos,
+                                   'clave': clave_datos}
+    registrar_dataset(df, huella_datos)
+    return df
+
+
+def abrir_catalogo(nombre, version):
+    """Abre un dataset del catálogo (memory-map) y lo deja como dataset de la sesión."""
+    df, entrada = catalogo_compartido().abrir(nombre, version)
+    st.session_state['dataset'] = {'origen': 'catalogo', 'nombre': f"{entrada.nombre} (v{entrada.version})",
+                                   'huella': entrada.huella, 'catalogo': (entrada.nombre, entrada.version)}
+    registrar_dataset(df, entrada.huella)
+    return df
+
+
+def dataset_activo():
+    """(transacciones, huella) del dataset elegido en la página de inicio; sin dataset, avisa y detiene la página."""
+    referencia = st.session_state.get('dataset')
+    if referencia is None:
+        st.info("Elige un dataset en la página de inicio (subir Excel o catálogo).")
+        st.stop()
+    if referencia['origen'] == 'catalogo':
+        df, _ = catalogo_compartido().abrir(*referencia['catalogo'])
+    else:
+        df = _fijado(referencia['clave'])
+        if df is None:
+            # Fijado por otro proceso o ya desplazado por datasets más recientes: una sola lectura de la
+            # caché, sin calcular nada si no está
+            encontrado, df = cache_compartida().leer(referencia['clave'])
+            if not encontrado:
+                # El Excel no se guarda en la sesión: si la caché lo expulsó hay que volver a subirlo
+                st.warning("El dataset ya no está en la caché; vuelve a subirlo en la página de inicio.")
+                st.stop()
+            _fijar(referencia['clave'], df)
+    st.sidebar.caption(f"Dataset: {referencia['nombre']}")
+    return df, referencia['huella']
+
+
+class DatosFiltrados:
+    """RFM y agregados del dataset con los filtros de la barra lateral.
+
+    Cada resultado se calcula una vez con el motor de consultas (pandas o DuckDB) y queda en la caché
+    compartida bajo la etapa, la huella del dataset y los filtros: las páginas solo reciben tablas
+    pequeñas ya agregadas.
+    """
+
+    def __init__(self, df, huella_datos, establecimientos, rango_hora, frecuencia):
+        self.df = df
+        self.huella_datos = huella_datos
+        self.establecimientos = establecimientos
+        self.rango_hora = rango_hora
+        self.frecuencia = frecuencia
+        self.estado_filtros = (sorted(map(str, establecimientos)), rango_hora, frecuencia)
+
+    @cached_property
+    def consultas(self):
+        # Solo se crea si algún resultado no está en la caché
+        return crear_consultas(self.df, self.huella_datos)
+
+    def clave(self, etapa, *extra):
+        return clave_cache(etapa, self.huella_datos, *self.estado_filtros, *extra)
+
+    def en_cache(self, etapa, calcular, *extra):
+        """Resultado de `calcular()` para estos filtros (y `extra`), calculado una vez por proceso."""
+        with medir(etapa):
+            return cache_compartida().obtener(self.clave(etapa, *extra), calcular)
+
+    def figura(self, etapa, *tipo, construir):
+        """Figura del resultado de `etapa` guardada por tipo de gráfico (`tipo`): alternar el tipo no la reconstruye.
+
+        `tipo` también distingue la página, si dos páginas dibujan la misma etapa con otro título.
+        """
+        return figura((self.clave(etapa),) + tipo, construir)
+
+    def transacciones(self):
+        """Transacciones filtradas, para los cálculos que las necesitan enteras (dentro de `en_cache`)."""
+        return filtrar_transacciones(self.df, self.huella_datos, self.establecimientos, self.rango_hora)
+
+    def rfm(self):
+        """RFM con puntajes por quintil y segmento (mismos cortes que r_score/fm_score)."""
+        def calcular():
+            rfm_df = puntuar_cuantiles(self.consultas.rfm(self.establecimientos, self.rango_hora, FECHA_CORTE,
+                                                          self.frecuencia))
+            rfm_df['Segment'] = asignar_segmento(rfm_df['R'], rfm_df['F'], rfm_df['M'], index=rfm_df.index)
+            return rfm_df
+
+        return self.en_cache('rfm_segmentado', calcular)
+
+    def ventas(self, *por):
+        """Ventas agrupadas por las columnas `por` ('Fecha' es la fecha sin hora)."""
+        return self.en_cache('ventas', lambda: self.consultas.ventas(list(por), self.establecimientos,
+                                                                     self.rango_hora), por)
+
+    def ventas_hora(self):
+        """Serie de ventas por hora, para las horas pico y valle."""
+        return self.ventas('Hr transacc').set_index('Hr transacc')['Sales']
+
+    def mapa(self):
+        """Ventas y RFM Score promedio por establecimiento, con el margen estimado (30 %)."""
+        def calcular():
+            df_mapa = self.consultas.mapa(self.rfm(), self.establecimientos, self.rango_hora)
+            df_mapa['Margen Estimado'] = df_mapa['Monetary'] * 0.3
+            return df_mapa
+
+        return self.en_cache('mapa', calcular)
+
+    def clientes_por_establecimiento(self):
+        """Pares (Establecimiento, Customer ID) con compras dentro de los filtros, con el RFM global del cliente."""
+        def calcular():
+            pares = self.consultas.rfm_por_grupo('Establecimiento', self.establecimientos, self.rango_hora,
+                                                 FECHA_CORTE, self.frecuencia).index.to_frame(index=False)
+            return pares.join(self.rfm()[['Recency', 'Frequency', 'Monetary', 'RFM Score']], on='Customer ID')
+
+        return self.en_cache('clientes_por_establecimiento', calcular)
+
+    def base_campana(self):
+        """Una fila por cliente con segmento, establecimiento habitual y hora pico (ver rfm_core.campanas)."""
+        return self.en_cache('base_campana', lambda: base_campana(self.transacciones(), self.rfm()))
+
+    def cubo(self):
+        return self.en_cache('cubo', lambda: self.consultas.cubo(self.establecimientos, self.rango_hora))
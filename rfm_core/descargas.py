@@ -0,0 +1,54 @@
+"""Botones de descarga que generan el archivo solo cuando se pide y lo reutilizan entre reruns."""
+import pandas as pd
+import streamlit as st
+
+from rfm_core.controles import esperar_tarea, tarea_en_sesion
+from rfm_core.exportacion import FORMATOS, bloques_de, exportar
+
+
+@st.cache_data(max_entries=32, show_spinner="Generando archivo...")
+def _artefacto(nombre_base, clave, formato, index, _fuente):
+    # `_fuente` no entra en la clave de la caché: `nombre_base` separa los botones que comparten `clave`
+    bloques = bloques_de(_fuente) if isinstance(_fuente, pd.DataFrame) else _fuente()
+    return exportar(bloques, formato, index=index).getvalue()
+
+
+def boton_descarga(etiqueta, fuente, nombre_base, clave, index=False):
+    """Descarga diferida de `fuente` (DataFrame o función que devuelve bloques).
+
+    `clave` identifica los datos y el estado de filtros: el archivo se genera al pulsar
+    "Preparar" y queda en caché, por botón (`nombre_base`), hasta que la clave cambie.
+    """
+    formato = st.selectbox("Formato", list(FORMATOS), key=f"formato_{nombre_base}")
+    estado = f"descarga_{nombre_base}"
+    if st.button(f"Preparar {etiqueta}", key=f"preparar_{nombre_base}"):
+        st.session_state[estado] = (clave, formato)
+    if st.session_state.get(estado) == (clave, formato):
+        extension, mime = FORMATOS[formato]
+        st.download_button(f"⬇ {etiqueta}", data=_artefacto(nombre_base, clave, formato, index, fuente),
+                           file_name=nombre_base + extension, mime=mime, key=f"boton_{nombre_base}")
+
+
+def boton_reporte(etiqueta, construir, nombre_archivo, mime, clave):
+    """Genera un archivo en segundo plano con `construir(tarea=...)` y lo ofrece al terminar.
+
+    Mientras el trabajo corre solo se refresca la barra de progreso, no el script completo.
+    """
+    estado = f"reporte_{nombre_archivo}"
+    if st.button(f"Generar {etiqueta}", key=f"generar_{nombre_archivo}"):
+        tarea_en_sesion(estado, clave, construir)
+    guardado = st.session_state.get(f"tarea_{estado}")
+    if guardado is None:
+        return
+    if guardado[0] != clave:
+        # Cambiaron los filtros: ese reporte ya no se va a ofrecer, no vale la pena terminarlo
+        guardado[1].cancelar()
+        return
+    tarea = guardado[1]
+    if not tarea.terminada:
+        esperar_tarea(tarea)
+    elif tarea.error() is not None:
+        st.error(f"No se pudo generar {etiqueta}: {tarea.error()}")
+    else:
+        st.download_button(f"⬇ Descargar {etiqueta}", data=tarea.resultado(), file_name=nombre_archivo,
+                           mime=mime, key=f"boton_{nombre_archivo}")
@@ -0,0 +1,59 @@
+"""Escritura por bloques de tablas a CSV comprimido y Parquet."""
+import gzip
+import io
+
+TAMANO_BLOQUE = 100_000
+
+# formato -> (extensión, mime)
+FORMATOS = {
+    'CSV (gzip)': ('.csv.gz', 'application/gzip'),
+    'Parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def bloques_de(df, tamano_bloque=TAMANO_BLOQUE):
+    """Divide un DataFrame en vistas de `tamano_bloque` filas (al menos una, para el encabezado)."""
+    for inicio in range(0, max(len(df), 1), tamano_bloque):
+        yield df.iloc[inicio:inicio + tamano_bloque]
+
+
+def escribir_csv_gzip(bloques, destino, index=False):
+    """Escribe los bloques como un único CSV gzip en `destino` (archivo binario)."""
+    with gzip.GzipFile(fileobj=destino, mode='wb', mtime=0) as comprimido:
+        with io.TextIOWrapper(comprimido, encoding='utf-8', newline='') as texto:
+            for i, bloque in enumerate(bloques):
+                bloque.to_csv(texto, index=index, header=(i == 0))
+
+
+def escribir_parquet(bloques, destino, index=False):
+    """Escribe cada bloque como un row group de un Parquet en `destino`."""
+    # pyarrow se importa solo al exportar: no se paga al abrir el dashboard
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    esquema = None
+    try:
+        for bloque in bloques:
+            tabla = pa.Table.from_pandas(bloque, schema=esquema, preserve_index=index)
+            if escritor is None:
+                esquema = tabla.schema
+                escritor = pq.ParquetWriter(destino, esquema, compression='zstd')
+            escritor.write_table(tabla)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+ESCRITORES = {
+    'CSV (gzip)': escribir_csv_gzip,
+    'Parquet': escribir_parquet,
+}
+
+
+def exportar(bloques, formato, index=False):
+    """Serializa los bloques en el formato pedido y devuelve el buffer listo para descargar."""
+    buffer = io.BytesIO()
+    ESCRITORES[formato](bloques, buffer, index=index)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,84 @@
+"""Índice de filas por (establecimiento, hora) para filtrar sin recorrer todo el dataset en cada rerun."""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+HORAS = 24
+
+
+class IndiceFiltros:
+    """Posiciones de fila ordenadas por (establecimiento, hora).
+
+    Las filas de un establecimiento quedan contiguas y, dentro de él, ordenadas por hora, así que un
+    rango horario es un único tramo por establecimiento. Un filtro se resuelve concatenando tramos
+    precalculados: el coste depende de las filas elegidas y no del tamaño del dataset.
+    """
+
+    def __init__(self, df):
+        codigo_est, self.establecimientos = pd.factorize(df['Establecimiento'])
+        hora = pd.to_numeric(df['Hr transacc'], errors='coerce').to_numpy(dtype=float)
+        # Filas sin establecimiento u hora válida nunca cumplen el filtro (igual que isin/between)
+        valida = (codigo_est >= 0) & (hora >= 0) & (hora < HORAS) & (hora == np.floor(hora))
+        clave = codigo_est.astype(np.int64) * HORAS + np.where(valida, hora, 0).astype(np.int64)
+        filas = np.flatnonzero(valida)
+        self.posiciones = filas[np.argsort(clave[filas], kind='stable')]
+        conteo = np.bincount(clave[filas], minlength=len(self.establecimientos) * HORAS)
+        self.limites = np.r_[0, np.cumsum(conteo)]
+        self.filas = len(df)
+
+    def _tramos(self, establecimientos, rango_hora):
+        desde = max(int(np.ceil(rango_hora[0])), 0)
+        hasta = min(int(np.floor(rango_hora[1])), HORAS - 1)
+        if desde > hasta:
+            return []
+        codigos = self.establecimientos.get_indexer(pd.Index(list(establecimientos)).unique())
+        return [(self.limites[c * HORAS + desde], self.limites[c * HORAS + hasta + 1]) for c in codigos[codigos >= 0]]
+
+    def contar(self, establecimientos, rango_hora):
+        """Número de filas que cumplen el filtro, sin materializarlas."""
+        return int(sum(fin - inicio for inicio, fin in self._tramos(establecimientos, rango_hora)))
+
+    def seleccion(self, establecimientos, rango_hora):
+        """Posiciones (en orden original) que cumplen el filtro, o None si lo cumplen todas."""
+        tramos = self._tramos(establecimientos, rango_hora)
+        if sum(fin - inicio for inicio, fin in tramos) == self.filas:
+            return None
+        if not tramos:
+            return np.array([], dtype=np.int64)
+        return np.sort(np.concatenate([self.posiciones[inicio:fin] for inicio, fin in tramos]))
+
+    def filtrar(self, df, establecimientos, rango_hora):
+        """Filas de `df` que cumplen el filtro.
+
+        Con la selección completa devuelve una copia superficial: comparte los datos sin copiarlos, pero
+        agregar, quitar o renombrar columnas en el resultado no toca el DataFrame compartido.
+        """
+        posiciones = self.seleccion(establecimientos, rango_hora)
+        return df.copy(deep=False) if posiciones is None else df.take(posiciones)
+
+
+_indices = OrderedDict()
+_lock_indices = threading.Lock()
+MAX_INDICES = 8
+
+
+def indice_filtros(df, huella_datos):
+    """Índice del dataset identificado por `huella_datos`; se construye una vez por proceso."""
+    with _lock_indices:
+        if huella_datos in _indices:
+            _indices.move_to_end(huella_datos)
+            return _indices[huella_datos]
+    # Se construye fuera del lock; si dos sesiones lo construyen a la vez, queda el primero
+    indice = IndiceFiltros(df)
+    with _lock_indices:
+        indice = _indices.setdefault(huella_datos, indice)
+        while len(_indices) > MAX_INDICES:
+            _indices.popitem(last=False)
+        return indice
+
+
+def filtrar_transacciones(df, huella_datos, establecimientos, rango_hora):
+    """Equivale a `df[df['Establecimiento'].isin(...) & df['Hr transacc'].between(...)]`."""
+    return indice_filtros(df, huella_datos).filtrar(df, establecimientos, rango_hora)
@@ -0,0 +1,116 @@
+"""Figuras Plotly con presupuesto: WebGL con muchos puntos, JSON acotado y caché por datos y tipo de gráfico.
+
+- Con más de RFM_UMBRAL_WEBGL puntos las dispersiones usan trazas WebGL (scattergl): el navegador
+  dibuja en la GPU en lugar de crear un nodo SVG por punto.
+- Cada figura tiene un presupuesto de JSON (RFM_FIGURA_BYTES). Si los datos no caben, las
+  dispersiones usan una muestra estable (estratificada por color) y los histogramas se agregan en el
+  servidor: se envían los conteos por intervalo y no un valor por cliente.
+- Las figuras construidas se guardan en memoria por proceso, con la clave de los datos y del tipo de
+  gráfico: volver a un tipo ya visto en un selector no reconstruye la figura.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+UMBRAL_WEBGL = int(os.environ.get('RFM_UMBRAL_WEBGL', '2000'))
+PRESUPUESTO_FIGURA = int(os.environ.get('RFM_FIGURA_BYTES', str(2 * 1024 ** 2)))
+MAX_FIGURAS = int(os.environ.get('RFM_FIGURAS', '64'))
+
+# Filas usadas para estimar cuánto ocupa cada punto en el JSON de la figura
+FILAS_ESTIMACION = 1_000
+
+_figuras = OrderedDict()  # clave -> figura
+_lock = threading.Lock()
+
+
+def figura(clave, construir):
+    """Figura guardada bajo `clave` o construida con `construir()`; LRU de MAX_FIGURAS por proceso.
+
+    Las figuras se comparten entre sesiones: no se deben modificar después de obtenerlas (los
+    ajustes de layout van dentro de `construir`).
+    """
+    with _lock:
+        if clave in _figuras:
+            _figuras.move_to_end(clave)
+            return _figuras[clave]
+    fig = construir()
+    with _lock:
+        _figuras[clave] = fig
+        while len(_figuras) > MAX_FIGURAS:
+            _figuras.popitem(last=False)
+    return fig
+
+
+def _columnas_usadas(x, y, kwargs):
+    columnas = [x, y]
+    for argumento in ('color', 'size', 'symbol', 'text', 'hover_name'):
+        if isinstance(kwargs.get(argumento), str):
+            columnas.append(kwargs[argumento])
+    hover = kwargs.get('hover_data') or []
+    columnas += [c for c in (hover if isinstance(hover, (list, tuple)) else list(hover)) if isinstance(c, str)]
+    return list(dict.fromkeys(c for c in columnas if c is not None))
+
+
+def bytes_por_fila(df, columnas):
+    """Bytes de JSON por fila de `columnas`, estimados con las primeras FILAS_ESTIMACION filas."""
+    muestra = df[columnas].head(FILAS_ESTIMACION)
+    if muestra.empty:
+        return 1
+    # Plotly serializa los decimales con precisión completa
+    return max(len(muestra.to_json(orient='values', double_precision=15, date_format='iso')) / len(muestra), 1)
+
+
+def acotar(df, columnas, presupuesto=PRESUPUESTO_FIGURA, estrato=None):
+    """(filas de `df` que caben en `presupuesto`, fracción usada).
+
+    Si no caben todas, toma una muestra estable; con `estrato`, la misma fracción de cada valor de
+    esa columna (así no desaparece ningún color de la leyenda).
+    """
+    maximo = int(presupuesto // bytes_por_fila(df, columnas))
+    if len(df) <= maximo:
+        return df, 1.0
+    fraccion = maximo / len(df)
+    if estrato is not None and estrato in df.columns:
+        muestra = df.groupby(estrato, group_keys=False, observed=True).sample(frac=fraccion, random_state=0)
+    else:
+        muestra = df.sample(n=maximo, random_state=0)
+    return muestra, fraccion
+
+
+def _nota_muestra(fig, mostrados, total):
+    fig.add_annotation(text=f"Muestra de {mostrados:,} de {total:,} puntos", xref='paper', yref='paper',
+                       x=1, y=1.02, xanchor='right', yanchor='bottom', showarrow=False, font=dict(size=11))
+
+
+def dispersion(df, x, y, presupuesto=PRESUPUESTO_FIGURA, **kwargs):
+    """`px.scatter` que pasa a WebGL con más de UMBRAL_WEBGL puntos y muestrea si no cabe en `presupuesto`."""
+    import plotly.express as px
+
+    color = kwargs.get('color')
+    datos, fraccion = acotar(df, _columnas_usadas(x, y, kwargs), presupuesto,
+                             estrato=color if isinstance(color, str) and df[color].dtype.kind not in 'fiu' else None)
+    fig = px.scatter(datos, x=x, y=y, render_mode='webgl' if len(datos) > UMBRAL_WEBGL else 'svg', **kwargs)
+    if fraccion < 1:
+        _nota_muestra(fig, len(datos), len(df))
+    return fig
+
+
+def histograma(df, x, nbins=20, presupuesto=PRESUPUESTO_FIGURA, **kwargs):
+    """`px.histogram` si los valores caben en `presupuesto`; si no, barras con los conteos ya agregados.
+
+    Los intervalos agregados son `nbins` de igual ancho entre el mínimo y el máximo.
+    """
+    import plotly.express as px
+
+    if len(df) <= presupuesto // bytes_por_fila(df, [x]):
+        return px.histogram(df, x=x, nbins=nbins, **kwargs)
+    valores = df[x].to_numpy(dtype=float, na_value=np.nan)
+    valores = valores[~np.isnan(valores)]
+    conteo, bordes = np.histogram(valores, bins=nbins)
+    centros = (bordes[:-1] + bordes[1:]) / 2
+    fig = px.bar(x=centros, y=conteo, labels={'x': x, 'y': 'count'}, **kwargs)
+    fig.update_traces(width=np.diff(bordes), hovertemplate=f"{x}=%{{x}}<br>count=%{{y}}<extra></extra>")
+    fig.update_layout(bargap=0)
+    return fig
@@ -0,0 +1,97 @@
+"""Historia RFM: fotos de Recency/Frequency/Monetary en varias fechas de corte con una sola pasada."""
+import numpy as np
+import pandas as pd
+
+
+def fechas_fin_de_mes(df):
+    """Cierres de mes entre la primera y la última compra."""
+    fechas = df['Order Date'].dropna()
+    if fechas.empty:
+        return pd.DatetimeIndex([])
+    return pd.date_range(fechas.min().normalize(), fechas.max() + pd.offsets.MonthEnd(0), freq='ME')
+
+
+def historia_rfm(df, fechas_corte, frecuencia='filas'):
+    """Tabla (cliente, periodo) con el RFM de cada cliente a cada fecha de corte.
+
+    Cada transacción se asigna al primer corte que la incluye; se agregan las transacciones por
+    (cliente, periodo) sobre los datos ordenados y el estado acumulado por cliente (última compra,
+    número de compras y ventas) se propaga hacia los cortes siguientes. Solo aparecen los periodos
+    desde la primera compra de cada cliente.
+
+    Cada corte incluye su día completo (compras con hora del mismo día entran en ese corte) y la
+    Recency son días calendario: el RFM en el corte `f` equivale a `calcular_rfm` sobre las compras
+    hasta el final del día `f`, con ese instante como fecha de referencia.
+
+    Con `frecuencia='pedidos'` cada Order ID cuenta una sola vez, en el periodo de su primera fila.
+    """
+    cortes = pd.DatetimeIndex(fechas_corte).sort_values()
+    dias_corte = cortes.values.astype('datetime64[D]').astype(np.int64)
+    datos = df.dropna(subset=['Customer ID', 'Order Date'])
+    dia_compra = datos['Order Date'].values.astype('datetime64[D]').astype(np.int64)
+    periodo = np.searchsorted(dias_corte, dia_compra, side='left')
+    dentro = periodo < len(cortes)
+    codigos, clientes = pd.factorize(datos['Customer ID'].values[dentro], sort=True)
+    periodo = periodo[dentro]
+    if len(codigos) == 0:
+        return pd.DataFrame({'Customer ID': pd.Categorical([]), 'Periodo': pd.DatetimeIndex([]),
+                             'Recency': np.array([], dtype=np.int32), 'Frequency': np.array([], dtype=np.int32),
+                             'Monetary': np.array([], dtype=float)})
+
+    # Agregado por (cliente, periodo) en una pasada ordenada
+    clave = codigos.astype(np.int64) * len(cortes) + periodo
+    orden = np.argsort(clave, kind='stable')
+    clave = clave[orden]
+    inicios = np.flatnonzero(np.r_[True, clave[1:] != clave[:-1]])
+    dias = dia_compra[dentro][orden]
+    ventas = datos['Sales'].to_numpy(dtype=float)[dentro][orden]
+    c_activo = clave[inicios] // len(cortes)
+    p_activo = clave[inicios] % len(cortes)
+    if frecuencia == 'pedidos':
+        # Primera aparición de cada par (cliente, pedido) en orden de fecha
+        pedido = pd.factorize(datos['Order ID'].values[dentro])[0]
+        dia_fila = datos['Order Date'].values[dentro]
+        pares = pd.DataFrame({'c': codigos, 'p': pedido, 'd': dia_fila}).sort_values('d', kind='stable')
+        primera = (~pares.duplicated(['c', 'p'])).sort_index().to_numpy() & (pedido >= 0)
+        peso = primera[orden].astype(np.int64)
+        n_activo = np.add.reduceat(peso, inicios)
+    else:
+        n_activo = np.diff(np.r_[inicios, len(clave)])
+    ventas_activo = np.add.reduceat(ventas, inicios)
+    ultimo_activo = np.maximum.reduceat(dias, inicios)
+
+    # Filas densas: para cada cliente, del periodo de su primera compra al último corte
+    primer_periodo = np.full(len(clientes), len(cortes), dtype=np.int64)
+    np.minimum.at(primer_periodo, c_activo, p_activo)
+    filas_por_cliente = len(cortes) - primer_periodo
+    desplazamiento = np.r_[0, np.cumsum(filas_por_cliente)[:-1]]
+    total = int(filas_por_cliente.sum())
+    cliente_fila = np.repeat(np.arange(len(clientes)), filas_por_cliente)
+    periodo_fila = np.arange(total) - np.repeat(desplazamiento, filas_por_cliente) + np.repeat(primer_periodo, filas_por_cliente)
+
+    posicion = desplazamiento[c_activo] + p_activo - primer_periodo[c_activo]
+    n = np.zeros(total, dtype=np.int64)
+    n[posicion] = n_activo
+    monto = np.zeros(total)
+    monto[posicion] = ventas_activo
+    # Última compra acumulada: cada cliente suma una base propia para que el máximo acumulado
+    # no arrastre fechas de un cliente al siguiente (la primera fila de cada cliente siempre tiene compra)
+    dia_minimo = ultimo_activo.min()
+    base = cliente_fila.astype(np.int64) << 32
+    ultimo = base.copy()
+    ultimo[posicion] += ultimo_activo - dia_minimo
+    ultimo = np.maximum.accumulate(ultimo) - base + dia_minimo
+
+    inicio_cliente = np.repeat(desplazamiento, filas_por_cliente)
+    n_acum = np.cumsum(n)
+    monto_acum = np.cumsum(monto)
+    n_previo = np.where(inicio_cliente > 0, n_acum[inicio_cliente - 1], 0)
+    monto_previo = np.where(inicio_cliente > 0, monto_acum[inicio_cliente - 1], 0.0)
+
+    return pd.DataFrame({
+        'Customer ID': pd.Categorical.from_codes(cliente_fila, categories=clientes),
+        'Periodo': cortes[periodo_fila],
+        'Recency': (dias_corte[periodo_fila] - ultimo).astype(np.int32),
+        'Frequency': (n_acum - n_previo).astype(np.int32),
+        'Monetary': monto_acum - monto_previo,
+    })
@@ -0,0 +1,12 @@
+"""Huellas (hashes) estables de archivos y estados de filtro para usar como claves de caché."""
+import hashlib
+
+
+def huella_archivo(archivo):
+    """SHA-1 del contenido de un archivo subido (UploadedFile o cualquier objeto con getvalue)."""
+    return hashlib.sha1(archivo.getvalue()).hexdigest()
+
+
+def huella(*partes):
+    """SHA-1 de la representación de `partes` (huella del dataset, filtros, versión...)."""
+    return hashlib.sha1(repr(partes).encode('utf-8')).hexdigest()
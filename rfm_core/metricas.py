@@ -0,0 +1,248 @@
+"""Métricas del proceso en formato de texto de Prometheus, servidas en un puerto local.
+
+Sin dependencias externas: un servidor HTTP de la biblioteca estándar en un hilo demonio responde
+`/metrics` con histogramas de latencia por etapa, tamaño del último dataset, aciertos de la caché
+compartida, sesiones activas de Streamlit y memoria residente del proceso.
+
+Variables de entorno: RFM_METRICAS_PUERTO (9108; 0 desactiva el servidor) y RFM_METRICAS_HOST
+(127.0.0.1; en el contenedor se usa 0.0.0.0 para que el scraper llegue desde fuera).
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PUERTO = int(os.environ.get('RFM_METRICAS_PUERTO', 9108))
+HOST = os.environ.get('RFM_METRICAS_HOST', '127.0.0.1')
+
+# Límites (segundos) de los buckets de latencia: de una lectura de caché a una carga de Excel grande
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+TIPO_CONTENIDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+_log = logging.getLogger(__name__)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(pares):
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in pares) + '}'
+
+
+def _numero(valor):
+    if valor != valor:
+        return 'NaN'
+    if valor in (float('inf'), float('-inf')):
+        return '+Inf' if valor > 0 else '-Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Histograma:
+    """Histograma acumulativo con una serie por valor de la etiqueta `etiqueta`."""
+
+    def __init__(self, nombre, ayuda, etiqueta, limites=LIMITES_SEGUNDOS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiqueta = etiqueta
+        self.limites = tuple(limites)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor_etiqueta, valor):
+        with self._lock:
+            conteos, suma = self._series.get(valor_etiqueta, ([0] * (len(self.limites) + 1), 0.0))
+            conteos[bisect.bisect_left(self.limites, valor)] += 1
+            self._series[valor_etiqueta] = (conteos, suma + valor)
+
+    def exponer(self):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} histogram']
+        with self._lock:
+            series = {k: (list(c), s) for k, (c, s) in self._series.items()}
+        for valor_etiqueta, (conteos, suma) in sorted(series.items()):
+            acumulado = 0
+            for limite, conteo in zip(self.limites + (float('inf'),), conteos):
+                acumulado += conteo
+                etiquetas = _etiquetas([(self.etiqueta, valor_etiqueta), ('le', _numero(float(limite)))])
+                lineas.append(f'{self.nombre}_bucket{etiquetas} {acumulado}')
+            base = _etiquetas([(self.etiqueta, valor_etiqueta)])
+            lineas.append(f'{self.nombre}_sum{base} {_numero(suma)}')
+            lineas.append(f'{self.nombre}_count{base} {acumulado}')
+        return lineas
+
+
+class Registro:
+    """Histogramas más métricas simples que se leen en el momento del scrape."""
+
+    def __init__(self):
+        self.histogramas = []
+        self._lecturas = []  # (nombre, tipo, ayuda, función -> [(etiquetas, valor)])
+        self._valores = {}
+        self._lock = threading.Lock()
+        self._scrape = threading.local()
+
+    def histograma(self, nombre, ayuda, etiqueta, limites=LIMITES_SEGUNDOS):
+        histograma = Histograma(nombre, ayuda, etiqueta, limites)
+        self.histogramas.append(histograma)
+        return histograma
+
+    def lectura(self, nombre, tipo, ayuda, funcion):
+        """Registra una métrica (`gauge` o `counter`) cuyo valor calcula `funcion` en cada scrape."""
+        self._lecturas.append((nombre, tipo, ayuda, funcion))
+
+    def fijar(self, nombre, valor):
+        """Valor de un gauge fijado desde la app (p. ej. filas del último dataset)."""
+        with self._lock:
+            self._valores[nombre] = valor
+
+    def valor(self, nombre, predeterminado=float('nan')):
+        with self._lock:
+            return self._valores.get(nombre, predeterminado)
+
+    def una_vez_por_scrape(self, funcion):
+        """`funcion` llamada una sola vez por scrape aunque la lean varias métricas."""
+        def leer():
+            leidos = getattr(self._scrape, 'leidos', None)
+            if leidos is None:  # fuera de un scrape
+                return funcion()
+            if funcion not in leidos:
+                leidos[funcion] = funcion()
+            return leidos[funcion]
+        return leer
+
+    def exponer(self):
+        lineas = []
+        for histograma in self.histogramas:
+            lineas.extend(histograma.exponer())
+        self._scrape.leidos = {}
+        try:
+            for nombre, tipo, ayuda, funcion in self._lecturas:
+                try:
+                    muestras = funcion()
+                except Exception:  # una lectura fallida no debe tirar el scrape completo
+                    _log.exception("No se pudo leer la métrica %s", nombre)
+                    continue
+                lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} {tipo}']
+                lineas += [f'{nombre}{_etiquetas(etiquetas)} {_numero(valor)}' for etiquetas, valor in muestras]
+        finally:
+            self._scrape.leidos = None
+        return '\n'.join(lineas) + '\n'
+
+
+def _rss_bytes():
+    """Memoria residente actual (Linux: /proc/self/statm); fuera de Linux, el pico de ru_maxrss."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maximo if os.uname().sysname == 'Darwin' else maximo * 1024
+
+
+_aviso_sesiones = threading.Event()
+
+
+def _sesiones_activas():
+    # Streamlit no expone el número de sesiones: se lee su SessionManager interno. Si cambia entre
+    # versiones, la métrica queda en NaN (con un aviso en el log) en lugar de desaparecer del scrape
+    try:
+        from streamlit.runtime import Runtime
+        if not Runtime.exists():
+            return float('nan')
+        return Runtime.instance()._session_mgr.num_active_sessions()
+    except (ImportError, AttributeError) as error:
+        if not _aviso_sesiones.is_set():
+            _aviso_sesiones.set()
+            _log.warning("Sesiones activas no disponibles en esta versión de Streamlit (%s)", error)
+        return float('nan')
+
+
+def _estadisticas_cache():
+    from rfm_core.cache import cache_compartida
+    return cache_compartida().estadisticas()
+
+
+registro = Registro()
+_cache = registro.una_vez_por_scrape(_estadisticas_cache)
+ETAPAS = registro.histograma('rfm_etapa_segundos', 'Latencia por etapa del pipeline (incluye aciertos de caché).',
+                             'etapa')
+registro.lectura('rfm_dataset_filas', 'gauge', 'Filas del último dataset cargado.',
+                 lambda: [((), registro.valor('rfm_dataset_filas'))])
+registro.lectura('rfm_dataset_clientes', 'gauge', 'Clientes distintos del último dataset cargado.',
+                 lambda: [((), registro.valor('rfm_dataset_clientes'))])
+registro.lectura('rfm_cache_consultas_total', 'counter', 'Consultas a la caché compartida por resultado.',
+                 lambda: [((('resultado', resultado),), _cache()[clave]) for resultado, clave in
+                          (('acierto_memoria', 'aciertos_memoria'), ('acierto_disco', 'aciertos_disco'),
+                           ('fallo', 'fallos'))])
+registro.lectura('rfm_cache_tasa_aciertos', 'gauge', 'Fracción de consultas a la caché resueltas sin recalcular.',
+                 lambda: [((), _cache()['tasa_aciertos'])])
+registro.lectura('rfm_cache_bytes', 'gauge', 'Bytes ocupados por la caché compartida por capa.',
+                 lambda: [((('capa', capa),), _cache()[f'bytes_{capa}']) for capa in ('disco', 'memoria')])
+registro.lectura('rfm_sesiones_activas', 'gauge', 'Sesiones de Streamlit conectadas a este proceso.',
+                 lambda: [((), _sesiones_activas())])
+registro.lectura('rfm_proceso_rss_bytes', 'gauge', 'Memoria residente del proceso.',
+                 lambda: [((), _rss_bytes())])
+
+
+@contextmanager
+def medir(etapa):
+    """Registra la duración del bloque en el histograma de etapas."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        ETAPAS.observar(etapa, time.perf_counter() - inicio)
+
+
+def registrar_dataset(df, huella_datos):
+    """Tamaño del dataset en uso (último cargado en el proceso); solo se recuenta si cambia la huella."""
+    if registro.valor('rfm_dataset_huella', None) != huella_datos:
+        registro.fijar('rfm_dataset_filas', len(df))
+        registro.fijar('rfm_dataset_clientes', df['Customer ID'].nunique())
+        registro.fijar('rfm_dataset_huella', huella_datos)
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        cuerpo = registro.exponer().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', TIPO_CONTENIDO)
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):  # sin una línea de log por scrape
+        pass
+
+
+_servidor = None
+_lock_servidor = threading.Lock()
+
+
+def iniciar_servidor(puerto=PUERTO, host=HOST):
+    """Arranca (una vez por proceso) el servidor de métricas; devuelve el puerto o None si está desactivado."""
+    global _servidor
+    if not puerto:
+        return None
+    with _lock_servidor:
+        if _servidor is None:
+            try:
+                _servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+            except OSError as error:
+                # Puerto ocupado (p. ej. otro proceso ya publica métricas): no se reintenta en cada rerun
+                _log.warning("Métricas no disponibles en %s:%s (%s)", host, puerto, error)
+                _servidor = False
+                return None
+            _servidor.daemon_threads = True
+            threading.Thread(target=_servidor.serve_forever, name='rfm-metricas', daemon=True).start()
+        return _servidor.server_address[1] if _servidor else None
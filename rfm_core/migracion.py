@@ -0,0 +1,50 @@
+"""Matriz de migración de segmentos entre dos periodos de la historia RFM."""
+import numpy as np
+import pandas as pd
+
+from rfm_core.puntajes import SEGMENTOS, codigos_segmento, puntajes_rfm
+
+NUEVOS = 'Nuevos'
+
+
+def codigos_por_periodo(historia):
+    """Código de segmento (índice en SEGMENTOS) de cada fila de la historia, puntuada dentro de su periodo."""
+    codigos = np.empty(len(historia), dtype=np.int8)
+    for posiciones in historia.groupby('Periodo').indices.values():
+        codigos[posiciones] = codigos_segmento(*puntajes_rfm(historia.iloc[posiciones]))
+    return codigos
+
+
+def matriz_migracion(historia, codigos, periodo_origen, periodo_destino):
+    """Clientes y ventas que pasan de cada segmento (filas) a cada segmento (columnas).
+
+    La fila 'Nuevos' cuenta a quienes no tenían compras en el periodo de origen. Las ventas son las
+    generadas entre ambos cortes (Monetary acumulado en destino menos el de origen). El destino
+    tiene que ser posterior al origen.
+    """
+    if pd.Timestamp(periodo_destino) <= pd.Timestamp(periodo_origen):
+        raise ValueError(f"El periodo de destino ({periodo_destino}) debe ser posterior al de origen "
+                         f"({periodo_origen})")
+    k = len(SEGMENTOS)
+    cliente = historia['Customer ID'].cat.codes.to_numpy()
+    n_clientes = len(historia['Customer ID'].cat.categories)
+    periodos = historia['Periodo'].to_numpy()
+    monetary = historia['Monetary'].to_numpy(dtype=float)
+
+    en_origen = periodos == np.datetime64(pd.Timestamp(periodo_origen))
+    en_destino = periodos == np.datetime64(pd.Timestamp(periodo_destino))
+    origen = np.full(n_clientes, k, dtype=np.int64)
+    origen[cliente[en_origen]] = codigos[en_origen]
+    destino = np.full(n_clientes, -1, dtype=np.int64)
+    destino[cliente[en_destino]] = codigos[en_destino]
+    ventas = np.zeros(n_clientes)
+    ventas[cliente[en_destino]] = monetary[en_destino]
+    ventas[cliente[en_origen]] -= monetary[en_origen]
+
+    presentes = destino >= 0
+    celda = origen[presentes] * k + destino[presentes]
+    clientes = np.bincount(celda, minlength=(k + 1) * k).reshape(k + 1, k)
+    monto = np.bincount(celda, weights=ventas[presentes], minlength=(k + 1) * k).reshape(k + 1, k)
+    filas = pd.Index(SEGMENTOS + [NUEVOS], name='Desde')
+    columnas = pd.Index(SEGMENTOS, name='Hacia')
+    return pd.DataFrame(clientes, index=filas, columns=columnas), pd.DataFrame(monto, index=filas, columns=columnas)
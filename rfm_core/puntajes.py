@@ -0,0 +1,185 @@
+"""Cálculo vectorizado de la tabla RFM, puntajes por quintil y segmentos."""
+import numpy as np
+import pandas as pd
+
+from rfm_core.tipos import completar_arrow
+
+CUANTILES = [0.20, 0.40, 0.60, 0.80]
+
+SEGMENTOS = ['Champions', 'Leales', 'Potenciales', 'En riesgo']
+
+# Reglas de segmentación de rfm_dashboard.py / rfm2_dashboard.py como códigos R*100 + F*10 + M
+REGLAS_SEGMENTO = {
+    'Champions': [555, 554, 545, 544],
+    'Leales': [543, 444, 433],
+    'En riesgo': [111, 112, 121],
+}
+
+RECOMENDACIONES = {
+    'Champions': 'Ofrecer acceso exclusivo, preventas y programas de fidelización.',
+    'Leales': 'Recompensar su fidelidad con descuentos o beneficios adicionales.',
+    'Potenciales': 'Enviar campañas atractivas y descuentos iniciales.',
+    'En riesgo': 'Lanzar ofertas agresivas y recordatorios personalizados.'
+}
+
+
+# Columnas que no tiene sentido usar para agrupar puntajes (identificadores)
+COLUMNAS_ID = ['Customer ID', 'Order ID']
+
+# Definiciones de Frequency: filas de transacción ('count') o pedidos distintos ('nunique' de Order ID)
+FRECUENCIAS = {'Transacciones': 'filas', 'Pedidos distintos': 'pedidos'}
+
+
+def pedidos_distintos(clientes, pedidos):
+    """Pedidos distintos por cliente sobre códigos enteros (equivale a groupby + 'nunique').
+
+    Cada par (cliente, pedido) se codifica en un int64 y se cuentan los pares únicos, sin hashear
+    los Order ID de cada grupo.
+    """
+    codigo_cliente, valores_cliente = pd.factorize(np.asarray(clientes), sort=True)
+    codigo_pedido, valores_pedido = pd.factorize(np.asarray(pedidos))
+    validos = (codigo_cliente >= 0) & (codigo_pedido >= 0)
+    base = max(len(valores_pedido), 1)
+    pares = np.unique(codigo_cliente[validos].astype(np.int64) * base + codigo_pedido[validos])
+    conteo = np.bincount(pares // base, minlength=len(valores_cliente))
+    return pd.Series(conteo, index=pd.Index(valores_cliente, name='Customer ID'), name='Frequency')
+
+
+class ContadorPedidos:
+    """Pedidos distintos por cliente mantenidos de forma incremental al llegar nuevos lotes.
+
+    Guarda los pares (cliente, pedido) ya vistos como int64 ordenados; cada lote solo suma los
+    pares nuevos en lugar de recontar todo el historial.
+    """
+
+    def __init__(self):
+        self._clientes = pd.Index([])
+        self._pedidos = pd.Index([])
+        self._pares = np.array([], dtype=np.int64)
+        self._conteo = np.array([], dtype=np.int64)
+
+    @staticmethod
+    def _codigos(indice, valores):
+        valores = pd.Index(valores).dropna()
+        nuevos = valores.unique().difference(indice, sort=False)
+        indice = indice.append(nuevos)
+        return indice, indice.get_indexer(valores)
+
+    def agregar(self, df):
+        datos = df[['Customer ID', 'Order ID']].dropna()
+        self._clientes, codigo_cliente = self._codigos(self._clientes, datos['Customer ID'])
+        self._pedidos, codigo_pedido = self._codigos(self._pedidos, datos['Order ID'])
+        pares = np.unique((codigo_cliente.astype(np.int64) << 32) | codigo_pedido)
+        nuevos = pares[~np.isin(pares, self._pares, assume_unique=True)]
+        self._pares = np.union1d(self._pares, nuevos)
+        self._conteo = np.r_[self._conteo, np.zeros(len(self._clientes) - len(self._conteo), dtype=np.int64)]
+        self._conteo += np.bincount(nuevos >> 32, minlength=len(self._clientes))
+        return self
+
+    def frecuencia(self):
+        return pd.Series(self._conteo, index=pd.Index(self._clientes, name='Customer ID'), name='Frequency').sort_index()
+
+
+def calcular_rfm(df, current_date, frecuencia='filas'):
+    """Recency/Frequency/Monetary por cliente sin lambdas por grupo.
+
+    `frecuencia` es 'filas' (transacciones) o 'pedidos' (Order ID distintos), ver FRECUENCIAS.
+    """
+    grupos = df.groupby('Customer ID')
+    rfm_df = pd.DataFrame({
+        'Recency': (current_date - grupos['Order Date'].max()).dt.days,
+        'Frequency': (pedidos_distintos(df['Customer ID'], df['Order ID']) if frecuencia == 'pedidos'
+                      else grupos.size()),
+        'Monetary': grupos['Sales'].sum(),
+    })
+    rfm_df['Recency'] = rfm_df['Recency'].astype(int)
+    return completar_arrow(rfm_df)
+
+
+def columnas_agrupables(df):
+    """Columnas de texto o categóricas (sin identificadores) por las que se pueden agrupar puntajes."""
+    # kind 'O': object, string[pyarrow] y categóricas; 'U': texto de pd.ArrowDtype
+    return [c for c in df.columns if c not in COLUMNAS_ID and df[c].dtype.kind in 'OU']
+
+
+def calcular_rfm_por_grupo(df, current_date, grupo='Establecimiento', frecuencia='filas'):
+    """Recency/Frequency/Monetary por (`grupo`, cliente): lo que cada cliente hizo dentro de cada grupo.
+
+    Las filas sin valor en `grupo` no entran (como en cualquier groupby).
+    """
+    grupos = df.groupby([grupo, 'Customer ID'], observed=True)
+    rfm_df = pd.DataFrame({
+        'Recency': (current_date - grupos['Order Date'].max()).dt.days,
+        'Frequency': grupos['Order ID'].nunique() if frecuencia == 'pedidos' else grupos.size(),
+        'Monetary': grupos['Sales'].sum(),
+    })
+    rfm_df['Recency'] = rfm_df['Recency'].astype(int)
+    return completar_arrow(rfm_df)
+
+
+def _puntaje_cuantil(valores, cortes, invertir=False):
+    # Equivale a la cadena de `x <= d[p][q]` de r_score/fm_score: cuenta los cortes menores que x
+    posicion = np.searchsorted(np.asarray(cortes, dtype=float), np.asarray(valores, dtype=float), side='left')
+    return (5 - posicion) if invertir else (1 + posicion)
+
+
+def puntajes_rfm(rfm_df):
+    """Arrays (R, F, M) con los cortes por quintil de los scripts dinámicos."""
+    cortes = rfm_df[['Recency', 'Frequency', 'Monetary']].quantile(q=CUANTILES)
+    return (_puntaje_cuantil(rfm_df['Recency'], cortes['Recency'], invertir=True),
+            _puntaje_cuantil(rfm_df['Frequency'], cortes['Frequency']),
+            _puntaje_cuantil(rfm_df['Monetary'], cortes['Monetary']))
+
+
+def puntajes_rfm_por_grupo(rfm_df, grupo='Establecimiento'):
+    """Arrays (R, F, M) con cortes por quintil calculados dentro de cada valor del nivel `grupo` del índice.
+
+    Un solo groupby calcula los cortes de todos los grupos; cada fila se compara con los de su grupo
+    (mismo criterio que `_puntaje_cuantil`: cuenta los cortes menores que el valor).
+    """
+    codigo, _ = pd.factorize(rfm_df.index.get_level_values(grupo))
+    columnas = ['Recency', 'Frequency', 'Monetary']
+    cortes = rfm_df[columnas].groupby(codigo).quantile(CUANTILES).to_numpy()
+    cortes = cortes.reshape(-1, len(CUANTILES), len(columnas))
+    posiciones = [(cortes[codigo, :, j] < rfm_df[columna].to_numpy(dtype=float)[:, None]).sum(axis=1)
+                  for j, columna in enumerate(columnas)]
+    return 5 - posiciones[0], 1 + posiciones[1], 1 + posiciones[2]
+
+
+def puntuar_cuantiles(rfm_df, grupo=None):
+    """Agrega R, F, M y 'RFM Score' a la tabla RFM; con `grupo`, con cortes dentro de cada grupo."""
+    puntajes = puntajes_rfm(rfm_df) if grupo is None else puntajes_rfm_por_grupo(rfm_df, grupo)
+    rfm_df['R'], rfm_df['F'], rfm_df['M'] = puntajes
+    rfm_df['RFM Score'] = rfm_df['R'] + rfm_df['F'] + rfm_df['M']
+    return completar_arrow(rfm_df)
+
+
+def puntajes_lado_a_lado(rfm_grupo, rfm_df):
+    """Puntajes dentro del grupo junto a los globales del cliente ('R global', ..., 'RFM Score global')."""
+    globales = rfm_df[['R', 'F', 'M', 'RFM Score']].add_suffix(' global')
+    return rfm_grupo.join(globales, on='Customer ID')
+
+
+def codigos_segmento(r, f, m):
+    """Código entero del segmento (índice en SEGMENTOS) a partir de los puntajes R, F, M."""
+    codigo_rfm = np.asarray(r, dtype=np.int64) * 100 + np.asarray(f, dtype=np.int64) * 10 + np.asarray(m, dtype=np.int64)
+    codigos = np.full(codigo_rfm.shape, SEGMENTOS.index('Potenciales'), dtype=np.int8)
+    for seg, reglas in REGLAS_SEGMENTO.items():
+        codigos[np.isin(codigo_rfm, reglas)] = SEGMENTOS.index(seg)
+    return codigos
+
+
+def asignar_segmento(r, f, m, index=None):
+    """Segmento como Categorical con las categorías de SEGMENTOS."""
+    segmento = pd.Categorical.from_codes(codigos_segmento(r, f, m), categories=SEGMENTOS)
+    return pd.Series(segmento, index=index, name='Segment')
+
+
+def resumen_segmentos(rfm_df):
+    """Clientes, Recency/Frequency promedio y Monetary total por segmento."""
+    return rfm_df.groupby('Segment', observed=False).agg(
+        Clientes=('Monetary', 'size'),
+        Recency=('Recency', 'mean'),
+        Frequency=('Frequency', 'mean'),
+        Monetary=('Monetary', 'sum'),
+    ).reset_index()
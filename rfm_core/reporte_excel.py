@@ -0,0 +1,65 @@
+"""Reporte Excel de varias hojas escrito en modo write-only de openpyxl."""
+import io
+
+from rfm_core.exportacion import TAMANO_BLOQUE, bloques_de
+
+# Filas de datos por hoja: el límite de Excel (1.048.576) menos el encabezado
+MAX_FILAS_HOJA = 1_048_575
+
+
+def _filas(df, tamano_bloque):
+    for bloque in bloques_de(df, tamano_bloque):
+        # NaN/NaT no son valores válidos en una celda: se escriben vacías
+        bloque = bloque.astype(object).where(bloque.notna(), None)
+        yield from bloque.itertuples(index=False, name=None)
+
+
+def _nombre_hoja(nombre, parte):
+    # Excel admite 31 caracteres: el sufijo de continuación se conserva y se recorta el nombre
+    sufijo = '' if parte == 1 else f' ({parte})'
+    return nombre[:31 - len(sufijo)] + sufijo
+
+
+def escribir_reporte_excel(destino, hojas, imagenes=None, tarea=None, tamano_bloque=TAMANO_BLOQUE,
+                           filas_por_hoja=MAX_FILAS_HOJA):
+    """Escribe `hojas` (nombre -> DataFrame) y `imagenes` (nombre -> PNG en bytes) en `destino`.
+
+    En modo write-only cada fila se vuelca a disco al agregarla, así que la memoria no crece
+    con el tamaño de las hojas. Una tabla con más de `filas_por_hoja` filas sigue en hojas de
+    continuación ("RFM (2)", "RFM (3)"...), cada una con su encabezado.
+    """
+    # openpyxl se importa solo al generar el reporte: no se paga al abrir el dashboard
+    from openpyxl import Workbook
+    from openpyxl.drawing.image import Image
+
+    imagenes = imagenes or {}
+    libro = Workbook(write_only=True)
+    total = len(hojas) + len(imagenes)
+    for i, (nombre, df) in enumerate(hojas.items()):
+        if tarea is not None:
+            tarea.avanzar(i / total, f"Escribiendo hoja '{nombre}'")
+        encabezado = [str(c) for c in df.columns]
+        parte = filas = 0
+        for fila in _filas(df, tamano_bloque):
+            if filas % filas_por_hoja == 0:
+                parte += 1
+                hoja = libro.create_sheet(_nombre_hoja(nombre, parte))
+                hoja.append(encabezado)
+            hoja.append(fila)
+            filas += 1
+        if filas == 0:
+            libro.create_sheet(_nombre_hoja(nombre, 1)).append(encabezado)
+    for i, (nombre, png) in enumerate(imagenes.items(), start=len(hojas)):
+        if tarea is not None:
+            tarea.avanzar(i / total, f"Insertando imagen '{nombre}'")
+        hoja = libro.create_sheet(nombre[:31])
+        hoja.add_image(Image(io.BytesIO(png)), 'A1')
+    if tarea is not None:
+        tarea.avanzar(1.0, "Guardando libro")
+    libro.save(destino)
+
+
+def reporte_excel_bytes(hojas, imagenes=None, tarea=None):
+    buffer = io.BytesIO()
+    escribir_reporte_excel(buffer, hojas, imagenes, tarea=tarea)
+    return buffer.getvalue()
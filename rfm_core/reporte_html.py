@@ -0,0 +1,119 @@
+"""Reporte RFM estático en un único archivo HTML (imágenes y tablas incrustadas)."""
+import base64
+import html
+import io
+import os
+
+DIRECTORIO_REPORTES = os.environ.get('RFM_REPORTES', 'reportes')
+MAX_PUNTOS_CLUSTERS = 5_000
+
+_ESTILO = """
+body { font-family: sans-serif; margin: 2em; color: #222; }
+h1 { font-size: 1.6em; } h2 { font-size: 1.2em; margin-top: 1.6em; }
+img { max-width: 100%; }
+table.tabla { border-collapse: collapse; font-size: 0.85em; }
+table.tabla th, table.tabla td { border: 1px solid #ccc; padding: 4px 8px; text-align: left; }
+"""
+
+
+def _img(png):
+    return f'<img src="data:image/png;base64,{base64.b64encode(png).decode("ascii")}">'
+
+
+def figura_distribuciones(rfm_df):
+    """Histogramas de Recency, Frequency y Monetary como PNG.
+
+    Usa Figure directamente (sin pyplot) para poder dibujar fuera del hilo del script.
+    """
+    from matplotlib.figure import Figure  # import diferido: matplotlib solo se carga al generar el reporte
+
+    fig = Figure(figsize=(15, 4))
+    axes = fig.subplots(1, 3)
+    for ax, columna, color in zip(axes, ['Recency', 'Frequency', 'Monetary'], ['skyblue', 'salmon', 'green']):
+        ax.hist(rfm_df[columna].dropna(), bins=20, color=color)
+        ax.set_title(columna)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def figura_panel(rfm_df, linkage_matrix, ventas_pct, ventas_hora):
+    """Panel 2x2 (correlación, dendrograma Ward, % ventas por establecimiento, ventas por hora) como PNG.
+
+    Con `linkage_matrix=None` el segundo gráfico muestra los clusters K-means de la columna 'Cluster'
+    (Frequency vs Monetary sobre una muestra de clientes). Igual que `figura_distribuciones`, sin
+    pyplot para poder dibujarlo en el pool de trabajo.
+    """
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    from scipy.cluster.hierarchy import dendrogram
+
+    fig = Figure(figsize=(14, 10))
+    axes2 = fig.subplots(2, 2)
+
+    # [0,0] Heatmap correlación
+    sns.heatmap(rfm_df[['Recency', 'Frequency', 'Monetary']].corr(), annot=True, cmap='coolwarm', ax=axes2[0, 0])
+    axes2[0, 0].set_title('Mapa de Correlación (R, F, M)')
+
+    # [0,1] Dendrograma o clusters K-means
+    if linkage_matrix is not None:
+        dendrogram(linkage_matrix, truncate_mode='lastp', p=12, leaf_rotation=45, leaf_font_size=10,
+                   show_contracted=True, ax=axes2[0, 1])
+        axes2[0, 1].set_title('Clusters Jerárquicos (RFM)')
+    else:
+        muestra = rfm_df.sample(min(len(rfm_df), MAX_PUNTOS_CLUSTERS), random_state=0)
+        sns.scatterplot(data=muestra, x='Frequency', y='Monetary', hue='Cluster', s=12, alpha=0.6,
+                        palette='viridis', ax=axes2[0, 1])
+        axes2[0, 1].set(xscale='log', yscale='log')
+        axes2[0, 1].set_title('Clusters K-means (RFM)')
+
+    # [1,0] Ventas por Establecimiento
+    axes2[1, 0].bar(ventas_pct.index, ventas_pct.values, color=sns.color_palette("viridis", len(ventas_pct)))
+    axes2[1, 0].set_title('Ventas por Establecimiento (%)')
+    axes2[1, 0].set_ylabel('% Ventas')
+
+    # [1,1] Ventas por Hora (Global)
+    axes2[1, 1].plot(ventas_hora.index, ventas_hora.values, marker='o', color='orange')
+    axes2[1, 1].set_title('Ventas por Hora (Global)')
+    axes2[1, 1].set_xlabel('Hora')
+    axes2[1, 1].set_ylabel('Ventas')
+    axes2[1, 1].set_xticks(range(0, 24, 2))
+
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def _horas(serie):
+    return ', '.join(f"{h}:00" for h in serie.index)
+
+
+def construir_reporte_html(titulo, panel_png, rfm_df, horas_pico, horas_valle, tablas, tarea=None):
+    """Arma el HTML: panel 2x2, distribuciones, horas pico/valle y `tablas` (título -> DataFrame)."""
+    if tarea is not None:
+        tarea.avanzar(0.1, "Dibujando distribuciones")
+    partes = [f"<h1>{html.escape(titulo)}</h1>",
+              "<h2>Panel: Correlación, Clusters y Ventas</h2>", _img(panel_png),
+              "<h2>Distribuciones R, F, M</h2>", _img(figura_distribuciones(rfm_df)),
+              "<h2>Horas de Mayor y Menor Venta</h2>",
+              f"<p>Horas pico: {_horas(horas_pico)}<br>Horas valle: {_horas(horas_valle)}</p>"]
+    for i, (nombre, tabla) in enumerate(tablas.items()):
+        if tarea is not None:
+            tarea.avanzar(0.5 + 0.4 * i / max(len(tablas), 1), f"Agregando tabla '{nombre}'")
+        partes += [f"<h2>{html.escape(nombre)}</h2>", tabla.to_html(index=False, border=0, classes='tabla')]
+    return ("<!DOCTYPE html>\n<html lang=\"es\"><head><meta charset=\"utf-8\">"
+            f"<title>{html.escape(titulo)}</title><style>{_ESTILO}</style></head>\n<body>\n"
+            + "\n".join(partes) + "\n</body></html>\n")
+
+
+def guardar_reporte_html(contenido, nombre_archivo, directorio=DIRECTORIO_REPORTES):
+    """Guarda el HTML en `directorio` y devuelve la ruta."""
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, nombre_archivo)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(contenido)
+    os.replace(temporal, ruta)
+    return ruta
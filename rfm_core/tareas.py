@@ -0,0 +1,77 @@
+"""Ejecución de trabajos pesados en un pool de hilos compartido por todas las sesiones."""
+import os
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor, wait
+
+MAX_TRABAJADORES = int(os.environ.get('RFM_TRABAJADORES', '2'))
+
+_pool = ThreadPoolExecutor(max_workers=MAX_TRABAJADORES, thread_name_prefix='rfm-tarea')
+
+
+class TareaCancelada(Exception):
+    """Se lanza dentro del trabajo en el siguiente `avanzar` después de `cancelar`."""
+
+
+class Tarea:
+    """Trabajo enviado al pool; `funcion` recibe la tarea como argumento `tarea` para informar avance.
+
+    La cancelación es cooperativa: un hilo no se puede interrumpir, así que el trabajo se detiene
+    en su siguiente llamada a `avanzar` (entre etapas). Si aún estaba en cola, no llega a empezar.
+    """
+
+    def __init__(self, funcion, *args, **kwargs):
+        self.progreso = 0.0
+        self.mensaje = 'En cola'
+        self._cancelada = threading.Event()
+        self._futuro = _pool.submit(funcion, *args, tarea=self, **kwargs)
+
+    def avanzar(self, progreso, mensaje=''):
+        if self._cancelada.is_set():
+            raise TareaCancelada(self.mensaje)
+        self.progreso = min(max(float(progreso), 0.0), 1.0)
+        self.mensaje = mensaje
+
+    def cancelar(self):
+        """Pide detener el trabajo; no espera a que se detenga."""
+        self._cancelada.set()
+        self._futuro.cancel()
+
+    @property
+    def cancelada(self):
+        return self._cancelada.is_set()
+
+    @property
+    def terminada(self):
+        return self._futuro.done()
+
+    def esperar(self, segundos):
+        """Espera hasta `segundos` a que termine; devuelve si terminó."""
+        wait([self._futuro], timeout=segundos)
+        return self.terminada
+
+    def error(self):
+        if not self.terminada:
+            return None
+        try:
+            return self._futuro.exception()
+        except CancelledError:
+            return TareaCancelada('Cancelada antes de empezar')
+
+    def resultado(self):
+        return self._futuro.result()
+
+
+def por_etapas(etapas):
+    """Trabajo para `Tarea` que ejecuta `etapas` [(mensaje, función sin argumentos)] en orden.
+
+    Informa el avance al empezar cada etapa (punto en que también se atiende una cancelación) y
+    devuelve la lista de resultados.
+    """
+    def ejecutar(tarea):
+        resultados = []
+        for i, (mensaje, funcion) in enumerate(etapas):
+            tarea.avanzar(i / len(etapas), mensaje)
+            resultados.append(funcion())
+        tarea.avanzar(1.0, 'Listo')
+        return resultados
+    return ejecutar
@@ -0,0 +1,26 @@
+"""Modo de tipos Arrow: transacciones y tablas RFM con `pd.ArrowDtype` de la ingesta a la visualización.
+
+Con RFM_TIPOS=arrow el texto (Establecimiento, Customer ID...) vive en buffers de Arrow en lugar de
+objetos Python, los nulos son nulos de Arrow y `st.dataframe` recibe columnas que ya están en el
+formato que envía al navegador. Por defecto ('numpy') se mantienen los tipos de siempre.
+"""
+import os
+
+import pandas as pd
+
+TIPOS = os.environ.get('RFM_TIPOS', 'numpy')
+
+
+def usa_arrow(df):
+    """Si alguna columna de `df` tiene tipo de pyarrow."""
+    return any(isinstance(tipo, pd.ArrowDtype) for tipo in df.dtypes)
+
+
+def a_arrow(df):
+    """`df` con todas sus columnas como pd.ArrowDtype (las categóricas se conservan)."""
+    return df.convert_dtypes(dtype_backend='pyarrow')
+
+
+def completar_arrow(df):
+    """Si `df` ya tiene columnas Arrow, pasa también a Arrow las que se agregaron con NumPy."""
+    return a_arrow(df) if usa_arrow(df) else df
@@ -0,0 +1,125 @@
+"""Vista previa aproximada del dashboard sobre una muestra de clientes estratificada por establecimiento.
+
+Cada cliente pertenece al estrato de su primer establecimiento en los datos filtrados; de cada estrato
+se toma la misma fracción de clientes (al menos uno) con todas sus transacciones, así que el RFM de
+cada cliente de la muestra es exacto y solo los totales y distribuciones se extrapolan con el peso
+N_h / n_h de su estrato. Las bandas son percentiles de un bootstrap estratificado por cliente.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from rfm_core.puntajes import calcular_rfm
+
+MAX_CLIENTES_MUESTRA = 5_000
+REPLICAS_BOOTSTRAP = 200
+NIVEL_BANDAS = 0.95
+BINS_DISTRIBUCION = 20
+HORAS = 24
+
+VistaPrevia = namedtuple('VistaPrevia', 'fraccion clientes_muestra clientes resumen distribuciones establecimientos horas')
+
+
+def muestra_estratificada(df, max_clientes=MAX_CLIENTES_MUESTRA, semilla=0):
+    """(filas de los clientes elegidos, peso por cliente, estrato por cliente, fracción).
+
+    Los pesos y estratos vienen como Series indexadas por Customer ID.
+    """
+    codigos, clientes = pd.factorize(df['Customer ID'])
+    # Sin ordenar, los códigos aparecen en orden creciente: la primera fila de cada cliente es donde
+    # su código supera a todos los anteriores
+    primera = np.flatnonzero(codigos > np.maximum.accumulate(np.r_[-1, codigos[:-1]]))
+    estrato, _ = pd.factorize(df['Establecimiento'].to_numpy()[primera])
+    fraccion = min(1.0, max_clientes / max(len(clientes), 1))
+
+    rng = np.random.default_rng(semilla)
+    elegidos = np.zeros(len(clientes), dtype=bool)
+    peso = np.zeros(len(clientes))
+    for h in np.unique(estrato):
+        miembros = np.flatnonzero(estrato == h)
+        n_h = max(1, int(round(fraccion * len(miembros))))
+        elegidos[rng.choice(miembros, size=n_h, replace=False)] = True
+        peso[miembros] = len(miembros) / n_h
+
+    indice = pd.Index(clientes[elegidos], name='Customer ID')
+    return (df[(codigos >= 0) & elegidos[codigos]], pd.Series(peso[elegidos], index=indice),
+            pd.Series(estrato[elegidos], index=indice), fraccion)
+
+
+def _conteos_bootstrap(estrato, replicas, rng):
+    """Matriz (réplicas x clientes) con las veces que cada cliente sale al remuestrear dentro de su estrato."""
+    conteos = np.zeros((replicas, len(estrato)))
+    for h in np.unique(estrato):
+        miembros = np.flatnonzero(estrato == h)
+        conteos[:, miembros] = rng.multinomial(len(miembros), np.full(len(miembros), 1 / len(miembros)), size=replicas)
+    return conteos
+
+
+def _por_cliente(codigo_cliente, codigo, categorias, valores, clientes):
+    # Matriz clientes x categorías con la suma de `valores` (ventas por establecimiento u hora)
+    matriz = np.bincount(codigo_cliente * categorias + codigo, weights=valores, minlength=clientes * categorias)
+    return matriz.reshape(clientes, categorias)
+
+
+def _bandas(estimado, replicas):
+    cola = (1 - NIVEL_BANDAS) / 2 * 100
+    inferior, superior = np.nanpercentile(replicas, [cola, 100 - cola], axis=0)
+    return pd.DataFrame({'Estimado': estimado, 'Inferior': inferior, 'Superior': superior})
+
+
+def vista_previa(df, current_date, frecuencia='filas', max_clientes=MAX_CLIENTES_MUESTRA,
+                 replicas=REPLICAS_BOOTSTRAP, semilla=0):
+    """RFM, distribuciones R/F/M, participación por establecimiento y ventas por hora aproximadas.
+
+    `df` son las transacciones ya filtradas. Cada tabla trae Estimado, Inferior y Superior (banda
+    del NIVEL_BANDAS); los totales están extrapolados a todos los clientes del filtro.
+    """
+    muestra, peso, estrato, fraccion = muestra_estratificada(df, max_clientes, semilla)
+    rfm_df = calcular_rfm(muestra, current_date, frecuencia=frecuencia)
+    peso = peso.reindex(rfm_df.index).to_numpy()
+    estrato = estrato.reindex(rfm_df.index).to_numpy()
+    conteos = _conteos_bootstrap(estrato, replicas, np.random.default_rng(semilla + 1)) * peso
+    n = len(rfm_df)
+
+    # Totales ponderados: estimado con los pesos, réplicas con los conteos del bootstrap
+    def estimar(matriz):
+        return peso @ matriz, conteos @ matriz
+
+    # Resumen: clientes y promedios de R, F, M
+    valores = rfm_df[['Recency', 'Frequency', 'Monetary']].to_numpy(dtype=float)
+    total, total_rep = estimar(np.column_stack([np.ones(n), valores]))
+    resumen = _bandas(np.r_[total[0], total[1:] / total[0]],
+                      np.column_stack([total_rep[:, 0], total_rep[:, 1:] / total_rep[:, :1]]))
+    resumen.index = pd.Index(['Clientes', 'Recency', 'Frequency', 'Monetary'], name='Métrica')
+
+    # Distribuciones: clientes estimados por intervalo de cada variable
+    distribuciones = {}
+    for j, columna in enumerate(['Recency', 'Frequency', 'Monetary']):
+        bordes = np.histogram_bin_edges(valores[:, j], bins=BINS_DISTRIBUCION)
+        intervalo = np.clip(np.searchsorted(bordes, valores[:, j], side='right') - 1, 0, BINS_DISTRIBUCION - 1)
+        estimado, rep = estimar(np.eye(BINS_DISTRIBUCION)[intervalo])
+        tabla = _bandas(estimado, rep)
+        tabla.insert(0, columna, (bordes[:-1] + bordes[1:]) / 2)
+        distribuciones[columna] = tabla
+
+    # Ventas por establecimiento (participación) y por hora
+    codigo_cliente = rfm_df.index.get_indexer(muestra['Customer ID'])
+    ventas = muestra['Sales'].to_numpy(dtype=float)
+    codigo_est, nombres_est = pd.factorize(muestra['Establecimiento'], sort=True)
+    validas = (codigo_est >= 0) & ~np.isnan(ventas)
+    estimado, rep = estimar(_por_cliente(codigo_cliente[validas], codigo_est[validas], len(nombres_est),
+                                         ventas[validas], n))
+    establecimientos = _bandas(estimado / estimado.sum() * 100, rep / rep.sum(axis=1, keepdims=True) * 100)
+    establecimientos.insert(0, 'Establecimiento', nombres_est)
+    establecimientos.insert(1, 'Sales', estimado)
+
+    hora = pd.to_numeric(muestra['Hr transacc'], errors='coerce').to_numpy(dtype=float)
+    validas = ~np.isnan(hora) & (hora >= 0) & (hora < HORAS) & ~np.isnan(ventas)
+    estimado, rep = estimar(_por_cliente(codigo_cliente[validas], hora[validas].astype(np.int64), HORAS,
+                                         ventas[validas], n))
+    horas = _bandas(estimado, rep)
+    horas.insert(0, 'Hr transacc', np.arange(HORAS))
+
+    return VistaPrevia(fraccion, n, int(round(peso.sum())), resumen, distribuciones, establecimientos,
+                       horas[horas['Estimado'] > 0].reset_index(drop=True))
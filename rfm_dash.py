@@ -1,7 +1,10 @@
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from rfm_core.controles import selector_frecuencia
+from rfm_core.descargas import boton_descarga
+from rfm_core.huella import huella, huella_archivo
+from rfm_core.puntajes import calcular_rfm
 
 st.set_page_config(page_title="RFM Analysis", layout="wide")
 st.title("📊 Análisis RFM con Segmentación y Visualización")
@@ -10,22 +13,13 @@ uploaded_file = st.file_uploader("Sube tu archivo Excel", type=["xlsx"])
 
 if uploaded_file:
     transactions_df = pd.read_excel(uploaded_file, sheet_name='Transaction Data')
+    frecuencia = selector_frecuencia(transactions_df.columns)
 
     # Definir fecha de referencia
     current_date = pd.to_datetime('2015-12-31')
 
     # Calcular Recency, Frequency y Monetary
-    rfm_df = transactions_df.groupby('Customer ID').agg({
-        'Order Date': lambda x: (current_date - x.max()).days,
-        'Customer ID': 'count',
-        'Sales': 'sum'
-    })
-    rfm_df.rename(columns={
-        'Order Date': 'Recency',
-        'Customer ID': 'Frequency',
-        'Sales': 'Monetary'
-    }, inplace=True)
-    rfm_df['Recency'] = rfm_df['Recency'].astype(int)
+    rfm_df = calcular_rfm(transactions_df, current_date, frecuencia=frecuencia)
 
     st.subheader("📌 Datos RFM Calculados")
     st.write(rfm_df.head())
@@ -68,8 +62,11 @@ if uploaded_file:
     st.write(rfm_df.head())
 
     # Descargar CSV
-    csv = rfm_df.to_csv().encode('utf-8')
-    st.download_button("⬇ Descargar Segmentación RFM", data=csv, file_name="rfm_segmentacion.csv", mime="text/csv")
+    boton_descarga("Descargar Segmentación RFM", rfm_df, "rfm_segmentacion", huella(huella_archivo(uploaded_file), frecuencia), index=True)
+
+    # Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
     # Gráficos
     st.subheader("📈 Distribución de R, F y M")
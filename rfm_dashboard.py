@@ -2,7 +2,11 @@
 
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
+
+from rfm_core.controles import selector_frecuencia
+from rfm_core.descargas import boton_descarga
+from rfm_core.huella import huella, huella_archivo
+from rfm_core.puntajes import calcular_rfm
 
 st.title("📊 Análisis RFM y Segmentación de Clientes")
 
@@ -11,13 +15,11 @@ uploaded_file = st.file_uploader("Sube tu archivo Excel", type=["xlsx"])
 if uploaded_file:
     df = pd.read_excel(uploaded_file, sheet_name='Transaction Data')
     df['Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
+    frecuencia = selector_frecuencia(df.columns, predeterminada='pedidos')
 
-    rfm = df.groupby('Customer ID').agg({
-        'Order Date': lambda x: (pd.Timestamp.now() - x.max()).days,
-        'Order ID': 'nunique',
-        'Sales': 'sum'
-    }).reset_index()
-    rfm.columns = ['Customer ID', 'Recency', 'Frequency', 'Monetary']
+    # Recency contra el momento actual: la descarga en caché se renueva cada día
+    fecha_referencia = pd.Timestamp.now()
+    rfm = calcular_rfm(df, fecha_referencia, frecuencia=frecuencia).reset_index()
 
     rfm['R_score'] = pd.qcut(rfm['Recency'], 5, labels=[5,4,3,2,1])
     rfm['F_score'] = pd.qcut(rfm['Frequency'].rank(method='first'), 5, labels=[1,2,3,4,5])
@@ -46,8 +48,10 @@ if uploaded_file:
     st.subheader("Vista previa de la segmentación")
     st.dataframe(rfm.head(20))
 
-    st.download_button("Descargar Segmentación", data=rfm.to_csv(index=False).encode('utf-8'),
-                       file_name="segmentacion_rfm.csv", mime="text/csv")
+    boton_descarga("Descargar Segmentación", rfm, "segmentacion_rfm", huella(huella_archivo(uploaded_file), frecuencia, fecha_referencia.date()))
+
+    # Librerías de gráficos importadas al llegar a la sección que las usa (arranque más rápido)
+    import matplotlib.pyplot as plt
 
     st.subheader("Distribución por Segmento")
     fig, ax = plt.subplots()
@@ -0,0 +1,49 @@
+"""Datasets sintéticos de transacciones para las pruebas de equivalencia y rendimiento."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Los dashboards se ejecutan con PYTHONPATH=. desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ESTABLECIMIENTOS = ['Supermercados', 'Grifos', 'Farmacias', 'Tiendas']
+
+
+def generar_transacciones(clientes, filas, semilla=0, empates=False):
+    """Transacciones con las columnas y tipos que deja `leer_transacciones`.
+
+    Con `empates` los montos son enteros pequeños y casi todos los clientes compran una sola vez:
+    los cuantiles repiten valores y los puntajes dependen de cómo se resuelven los empates.
+    """
+    rng = np.random.default_rng(semilla)
+    if empates:
+        cliente = np.r_[np.arange(clientes), rng.integers(0, max(clientes // 10, 1), max(filas - clientes, 0))]
+        ventas = rng.integers(1, 6, len(cliente)).astype(float) * 10
+    else:
+        peso = rng.pareto(1.5, clientes) + 1
+        cliente = np.r_[np.arange(clientes), rng.choice(clientes, max(filas - clientes, 0), p=peso / peso.sum())]
+        ventas = np.round(rng.gamma(2.0, 40.0, len(cliente)), 2)
+    n = len(cliente)
+    # Varias filas por pedido: Order ID distintos no coinciden con filas por cliente
+    pedido = cliente * 1_000 + rng.integers(0, 8, n)
+    return pd.DataFrame({
+        'Order ID': pd.Series(pedido).map('P-{}'.format),
+        'Customer ID': pd.Series(cliente).map('C-{:06d}'.format),
+        'Order Date': pd.Timestamp('2013-01-01') + pd.to_timedelta(rng.integers(0, 1_095, n), unit='D'),
+        'Hr transacc': rng.integers(0, 24, n),
+        'Establecimiento': rng.choice(ESTABLECIMIENTOS, n, p=[0.5, 0.25, 0.15, 0.1]),
+        'Sales': ventas,
+    })
+
+
+# (clientes, filas, semilla, empates): pocos clientes, tamaño medio, muchos empates
+CASOS = [(60, 400, 1, False), (3_000, 30_000, 2, False), (2_000, 6_000, 3, True)]
+
+
+@pytest.fixture(params=CASOS, ids=lambda caso: f"{caso[0]}c-{caso[1]}f{'-empates' if caso[3] else ''}")
+def transacciones(request):
+    clientes, filas, semilla, empates = request.param
+    return generar_transacciones(clientes, filas, semilla, empates)
@@ -0,0 +1,79 @@
+"""Implementaciones originales del cálculo RFM, copiadas de los scripts antes de vectorizarlos.
+
+Son la referencia de las pruebas de equivalencia: cualquier motor nuevo (rfm_core, DuckDB, tipos
+Arrow) tiene que dar los mismos valores, puntajes y segmentos que este código.
+"""
+import pandas as pd
+
+FECHA_CORTE = pd.to_datetime('2015-12-31')
+
+
+def rfm_legado(df, current_date=FECHA_CORTE):
+    """RFM_hibrido4.py / RFM_gerencial.py: Frequency como filas por cliente."""
+    rfm_df = df.groupby('Customer ID').agg({
+        'Order Date': lambda x: (current_date - x.max()).days,
+        'Customer ID': 'count',
+        'Sales': 'sum'
+    }).rename(columns={'Order Date': 'Recency', 'Customer ID': 'Frequency', 'Sales': 'Monetary'})
+    rfm_df['Recency'] = rfm_df['Recency'].astype(int)
+    return rfm_df
+
+
+def rfm_pedidos_legado(df, current_date=FECHA_CORTE):
+    """rfm_dashboard.py / rfm2_dashboard.py: Frequency como Order ID distintos."""
+    rfm = df.groupby('Customer ID').agg({
+        'Order Date': lambda x: (current_date - x.max()).days,
+        'Order ID': 'nunique',
+        'Sales': 'sum'
+    }).reset_index()
+    rfm.columns = ['Customer ID', 'Recency', 'Frequency', 'Monetary']
+    return rfm
+
+
+def filtrar_legado(df, establecimientos, rango_hora):
+    """Filtro de la barra lateral de los scripts dinámicos."""
+    return df[(df['Establecimiento'].isin(establecimientos)) &
+              (df['Hr transacc'].between(rango_hora[0], rango_hora[1]))]
+
+
+def puntajes_legado(rfm_df):
+    """Cadena de `<=` de r_score/fm_score (RFM_hibrido4.py, rfm_dash.py, RFM_estatico*.py)."""
+    rfm_df = rfm_df.copy()
+    quantiles = rfm_df.quantile(q=[0.20, 0.40, 0.60, 0.80]).to_dict()
+    def r_score(x, p, d): return 5 if x <= d[p][0.20] else (4 if x <= d[p][0.40] else (3 if x <= d[p][0.60] else (2 if x <= d[p][0.80] else 1)))
+    def fm_score(x, p, d): return 1 if x <= d[p][0.20] else (2 if x <= d[p][0.40] else (3 if x <= d[p][0.60] else (4 if x <= d[p][0.80] else 5)))
+
+    rfm_df['R'] = rfm_df['Recency'].apply(r_score, args=('Recency', quantiles,))
+    rfm_df['F'] = rfm_df['Frequency'].apply(fm_score, args=('Frequency', quantiles,))
+    rfm_df['M'] = rfm_df['Monetary'].apply(fm_score, args=('Monetary', quantiles,))
+    rfm_df['RFM Score'] = rfm_df['R'] + rfm_df['F'] + rfm_df['M']
+    return rfm_df
+
+
+def puntajes_qcut_legado(rfm):
+    """pd.qcut con rank(method='first') en Frequency (rfm_dashboard.py / rfm2_dashboard.py)."""
+    rfm = rfm.copy()
+    rfm['R_score'] = pd.qcut(rfm['Recency'], 5, labels=[5,4,3,2,1])
+    rfm['F_score'] = pd.qcut(rfm['Frequency'].rank(method='first'), 5, labels=[1,2,3,4,5])
+    rfm['M_score'] = pd.qcut(rfm['Monetary'], 5, labels=[1,2,3,4,5])
+    rfm['RFM_Score'] = rfm['R_score'].astype(str)+rfm['F_score'].astype(str)+rfm['M_score'].astype(str)
+    return rfm
+
+
+def segment(row):
+    """Reglas de segmento sobre el código 'RFM_Score' como texto."""
+    if row['RFM_Score'] in ['555','554','545','544']:
+        return 'Champions'
+    elif row['RFM_Score'] in ['543','444','433']:
+        return 'Leales'
+    elif row['RFM_Score'] in ['111','112','121']:
+        return 'En riesgo'
+    else:
+        return 'Potenciales'
+
+
+def segmentos_legado(r, f, m):
+    """Segmento por fila con `segment`, a partir de puntajes R, F, M."""
+    rfm = pd.DataFrame({'RFM_Score': pd.Series(r).astype(str).values + pd.Series(f).astype(str).values
+                        + pd.Series(m).astype(str).values})
+    return rfm.apply(segment, axis=1)
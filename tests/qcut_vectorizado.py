@@ -0,0 +1,37 @@
+"""Versión vectorizada del puntaje `pd.qcut` de rfm_dashboard.py / rfm2_dashboard.py.
+
+Los dashboards ya no usan ese criterio (rfm_core puntúa con los cortes de r_score/fm_score); se
+conserva aquí para comprobar que el mismo `_puntaje_cuantil` reproduce también `pd.qcut` y para medir
+cuánto más rápido es que el original de tests/legado.py.
+"""
+import numpy as np
+
+from rfm_core.puntajes import CUANTILES, _puntaje_cuantil
+
+
+def _rango_primero(valores):
+    # rank(method='first'): 1..n por valor y, a igual valor, por orden de aparición
+    orden = np.argsort(np.asarray(valores, dtype=float), kind='stable')
+    rangos = np.empty(len(orden), dtype=float)
+    rangos[orden] = np.arange(1, len(orden) + 1)
+    return rangos
+
+
+def _puntaje_qcut(valores, invertir=False):
+    # pd.qcut(valores, 5): bordes en los quintiles (con mínimo y máximo) e intervalos cerrados a la derecha
+    valores = np.asarray(valores, dtype=float)
+    bordes = np.quantile(valores, [0.0, *CUANTILES, 1.0])
+    if len(np.unique(bordes)) < len(bordes):
+        raise ValueError(f"Bin edges must be unique: {bordes!r}.")  # el mismo error de pd.qcut
+    return _puntaje_cuantil(valores, bordes[1:-1], invertir=invertir)
+
+
+def puntajes_qcut(rfm_df):
+    """Arrays (R, F, M) con el criterio `pd.qcut`.
+
+    Recency y Monetary van a quintiles de su valor; Frequency, a quintiles de `rank(method='first')`
+    (así los empates no repiten bordes). Como `pd.qcut`, falla si Recency o Monetary repiten bordes.
+    """
+    return (_puntaje_qcut(rfm_df['Recency'], invertir=True),
+            _puntaje_qcut(_rango_primero(rfm_df['Frequency'])),
+            _puntaje_qcut(rfm_df['Monetary']))
@@ -0,0 +1,57 @@
+"""Modelo CLV: resumen por cliente, casos límite del ajuste e igualdad entre motores de consultas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ESTABLECIMIENTOS, generar_transacciones
+from legado import FECHA_CORTE
+from rfm_core.clv import A_MINIMO, ajustar_clv, predecir_clv, resumen_clv
+from rfm_core.consultas import ConsultasPandas, MotorSQL, parquet_de
+
+pytest.importorskip('scipy')
+
+
+def test_valor_medio_sin_la_primera_compra():
+    transacciones = pd.DataFrame({
+        'Customer ID': ['A', 'A', 'A', 'B'],
+        'Order ID': ['P1', 'P2', 'P2', 'P3'],
+        'Order Date': pd.to_datetime(['2015-01-01', '2015-03-01', '2015-03-01', '2015-02-01']),
+        'Sales': [100.0, 10.0, 30.0, 50.0],
+    })
+    filas = resumen_clv(transacciones, FECHA_CORTE)
+    assert filas.loc['A', 'x'] == 2 and filas.loc['A', 'Valor medio'] == pytest.approx(20.0)
+    assert filas.loc['B', 'x'] == 0 and filas.loc['B', 'Valor medio'] == pytest.approx(50.0)
+    pedidos = resumen_clv(transacciones, FECHA_CORTE, frecuencia='pedidos')
+    assert pedidos.loc['A', 'x'] == 1 and pedidos.loc['A', 'Valor medio'] == pytest.approx(40.0)
+
+
+def test_sin_compras_repetidas_usa_el_gasto_medio():
+    transacciones = generar_transacciones(200, 200, semilla=6)
+    resumen = resumen_clv(transacciones, FECHA_CORTE)
+    assert (resumen['x'] == 0).all()
+    parametros = ajustar_clv(resumen)
+    assert np.isnan([parametros.p, parametros.q, parametros.gamma]).all()
+    assert parametros.valor_medio == pytest.approx(transacciones['Sales'].mean())
+    clv = predecir_clv(resumen, parametros, 90)
+    assert np.isfinite(clv.to_numpy()).all()
+    np.testing.assert_allclose(clv['Valor medio esperado'], parametros.valor_medio)
+
+
+def test_a_acotado_para_las_compras_esperadas():
+    resumen = resumen_clv(generar_transacciones(500, 5_000, semilla=7), FECHA_CORTE)
+    parametros = ajustar_clv(resumen)
+    assert parametros.a >= A_MINIMO
+    assert np.isfinite(predecir_clv(resumen, parametros, 90).to_numpy()).all()
+    with pytest.raises(ValueError, match='a > 1'):
+        predecir_clv(resumen, parametros._replace(a=0.8), 90)
+
+
+@pytest.mark.parametrize('frecuencia', ['filas', 'pedidos'])
+def test_resumen_clv_igual_en_pandas_y_duckdb(transacciones, frecuencia, tmp_path):
+    pytest.importorskip('duckdb')
+    huella_datos = str(pd.util.hash_pandas_object(transacciones).sum())
+    motor_sql = MotorSQL(parquet_de(transacciones, huella_datos, directorio=str(tmp_path)))
+    esperado = ConsultasPandas(transacciones, huella_datos).resumen_clv(ESTABLECIMIENTOS, (0, 23), FECHA_CORTE,
+                                                                        frecuencia)
+    pd.testing.assert_frame_equal(motor_sql.resumen_clv(ESTABLECIMIENTOS, (0, 23), FECHA_CORTE, frecuencia),
+                                  esperado, check_dtype=False, check_index_type=False)
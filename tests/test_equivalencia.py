@@ -0,0 +1,191 @@
+"""Equivalencia de los motores actuales con el cálculo original de los dashboards (tests/legado.py)."""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ESTABLECIMIENTOS, generar_transacciones
+from legado import (FECHA_CORTE, filtrar_legado, puntajes_legado, puntajes_qcut_legado, rfm_legado,
+                    rfm_pedidos_legado, segmentos_legado)
+from qcut_vectorizado import puntajes_qcut
+from rfm_core import consultas as consultas_modulo
+from rfm_core.consultas import ConsultasPandas, MotorSQL, crear_consultas, parquet_de
+from rfm_core.filtros import filtrar_transacciones
+from rfm_core.historia import fechas_fin_de_mes, historia_rfm
+from rfm_core.puntajes import (ContadorPedidos, asignar_segmento, calcular_rfm, calcular_rfm_por_grupo,
+                               puntuar_cuantiles)
+from rfm_core.tipos import a_arrow
+
+COLUMNAS_PUNTAJE = ['R', 'F', 'M', 'RFM Score']
+
+# (establecimientos, rango horario); None son todos los establecimientos
+FILTROS = [(None, (0, 23)), (['Supermercados', 'Grifos'], (8, 20)), (['Tiendas'], (22, 23))]
+
+
+def _filtros(filtro):
+    establecimientos, rango_hora = filtro
+    return (ESTABLECIMIENTOS if establecimientos is None else establecimientos), rango_hora
+
+
+def _huella(df):
+    # El índice de filtros se guarda por huella: cada dataset generado necesita la suya
+    return str(pd.util.hash_pandas_object(df).sum())
+
+
+def _rfm_legado(df, frecuencia):
+    return rfm_legado(df) if frecuencia == 'filas' else rfm_pedidos_legado(df).set_index('Customer ID')
+
+
+def _comparar_puntajes(obtenido, esperado):
+    for columna in COLUMNAS_PUNTAJE:
+        np.testing.assert_array_equal(np.asarray(obtenido[columna], dtype=np.int64),
+                                      np.asarray(esperado[columna], dtype=np.int64), err_msg=columna)
+
+
+@pytest.mark.parametrize('filtro', FILTROS, ids=['todos', 'dos-est', 'noche'])
+def test_filtro_igual_al_legado(transacciones, filtro):
+    establecimientos, rango_hora = _filtros(filtro)
+    obtenido = filtrar_transacciones(transacciones, _huella(transacciones), establecimientos, rango_hora)
+    pd.testing.assert_frame_equal(obtenido, filtrar_legado(transacciones, establecimientos, rango_hora))
+
+
+@pytest.mark.parametrize('frecuencia', ['filas', 'pedidos'])
+def test_rfm_igual_al_legado(transacciones, frecuencia):
+    pd.testing.assert_frame_equal(calcular_rfm(transacciones, FECHA_CORTE, frecuencia=frecuencia),
+                                  _rfm_legado(transacciones, frecuencia), check_dtype=False, check_exact=True)
+
+
+@pytest.mark.parametrize('filtro', FILTROS, ids=['todos', 'dos-est', 'noche'])
+def test_puntajes_iguales_a_r_score_fm_score(transacciones, filtro):
+    rfm_df = rfm_legado(filtrar_legado(transacciones, *_filtros(filtro)))
+    _comparar_puntajes(puntuar_cuantiles(rfm_df.copy()), puntajes_legado(rfm_df))
+
+
+@pytest.mark.parametrize('frecuencia', ['filas', 'pedidos'])
+def test_puntajes_iguales_a_qcut(transacciones, frecuencia):
+    rfm = _rfm_legado(transacciones, frecuencia).reset_index()
+    try:
+        esperado = puntajes_qcut_legado(rfm)
+    except ValueError:
+        # pd.qcut no admite bordes repetidos: el motor tiene que fallar igual
+        with pytest.raises(ValueError, match='Bin edges must be unique'):
+            puntajes_qcut(rfm)
+        return
+    for obtenido, columna in zip(puntajes_qcut(rfm), ['R_score', 'F_score', 'M_score']):
+        np.testing.assert_array_equal(obtenido, esperado[columna].astype(np.int64), err_msg=columna)
+
+
+def test_qcut_falla_con_bordes_repetidos():
+    rfm = pd.DataFrame({'Recency': [1] * 8 + [2, 3], 'Frequency': [1] * 10, 'Monetary': np.arange(10.0)})
+    with pytest.raises(ValueError):
+        puntajes_qcut_legado(rfm)
+    with pytest.raises(ValueError, match='Bin edges must be unique'):
+        puntajes_qcut(rfm)
+
+
+def test_segmentos_todas_las_combinaciones():
+    r, f, m = map(np.array, zip(*itertools.product(range(1, 6), repeat=3)))
+    np.testing.assert_array_equal(asignar_segmento(r, f, m).astype(str), segmentos_legado(r, f, m))
+
+
+def test_segmentos_iguales_al_legado(transacciones):
+    rfm_df = puntajes_legado(rfm_legado(transacciones))
+    obtenido = asignar_segmento(rfm_df['R'], rfm_df['F'], rfm_df['M'], index=rfm_df.index)
+    np.testing.assert_array_equal(obtenido.astype(str), segmentos_legado(rfm_df['R'], rfm_df['F'], rfm_df['M']))
+
+    rfm = rfm_pedidos_legado(transacciones)
+    try:
+        esperado = puntajes_qcut_legado(rfm)
+    except ValueError:
+        return
+    np.testing.assert_array_equal(asignar_segmento(*puntajes_qcut(rfm)).astype(str),
+                                  segmentos_legado(esperado['R_score'], esperado['F_score'], esperado['M_score']))
+
+
+@pytest.mark.parametrize('frecuencia', ['filas', 'pedidos'])
+def test_puntajes_por_establecimiento_iguales_a_un_legado_por_grupo(transacciones, frecuencia):
+    obtenido = puntuar_cuantiles(calcular_rfm_por_grupo(transacciones, FECHA_CORTE, frecuencia=frecuencia),
+                                 grupo='Establecimiento')
+    for establecimiento, grupo in transacciones.groupby('Establecimiento'):
+        esperado = puntajes_legado(_rfm_legado(grupo, frecuencia))
+        _comparar_puntajes(obtenido.xs(establecimiento, level='Establecimiento'), esperado)
+
+
+def test_contador_pedidos_incremental(transacciones):
+    contador = ContadorPedidos()
+    for lote in np.array_split(np.arange(len(transacciones)), 3):
+        contador.agregar(transacciones.iloc[lote])
+    esperado = transacciones.groupby('Customer ID')['Order ID'].nunique()
+    np.testing.assert_array_equal(contador.frecuencia().to_numpy(), esperado.to_numpy())
+
+
+def test_tipos_arrow_igual_al_legado(transacciones):
+    rfm_df = puntuar_cuantiles(calcular_rfm(a_arrow(transacciones), FECHA_CORTE))
+    esperado = puntajes_legado(rfm_legado(transacciones))
+    np.testing.assert_array_equal(rfm_df.index.astype(str), esperado.index)
+    _comparar_puntajes(rfm_df, esperado)
+
+
+@pytest.mark.parametrize('motor', ['pandas', 'duckdb'])
+@pytest.mark.parametrize('filtro', FILTROS, ids=['todos', 'dos-est', 'noche'])
+def test_motores_de_consultas_iguales_al_legado(transacciones, motor, filtro, tmp_path):
+    establecimientos, rango_hora = _filtros(filtro)
+    if motor == 'duckdb':
+        pytest.importorskip('duckdb')
+        consultas = MotorSQL(parquet_de(transacciones, _huella(transacciones), directorio=str(tmp_path)))
+    else:
+        consultas = ConsultasPandas(transacciones, _huella(transacciones))
+    for frecuencia in ['filas', 'pedidos']:
+        rfm_df = consultas.rfm(establecimientos, rango_hora, FECHA_CORTE, frecuencia)
+        esperado = _rfm_legado(filtrar_legado(transacciones, establecimientos, rango_hora), frecuencia)
+        # DuckDB suma en otro orden: Monetary puede diferir en el último decimal
+        pd.testing.assert_frame_equal(rfm_df, esperado, check_dtype=False, check_index_type=False)
+        _comparar_puntajes(puntuar_cuantiles(rfm_df.copy()), puntajes_legado(esperado))
+
+
+def test_motor_sql_con_establecimientos_numericos(tmp_path):
+    pytest.importorskip('duckdb')
+    transacciones = generar_transacciones(300, 2_000, semilla=4)
+    transacciones['Establecimiento'] = pd.factorize(transacciones['Establecimiento'], sort=True)[0] + 1
+    consultas = MotorSQL(parquet_de(transacciones, _huella(transacciones), directorio=str(tmp_path)))
+    establecimientos, rango_hora = [1, 3], (6, 18)
+    esperado = rfm_legado(filtrar_legado(transacciones, establecimientos, rango_hora))
+    pd.testing.assert_frame_equal(consultas.rfm(establecimientos, rango_hora, FECHA_CORTE), esperado,
+                                  check_dtype=False, check_index_type=False)
+
+
+def test_motor_sql_expulsado_sigue_sirviendo_a_quien_lo_usa(tmp_path, monkeypatch):
+    pytest.importorskip('duckdb')
+    monkeypatch.chdir(tmp_path)  # los Parquet de crear_consultas van a .cache/ del directorio actual
+    monkeypatch.setattr(consultas_modulo, '_motores', type(consultas_modulo._motores)())
+    datasets = [generar_transacciones(50, 300, semilla=s) for s in range(consultas_modulo.MAX_MOTORES + 1)]
+    en_uso = crear_consultas(datasets[0], _huella(datasets[0]), motor='duckdb')
+    for df in datasets[1:]:
+        crear_consultas(df, _huella(df), motor='duckdb')
+    assert _huella(datasets[0]) not in consultas_modulo._motores
+    esperado = rfm_legado(filtrar_legado(datasets[0], ESTABLECIMIENTOS, (0, 23)))
+    pd.testing.assert_frame_equal(en_uso.rfm(ESTABLECIMIENTOS, (0, 23), FECHA_CORTE), esperado,
+                                  check_dtype=False, check_index_type=False)
+
+
+@pytest.mark.parametrize('frecuencia', ['filas', 'pedidos'])
+def test_historia_igual_a_rfm_en_cada_corte(frecuencia):
+    transacciones = generar_transacciones(300, 3_000, semilla=5)
+    # Compras con hora: las del mismo día del corte entran en ese corte
+    rng = np.random.default_rng(5)
+    transacciones['Order Date'] += pd.to_timedelta(rng.integers(0, 86_400, len(transacciones)), unit='s')
+    fechas = fechas_fin_de_mes(transacciones)
+    historia = historia_rfm(transacciones, fechas, frecuencia).set_index(['Periodo', 'Customer ID'])
+    for fecha in fechas:
+        fin_del_dia = fecha + pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+        esperado = calcular_rfm(transacciones[transacciones['Order Date'] <= fin_del_dia], fin_del_dia, frecuencia)
+        obtenido = historia.xs(fecha, level='Periodo')
+        obtenido.index = obtenido.index.astype(str)
+        pd.testing.assert_frame_equal(obtenido, esperado, check_dtype=False, check_names=False)
+
+
+def test_filtro_completo_no_expone_el_dataframe_compartido(transacciones):
+    filtrado = filtrar_transacciones(transacciones, _huella(transacciones), ESTABLECIMIENTOS, (0, 23))
+    filtrado['Nueva'] = 1
+    assert filtrado is not transacciones and 'Nueva' not in transacciones.columns
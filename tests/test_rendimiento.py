@@ -0,0 +1,107 @@
+"""Tiempos por etapa contra el código original (tests/legado.py), medidos en la misma corrida.
+
+Cada etapa y su equivalente original corren sobre el mismo dataset generado, alternados, y el tiempo
+de cada uno es el mínimo de REPETICIONES ejecuciones. La comparación es relativa (aceleración =
+tiempo original / tiempo actual), así que vale en cualquier máquina sin línea base guardada.
+- Una etapa falla si su aceleración cae por debajo de la esperada (en ETAPAS) × (1 - RFM_TOLERANCIA_RENDIMIENTO).
+- Los tiempos y aceleraciones de la corrida se guardan en RFM_RENDIMIENTO_SALIDA (por defecto
+  .cache/rendimiento.json).
+"""
+import itertools
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import ESTABLECIMIENTOS, generar_transacciones
+from legado import (FECHA_CORTE, filtrar_legado, puntajes_legado, puntajes_qcut_legado, rfm_legado,
+                    rfm_pedidos_legado, segmentos_legado)
+from qcut_vectorizado import puntajes_qcut
+from rfm_core.filtros import IndiceFiltros
+from rfm_core.puntajes import asignar_segmento, calcular_rfm, calcular_rfm_por_grupo, puntuar_cuantiles
+
+CLIENTES = 20_000
+FILAS = 200_000
+REPETICIONES = 5
+
+TOLERANCIA = float(os.environ.get('RFM_TOLERANCIA_RENDIMIENTO', '0.5'))
+RUTA_SALIDA = os.environ.get('RFM_RENDIMIENTO_SALIDA', os.path.join('.cache', 'rendimiento.json'))
+
+# Cambios de filtro de una sesión: establecimientos x rangos horarios de la barra lateral
+CAMBIOS_FILTRO = list(itertools.product(
+    [['Supermercados'], ['Supermercados', 'Grifos'], ['Grifos', 'Farmacias', 'Tiendas'], ESTABLECIMIENTOS],
+    [(0, 23), (8, 20), (18, 23)]))
+
+
+def filtrar_sesion(df):
+    # El índice se construye dentro de la medición, una vez, y sirve a todos los cambios de filtro
+    indice = IndiceFiltros(df)
+    return [indice.filtrar(df, establecimientos, rango_hora) for establecimientos, rango_hora in CAMBIOS_FILTRO]
+
+
+# Etapa -> (función actual, función original, aceleración mínima esperada), sobre los datos preparados
+# (d.df, d.rfm, d.puntuado, d.rfm_pedidos, d.rfm_grupo)
+ETAPAS = {
+    'filtrar': (lambda d: filtrar_sesion(d.df),
+                lambda d: [filtrar_legado(d.df, *filtro) for filtro in CAMBIOS_FILTRO], 2),
+    'rfm': (lambda d: calcular_rfm(d.df, FECHA_CORTE),
+            lambda d: rfm_legado(d.df), 5),
+    'rfm_pedidos': (lambda d: calcular_rfm(d.df, FECHA_CORTE, frecuencia='pedidos'),
+                    lambda d: rfm_pedidos_legado(d.df), 2),
+    'puntajes': (lambda d: puntuar_cuantiles(d.rfm.copy()),
+                 lambda d: puntajes_legado(d.rfm), 5),
+    'puntajes_qcut': (lambda d: puntajes_qcut(d.rfm_pedidos),
+                      lambda d: puntajes_qcut_legado(d.rfm_pedidos), 2),
+    'segmentos': (lambda d: asignar_segmento(d.puntuado['R'], d.puntuado['F'], d.puntuado['M']),
+                  lambda d: segmentos_legado(d.puntuado['R'], d.puntuado['F'], d.puntuado['M']), 5),
+    # Sin equivalente en los scripts: el original sería repetir el cálculo por cada establecimiento
+    'rfm_por_grupo': (lambda d: calcular_rfm_por_grupo(d.df, FECHA_CORTE),
+                      lambda d: [rfm_legado(grupo) for _, grupo in d.df.groupby('Establecimiento')], 5),
+    'puntajes_por_grupo': (lambda d: puntuar_cuantiles(d.rfm_grupo.copy(), grupo='Establecimiento'),
+                           lambda d: [puntajes_legado(grupo.droplevel('Establecimiento'))
+                                      for _, grupo in d.rfm_grupo.groupby(level='Establecimiento')], 5),
+}
+
+
+def medir(actual, original, datos):
+    """(mínimo del actual, mínimo del original) en segundos, alternando ambos en cada repetición."""
+    tiempos = {actual: [], original: []}
+    for _ in range(REPETICIONES):
+        for funcion in (actual, original):
+            inicio = time.perf_counter()
+            funcion(datos)
+            tiempos[funcion].append(time.perf_counter() - inicio)
+    return min(tiempos[actual]), min(tiempos[original])
+
+
+@pytest.fixture(scope='module')
+def datos():
+    df = generar_transacciones(CLIENTES, FILAS, semilla=7)
+    rfm = calcular_rfm(df, FECHA_CORTE)
+    return SimpleNamespace(df=df, rfm=rfm, puntuado=puntuar_cuantiles(rfm.copy()),
+                           rfm_pedidos=rfm_pedidos_legado(df),
+                           rfm_grupo=calcular_rfm_por_grupo(df, FECHA_CORTE))
+
+
+@pytest.fixture(scope='module')
+def tiempos():
+    """Tiempos de la corrida; al terminar el módulo se guardan en RUTA_SALIDA."""
+    registro = {}
+    yield registro
+    os.makedirs(os.path.dirname(RUTA_SALIDA) or '.', exist_ok=True)
+    with open(RUTA_SALIDA, 'w') as f:
+        json.dump({'clientes': CLIENTES, 'filas': FILAS, 'etapas': registro}, f, indent=2, sort_keys=True)
+
+
+@pytest.mark.parametrize('etapa', list(ETAPAS))
+def test_etapa_mas_rapida_que_el_legado(datos, tiempos, etapa):
+    actual, original, esperada = ETAPAS[etapa]
+    segundos, legado = medir(actual, original, datos)
+    aceleracion = legado / segundos
+    tiempos[etapa] = {'segundos': segundos, 'legado': legado, 'aceleracion': aceleracion}
+    minima = esperada * (1 - TOLERANCIA)
+    assert aceleracion >= minima, (f"'{etapa}' tardó {segundos:.4f} s y el original {legado:.4f} s: "
+                                   f"{aceleracion:.1f}x, mínimo {minima:.1f}x ({esperada}x con tolerancia "
+                                   f"{TOLERANCIA:.0%})")
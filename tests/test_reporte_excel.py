@@ -0,0 +1,22 @@
+"""Reporte Excel: tablas más largas que una hoja siguen en hojas de continuación."""
+import io
+
+import pandas as pd
+import pytest
+
+from rfm_core.reporte_excel import escribir_reporte_excel
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def test_hojas_de_continuacion_con_encabezado():
+    rfm = pd.DataFrame({'Customer ID': [f'C{i}' for i in range(25)], 'Monetary': range(25)})
+    buffer = io.BytesIO()
+    escribir_reporte_excel(buffer, {'RFM': rfm, 'Vacía': rfm.head(0)}, filas_por_hoja=10)
+    libro = openpyxl.load_workbook(buffer, read_only=True)
+    assert libro.sheetnames == ['RFM', 'RFM (2)', 'RFM (3)', 'Vacía']
+    partes = [pd.DataFrame(list(libro[n].values)[1:], columns=list(libro[n].values)[0])
+              for n in ['RFM', 'RFM (2)', 'RFM (3)']]
+    assert [len(p) for p in partes] == [10, 10, 5]
+    pd.testing.assert_frame_equal(pd.concat(partes, ignore_index=True), rfm)
+    assert list(libro['Vacía'].values) == [('Customer ID', 'Monetary')]